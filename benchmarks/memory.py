@@ -0,0 +1,93 @@
+"""Measures how much memory recorded expectations take, by recording a protocol-like queue of method calls,
+setattrs and whenever() calls with tracemalloc.
+
+Usage: python benchmarks/memory.py [number of expectations]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from forge import Forge
+
+
+class Connection(object):
+    def send(self, opcode, payload=None, flags=0):
+        raise NotImplementedError()  # pragma: no cover
+
+    def receive(self, size):
+        raise NotImplementedError()  # pragma: no cover
+
+    def ping(self):
+        raise NotImplementedError()  # pragma: no cover
+
+
+def _record(forge, connection, num_expectations):
+    connection.ping().whenever().and_return(True)
+    for index in range(num_expectations - 1):
+        kind = index % 4
+        if kind == 0:
+            connection.send(1, index)
+        elif kind == 1:
+            connection.send(2, index, flags=1).and_return(index)
+        elif kind == 2:
+            connection.receive(16).and_return(b"response")
+        else:
+            connection.__forge__.expect_setattr("timeout", index)
+
+
+def _replay(connection, num_expectations):
+    for index in range(num_expectations - 1):
+        kind = index % 4
+        if kind == 0:
+            connection.send(1, index)
+        elif kind == 1:
+            connection.send(2, index, flags=1)
+        elif kind == 2:
+            connection.receive(16)
+        else:
+            connection.timeout = index
+
+
+def measure(num_expectations):
+    forge = Forge()
+    connection = forge.create_mock(Connection)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.time()
+    _record(forge, connection, num_expectations)
+    record_time = time.time() - start
+    recorded = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    forge.replay()
+    start = time.time()
+    _replay(connection, num_expectations)
+    replay_time = time.time() - start
+    forge.verify()
+
+    print("%-24s %12d" % ("expectations", num_expectations))
+    print("%-24s %12.1f MB" % ("recorded queue", recorded / 1e6))
+    print("%-24s %12.1f bytes" % ("per expectation", recorded / float(num_expectations)))
+    print("%-24s %12.2f sec" % ("recording (traced)", record_time))
+    print("%-24s %12.2f sec" % ("replay", replay_time))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measures the memory taken by recorded expectations")
+    parser.add_argument("num_expectations", nargs="?", type=int, default=1000000,
+                        help="number of expectations to record")
+    args = parser.parse_args(argv)
+    if args.num_expectations < 1:
+        parser.error("num_expectations must be at least 1")
+    measure(args.num_expectations)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
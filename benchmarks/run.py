@@ -0,0 +1,94 @@
+"""Runs the benchmarks of benchmarks/suite.py, optionally comparing them with a saved baseline.
+
+Usage: python benchmarks/run.py [-k FILTER] [--save PATH] [--compare PATH] [--threshold FRACTION]
+
+Timings are the best time per iteration out of several repeats. With --compare, benchmarks slower than the
+baseline by more than the threshold (default 10%) are reported, and the runner exits with a non-zero status.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import suite
+
+
+def _get_number(timer, min_time):
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            return number
+        number *= 2
+
+
+def measure(run, repeat, min_time):
+    timer = timeit.Timer(run)
+    number = _get_number(timer, min_time)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def iter_benchmarks(name_filter=None):
+    for name, func, sizes in suite.BENCHMARKS:
+        for size in sizes:
+            full_name = name if len(sizes) == 1 else "%s[%s]" % (name, size)
+            if name_filter is None or name_filter in full_name:
+                yield full_name, func, size
+
+
+def run_all(name_filter=None, repeat=5, min_time=0.05):
+    results = {}
+    for full_name, func, size in iter_benchmarks(name_filter):
+        results[full_name] = seconds = measure(func(size), repeat, min_time)
+        print("%-32s %12.2f us" % (full_name, seconds * 1e6))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints the change of every benchmark found in baseline and returns the names of the regressed ones"""
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        ratio = results[name] / baseline[name]
+        marker = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            marker = "  REGRESSION"
+        print("%-32s %12.2f us -> %10.2f us  (%+.1f%%)%s" % (
+            name, baseline[name] * 1e6, results[name] * 1e6, (ratio - 1) * 100, marker))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs forge's benchmarks")
+    parser.add_argument("-k", dest="name_filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimal duration of each repeat, in seconds")
+    parser.add_argument("--save", default=None, help="save the results as a baseline to this path")
+    parser.add_argument("--compare", default=None, help="compare the results with the baseline at this path")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.name_filter, args.repeat, args.min_time)
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump({"python": platform.python_version(), "results": results}, baseline_file, indent=2,
+                      sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print("\nCompared with %s (python %s):" % (args.compare, baseline["python"]))
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print("\n%s benchmark(s) regressed by more than %d%%: %s" % (
+                len(regressions), args.threshold * 100, ", ".join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
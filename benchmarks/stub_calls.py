@@ -0,0 +1,44 @@
+"""Measures how many stub calls per second forge replays.
+
+Usage: python benchmarks/stub_calls.py [number of calls]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from forge import Forge
+
+
+def f(a, b=2):
+    raise NotImplementedError()  # pragma: no cover
+
+
+class Obj(object):
+    def method(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+
+def _measure(name, forge, call, num_calls):
+    forge.replay()
+    seconds = min(timeit.repeat(call, number=num_calls, repeat=3))
+    forge.reset()
+    print("%-24s %12.0f calls/sec" % (name, num_calls / seconds))
+
+
+def main(num_calls):
+    forge = Forge()
+    stub = forge.create_function_stub(f)
+    stub(1).whenever().and_return(2)
+    _measure("function stub", forge, lambda: stub(1), num_calls)
+
+    mock = forge.create_mock(Obj)
+    mock.method(1).whenever().and_return(2)
+    _measure("mock method", forge, lambda: mock.method(1), num_calls)
+
+    _measure("stub attribute access", forge, lambda: stub.__name__, num_calls)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
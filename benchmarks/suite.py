@@ -0,0 +1,201 @@
+"""Benchmarks of forge's hot paths, run by benchmarks/run.py.
+
+Each benchmark is a function taking a size and returning a callable, which performs one measured iteration.
+Anything done before returning the callable (creating forges, stubs or recorded expectations) is not measured.
+"""
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from forge import Forge, UnexpectedCall
+from forge.comparators import IsA, Anything, Contains, And, Not
+from forge.signature import FunctionSignature
+
+BENCHMARKS = []
+SIZES = (10, 100, 1000)
+
+
+def benchmark(sizes=(1,)):
+    def decorator(func):
+        BENCHMARKS.append((func.__name__, func, sizes))
+        return func
+    return decorator
+
+
+class Obj(object):
+    value = 2
+
+    def method(self, a, b=2):
+        raise NotImplementedError()  # pragma: no cover
+
+    def other_method(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+    @classmethod
+    def class_method(cls, a):
+        raise NotImplementedError()  # pragma: no cover
+
+
+def f(a, b=2, *args, **kwargs):
+    raise NotImplementedError()  # pragma: no cover
+
+
+def _record_and_replay(forge, record, replay):
+    def run():
+        record()
+        forge.replay()
+        replay()
+        forge.verify()
+        forge.reset()
+    return run
+
+
+@benchmark()
+def create_mock(size):
+    forge = Forge()
+    return lambda: forge.create_mock(Obj)
+
+
+@benchmark()
+def create_class_mock(size):
+    forge = Forge()
+    return lambda: forge.create_class_mock(Obj)
+
+
+@benchmark(SIZES)
+def ordered_group(size):
+    forge = Forge()
+    mock = forge.create_mock(Obj)
+    def calls():
+        for index in range(size):
+            mock.method(index)
+    return _record_and_replay(forge, calls, calls)
+
+
+@benchmark(SIZES)
+def any_order_group(size):
+    forge = Forge()
+    mock = forge.create_mock(Obj)
+    def record():
+        with forge.any_order():
+            for index in range(size):
+                mock.method(index)
+    def replay():
+        for index in reversed(range(size)):
+            mock.method(index)
+    return _record_and_replay(forge, record, replay)
+
+
+@benchmark(SIZES)
+def interleaved_group(size):
+    forge = Forge()
+    mock = forge.create_mock(Obj)
+    def record():
+        with forge.interleaved_order():
+            with forge.ordered():
+                for index in range(size // 2):
+                    mock.method(index)
+            with forge.ordered():
+                for index in range(size // 2):
+                    mock.other_method(index)
+    def replay():
+        for index in range(size // 2):
+            mock.other_method(index)
+            mock.method(index)
+    return _record_and_replay(forge, record, replay)
+
+
+@benchmark(SIZES)
+def whenever_table(size):
+    forge = Forge()
+    mock = forge.create_mock(Obj)
+    for index in range(size):
+        mock.method(index).whenever().and_return(index)
+    forge.replay()
+    def run():
+        for index in range(size):
+            mock.method(index)
+    return run
+
+
+@benchmark(SIZES)
+def response_table(size):
+    forge = Forge()
+    stub = forge.create_function_stub(f)
+    forge.create_response_table(stub, dict(((index,), index) for index in range(size)))
+    forge.replay()
+    def run():
+        for index in range(size):
+            stub(index)
+    return run
+
+
+@benchmark()
+def stub_call(size):
+    forge = Forge()
+    stub = forge.create_function_stub(f)
+    stub(1).whenever().and_return(2)
+    forge.replay()
+    return lambda: stub(1)
+
+
+@benchmark()
+def mock_method_call(size):
+    forge = Forge()
+    mock = forge.create_mock(Obj)
+    mock.method(1).whenever().and_return(2)
+    forge.replay()
+    return lambda: mock.method(1)
+
+
+@benchmark()
+def get_normalized_args(size):
+    signature = FunctionSignature(f)
+    return lambda: signature.get_normalized_args((1, 2, 3), {"c": 4})
+
+
+@benchmark(SIZES[:2])
+def comparator_matching(size):
+    forge = Forge()
+    mock = forge.create_mock(Obj)
+    def record():
+        with forge.any_order():
+            for index in range(size):
+                mock.method(And(IsA(int), Not(IsA(bool))), Contains(index))
+    def replay():
+        for index in reversed(range(size)):
+            mock.method(index, [index])
+    return _record_and_replay(forge, record, replay)
+
+
+@benchmark(SIZES)
+def replace_restore(size):
+    forge = Forge()
+    module = types.ModuleType("replaced")
+    names = ["f%s" % (index,) for index in range(size)]
+    for name in names:
+        setattr(module, name, f)
+    def run():
+        for name in names:
+            forge.replace(module, name)
+        forge.restore_all_replacements()
+        forge.reset()
+    return run
+
+
+@benchmark(SIZES)
+def unexpected_event_str(size):
+    forge = Forge()
+    mock = forge.create_mock(Obj)
+    with forge.any_order():
+        for index in range(size):
+            mock.method(index, Anything())
+    forge.replay()
+    try:
+        mock.method(-1)
+    except UnexpectedCall as e:
+        error = e
+    forge.reset()
+    return lambda: str(error)
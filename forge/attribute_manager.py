@@ -1,5 +1,6 @@
 from collections import defaultdict
 from sentinels import NOTHING
+from .python3_compat import iteritems
 
 class AttributeManager(object):
     def __init__(self, forge):
@@ -17,7 +18,15 @@ class AttributeManager(object):
         return returned
     def _get_attribute(self, mock, attr, attr_dict):
         return attr_dict[mock.__forge__.id].get(attr, NOTHING)
+    def get_record_attributes(self):
+        return dict((mock_id, dict(attrs)) for mock_id, attrs in iteritems(self._record_attributes))
+    def set_record_attributes(self, record_attributes):
+        self._record_attributes = defaultdict(dict, ((mock_id, dict(attrs))
+                                                     for mock_id, attrs in iteritems(record_attributes)))
     def reset_replay_attributes(self):
         self._replay_attributes.clear()
+    def clear(self):
+        self._record_attributes.clear()
+        self._replay_attributes.clear()
     def has_attribute(self, mock, attr):
         return attr in self._record_attributes[mock.__forge__.id] or attr in self._replay_attributes[mock.__forge__.id]
@@ -0,0 +1,59 @@
+class Awaitable(object):
+    """Returned by stubs of coroutine functions during replay, in place of a coroutine. The call is matched when
+    the stub is called, like a coroutine is created; awaiting the result runs the matched expectation's actions
+    and returns its value (or raises its exception), without ever suspending.
+
+    Implemented without async syntax, so the package stays importable on interpreters that lack it."""
+
+    def __init__(self, resolve, description="result"):
+        super(Awaitable, self).__init__()
+        self._resolve = resolve
+        self._description = description
+        self._awaited = False
+
+    def __await__(self):
+        if self._awaited:
+            raise RuntimeError("%r was already awaited" % (self,))
+        self._awaited = True
+        return _ResultIterator(self._resolve)
+
+    def __repr__(self):
+        return "<Awaitable %s>" % (self._description,)
+
+
+class _ResultIterator(object):
+    # stopping the iteration on its first step is how __await__ returns a value without a generator
+    def __init__(self, resolve):
+        super(_ResultIterator, self).__init__()
+        self._resolve = resolve
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        raise StopIteration(self._resolve())
+    next = __next__
+
+
+def resolved(value):
+    return Awaitable(lambda: value, description=repr(value))
+
+
+class AsyncVerifiedReplayContext(object):
+    """Asynchronous counterpart of Forge.verified_replay_context(), for use with async with"""
+
+    def __init__(self, forge):
+        super(AsyncVerifiedReplayContext, self).__init__()
+        self._forge = forge
+
+    def __aenter__(self):
+        self._forge.replay()
+        return resolved(None)
+
+    def __aexit__(self, exc_type, exc_value, exc_tb):
+        def finish():
+            if exc_type is None:
+                self._forge.verify()
+                self._forge.reset()
+            return False
+        return Awaitable(finish, description="exit")
@@ -7,16 +7,23 @@ class BoundSignatureAdapter(object):
             raise SignatureException("%s is already bound!" % self.stub)
         self._signature = signature
         self._obj = obj
+        self._self_arg_name = self._get_self_arg_name()
     def is_bound(self):
         return True
+    def is_coroutine_function(self):
+        return self._signature.is_coroutine_function()
     def get_normalized_args(self, args, kwargs):
-        new_args = [self._obj]
-        new_args.extend(args)
-        returned = self._signature.get_normalized_args(new_args, kwargs)
-        returned.pop(self._get_self_arg_name())
+        returned = self._signature.get_normalized_args((self._obj,) + tuple(args), kwargs)
+        returned.pop(self._self_arg_name)
         return returned
+    def get_compact_args(self, args, kwargs):
+        names, values = self._signature.get_compact_args((self._obj,) + tuple(args), kwargs)
+        index = names.index(self._self_arg_name)
+        return (self._signature.intern_arg_names(names[:index] + names[index + 1:]),
+                values[:index] + values[index + 1:])
+    def compact_normalized_args(self, normalized_args):
+        return self._signature.compact_normalized_args(normalized_args)
     def _get_self_arg_name(self):
-        arg_names = list(self._signature.get_arg_names())
-        if arg_names:
-            return arg_names[0]
+        for arg_name in self._signature.get_arg_names():
+            return arg_name
         return 0
@@ -1,13 +1,20 @@
 import sys
+from dis import findlinestarts
+from .python3_compat import iteritems
 
 class CallerInfo(object):
-    def __init__(self, file_name, line_number, function_name):
+    __slots__ = ("file_name", "line_number", "function_name", "callers")
+    def __init__(self, file_name, line_number, function_name, callers=()):
         super(CallerInfo, self).__init__()
         self.file_name = file_name
         self.line_number = line_number
         self.function_name = function_name
+        self.callers = list(callers) if callers else ()
     def __repr__(self):
-        return "%s:%s::%s" % (self.file_name, self.line_number, self.function_name)
+        returned = "%s:%s::%s" % (self.file_name, self.line_number, self.function_name)
+        for caller in self.callers:
+            returned += "\n    called from %r" % (caller,)
+        return returned
     @classmethod
     def from_caller(cls, level=1, _frame_getter=sys._getframe):
         """
@@ -24,3 +31,65 @@ class CallerInfo(object):
             #pops up some day
             del frame
         return returned
+    def __getstate__(self):
+        return dict((name, getattr(self, name)) for name in CallerInfo.__slots__)
+    def __setstate__(self, state):
+        # caller info pickled before slots were used only has callers if there were any
+        self.callers = ()
+        for name, value in iteritems(state):
+            setattr(self, name, value)
+
+class LazyCallerInfo(CallerInfo):
+    """Caller info which only keeps the code objects and instruction offsets of the calling frames, and looks up
+    file names and line numbers the first time they are needed (usually when an error is rendered)."""
+    __slots__ = ("_frames", "_resolved")
+    def __init__(self, frames):
+        # CallerInfo's constructor is skipped, since its fields are resolved lazily
+        super(CallerInfo, self).__init__()
+        self._frames = frames
+        self._resolved = None
+    @classmethod
+    def from_caller(cls, level=1, stack_depth=1, _frame_getter=sys._getframe):
+        """
+        @param level: how many calls above this one is to
+            be retrieved (1 is the caller to this function)
+        @param stack_depth: how many frames to keep, starting from that caller
+        """
+        frame = _frame_getter(level + 1)
+        try:
+            frames = [(frame.f_code, frame.f_lasti)]
+            while len(frames) < stack_depth and frame.f_back is not None:
+                frame = frame.f_back
+                frames.append((frame.f_code, frame.f_lasti))
+        finally:
+            del frame
+        return cls(frames)
+    def resolve(self):
+        """Returns an equivalent, fully resolved CallerInfo"""
+        if self._resolved is None:
+            resolved = [CallerInfo(code.co_filename, _get_line_number(code, lasti), code.co_name)
+                        for code, lasti in self._frames]
+            self._resolved = CallerInfo(resolved[0].file_name, resolved[0].line_number, resolved[0].function_name,
+                                        callers=resolved[1:])
+        return self._resolved
+    file_name = property(lambda self: self.resolve().file_name)
+    line_number = property(lambda self: self.resolve().line_number)
+    function_name = property(lambda self: self.resolve().function_name)
+    callers = property(lambda self: self.resolve().callers)
+    def __reduce__(self):
+        # code objects can't be pickled
+        resolved = self.resolve()
+        return (CallerInfo, (resolved.file_name, resolved.line_number, resolved.function_name, resolved.callers))
+
+def _get_line_number(code, lasti):
+    if hasattr(code, "co_lines"):
+        for start, end, line_number in code.co_lines():
+            if start <= lasti < end:
+                return line_number
+        return None
+    returned = None
+    for offset, line_number in findlinestarts(code):
+        if offset > lasti:
+            break
+        returned = line_number
+    return returned
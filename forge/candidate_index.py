@@ -0,0 +1,53 @@
+import heapq
+import itertools
+from collections import OrderedDict
+
+
+class CandidateIndex(object):
+    """Keeps the children of a group bucketed by their match key, so a replayed event is only compared against
+    expectations recorded for the same target. Children without a match key (nested groups) are always candidates,
+    and all candidates are yielded in the order in which they were pushed."""
+
+    def __init__(self):
+        super(CandidateIndex, self).__init__()
+        self._sequence = itertools.count()
+        self._buckets = {}
+        self._unkeyed = OrderedDict()
+
+    def add(self, node):
+        entry = (next(self._sequence), node)
+        key = node.get_match_key()
+        if key is None:
+            self._unkeyed[id(node)] = entry
+        else:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = OrderedDict()
+            bucket[id(node)] = entry
+
+    def remove(self, node):
+        key = node.get_match_key()
+        if key is None:
+            self._unkeyed.pop(id(node), None)
+            return
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(id(node), None)
+            if not bucket:
+                del self._buckets[key]
+
+    def iter_candidates(self, queued_object):
+        """Yields the nodes that may match queued_object, in push order. Callers must stop iterating once the
+        index has been modified (e.g. after a successful pop)."""
+        bucket = self._buckets.get(queued_object.get_match_key())
+        if bucket is None:
+            entries = self._unkeyed.values()
+        elif not self._unkeyed:
+            entries = bucket.values()
+        else:
+            entries = heapq.merge(bucket.values(), self._unkeyed.values())
+        for _, node in entries:
+            yield node
+
+    def __len__(self):
+        return len(self._unkeyed) + sum(len(bucket) for bucket in self._buckets.values())
@@ -0,0 +1,317 @@
+import inspect
+import pickle
+from itertools import chain, islice
+from . import comparators
+from .caller_info import CallerInfo
+from .exceptions import CassetteError
+from .function_call import FunctionCall
+from .mock_object import MockObject
+from .python3_compat import iteritems, IS_PY3
+from .queue import WheneverDecorator
+from .setattr import Setattr
+from .queued_group import QueuedGroup, OrderedGroup, AnyOrderGroup, InterleavedGroup, ThreadAffineGroup
+from .response_table import ResponseTable, ResponseTableEntry
+from .stub import FunctionStub
+
+_FORMAT_NAME = "pyforge-cassette"
+_FORMAT_VERSION = 1
+_PICKLE_PROTOCOL = 2
+_LOAD_BATCH_SIZE = 256
+_WHENEVER = "whenever"
+_GROUP_CLASSES = [
+    ("thread_affine", ThreadAffineGroup),
+    ("interleaved", InterleavedGroup),
+    ("any_order", AnyOrderGroup),
+    ("ordered", OrderedGroup),
+    ]
+
+if IS_PY3:
+    import builtins
+else:
+    import __builtin__ as builtins
+# globals which cassettes may refer to without being trusted: forge's own nodes and comparators, and plain data
+_BUILTIN_MODULE_NAMES = ("builtins", "__builtin__", "exceptions")
+_SAFE_BUILTIN_NAMES = frozenset(["set", "frozenset", "complex", "bytearray", "slice", "range", "xrange", "object",
+                                 "bool", "int", "long", "float", "str", "unicode", "bytes", "list", "dict", "tuple"])
+_SAFE_GLOBALS = frozenset([
+    ("sentinels", "_sentinel_unpickler"),
+    ("_codecs", "encode"),
+    ("collections", "OrderedDict"),
+    ("datetime", "date"), ("datetime", "time"), ("datetime", "datetime"), ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+    ("decimal", "Decimal"),
+    ("re", "_compile"),
+    ] + [(cls.__module__, cls.__name__)
+         for cls in [FunctionCall, Setattr, ResponseTable, ResponseTableEntry, CallerInfo]] + [
+    (comparators.__name__, name) for name, value in iteritems(vars(comparators))
+    if inspect.isclass(value) and issubclass(value, comparators.Comparator)])
+
+
+def _get_global_name(obj):
+    return (obj.__module__, getattr(obj, "__qualname__", obj.__name__))
+
+
+def _is_safe_builtin(name):
+    if name in _SAFE_BUILTIN_NAMES:
+        return True
+    value = getattr(builtins, name, None)
+    return inspect.isclass(value) and issubclass(value, BaseException)
+
+
+def _get_targets_by_key(targets):
+    if isinstance(targets, dict):
+        return dict(targets)
+    return dict(enumerate(targets))
+
+
+def save_cassette(forge, path, targets):
+    """Saves the expectations recorded so far in forge to path. Mocks and stubs are referenced by their key in
+    targets (a dict, or a sequence whose indices are used as keys), and the same targets must be given when the
+    cassette is loaded. Arguments, return values and actions are pickled."""
+    if forge.is_replaying():
+        raise CassetteError("Cassettes can only be saved while recording")
+    writer = _CassetteWriter(forge, _get_targets_by_key(targets))
+    with open(path, "wb") as cassette_file:
+        writer.write(forge.queue.get_root_group(), cassette_file)
+
+
+def load_cassette(forge, path, targets, trusted_globals=()):
+    """Pushes the expectations stored in the cassette at path to the current recording group. The calls
+    themselves are read lazily, as replay consumes them.
+
+    Besides forge's own objects and plain data, the cassette may only refer to the classes and functions given in
+    trusted_globals (e.g. classes of recorded return values or exceptions, and functions given to and_call())"""
+    if forge.is_replaying():
+        raise CassetteError("Cassettes can only be loaded while recording")
+    reader = _CassetteReader(forge, _get_targets_by_key(targets), path, trusted_globals)
+    group = reader.build_group()
+    forge.queue.add_cleanup(reader.close)
+    for obj in reader.build_out_of_band_nodes():
+        forge.queue.push_out_of_band(obj)
+    if len(group):
+        forge.queue.push_group(group)
+    return group
+
+
+class CassetteGroup(OrderedGroup):
+    """Ordered group whose children are read from a cassette in batches, as they are needed. Its expected and
+    length counters come from the cassette, so they account for children that weren't read yet. The whenever()
+    expectations of the cassette are pushed to the enclosing group instead, so they outlive this one."""
+
+    __slots__ = ("_pending_nodes", "_match_key_nodes")
+
+    def __init__(self, pending_nodes, expected_count, length, match_key_nodes):
+        super(CassetteGroup, self).__init__()
+        self._pending_nodes = pending_nodes
+        self._expected_count = expected_count
+        self._length = length
+        self._match_key_nodes = match_key_nodes
+
+    def _load_nodes(self, limit):
+        if self._pending_nodes is None or self._collection:
+            return
+        for obj in islice(self._pending_nodes, limit):
+            self._collection.append(obj)
+            obj.set_parent(self)
+        if not self._collection:
+            self._pending_nodes = None
+
+    def _load_batch(self):
+        self._load_nodes(_LOAD_BATCH_SIZE)
+
+    def _load_all(self):
+        if self._pending_nodes is not None:
+            for obj in self._pending_nodes:
+                self._collection.append(obj)
+                obj.set_parent(self)
+            self._pending_nodes = None
+
+    def get_children(self):
+        self._load_all()
+        return super(CassetteGroup, self).get_children()
+
+    def iter_expected_or_available_children(self):
+        self._load_batch()
+        return super(CassetteGroup, self).iter_expected_or_available_children()
+
+    def iter_match_keys(self):
+        return chain(super(CassetteGroup, self).iter_match_keys(),
+                     (obj.get_match_key() for obj in self._match_key_nodes))
+
+    def clone(self):
+        returned = OrderedGroup()
+        for obj in self.get_children():
+            returned.push(obj.clone())
+        return returned
+
+    def compile(self):
+        self._load_batch()
+        super(CassetteGroup, self).compile()
+        # never replaced by a single child, since the unread ones would be lost
+        return self
+
+    def _pop_matching_by_strategy(self, queued_object):
+        self._load_batch()
+        return super(CassetteGroup, self)._pop_matching_by_strategy(queued_object)
+
+
+class _CassetteWriter(object):
+    def __init__(self, forge, targets_by_key):
+        super(_CassetteWriter, self).__init__()
+        self._references = {}
+        for key, target in iteritems(targets_by_key):
+            self._references[id(target)] = ("target", key)
+            if isinstance(target, MockObject):
+                for method_name, method_stub in forge.stubs.iter_initialized_method_stubs(target):
+                    self._references[id(method_stub)] = ("method", key, method_name)
+        self._match_key_nodes = {}
+
+    def _persistent_id(self, obj):
+        returned = self._references.get(id(obj))
+        if returned is None and isinstance(obj, (MockObject, FunctionStub)):
+            raise CassetteError("%r is not one of the cassette targets" % (obj,))
+        return returned
+
+    def _create_pickler(self, fileobj):
+        returned = pickle.Pickler(fileobj, _PICKLE_PROTOCOL)
+        returned.persistent_id = self._persistent_id
+        return returned
+
+    def _to_entry(self, obj):
+        if isinstance(obj, WheneverDecorator):
+            return (_WHENEVER, obj.obj)
+        if isinstance(obj, QueuedGroup):
+            return (self._get_group_kind(obj),
+                    [self._to_entry(child) for child in obj.get_children()],
+                    [self._to_entry(child) for child in obj.get_out_of_band_children()])
+        return obj
+
+    def _add_match_key_nodes(self, obj):
+        if isinstance(obj, WheneverDecorator):
+            obj = obj.obj
+        elif isinstance(obj, QueuedGroup):
+            for child in chain(obj.get_children(), obj.get_out_of_band_children()):
+                self._add_match_key_nodes(child)
+            return
+        self._match_key_nodes.setdefault(obj.get_match_key(), obj)
+
+    def _get_group_kind(self, group):
+        for kind, group_class in _GROUP_CLASSES:
+            if isinstance(group, group_class):
+                return kind
+        raise CassetteError("Cannot save %s groups" % (type(group).__name__,))
+
+    def write(self, root_group, fileobj):
+        # the header needs the counters and match keys of all the entries, so they are gathered first, and the
+        # entries are then written one by one instead of being kept in memory
+        expected_count = length = 0
+        for child in chain(root_group.get_children(), root_group.get_out_of_band_children()):
+            self._add_match_key_nodes(child)
+        for child in root_group.get_children():
+            expected_count += child.get_expected_count()
+            length += len(child)
+        header = {
+            "format": _FORMAT_NAME,
+            "version": _FORMAT_VERSION,
+            "expected_count": expected_count,
+            "length": length,
+            "out_of_band": [self._to_entry(child) for child in root_group.get_out_of_band_children()],
+            "match_key_nodes": list(self._match_key_nodes.values()),
+            }
+        pickler = self._create_pickler(fileobj)
+        pickler.dump(header)
+        for child in root_group.get_children():
+            pickler.clear_memo()
+            pickler.dump(self._to_entry(child))
+
+
+class _CassetteUnpickler(pickle.Unpickler):
+    """Unpickler refusing globals which aren't known to be safe, since loading them may run arbitrary code"""
+
+    def __init__(self, fileobj, trusted_globals):
+        pickle.Unpickler.__init__(self, fileobj)
+        self._trusted_names = frozenset(_get_global_name(obj) for obj in trusted_globals)
+
+    def find_class(self, module, name):
+        if (module, name) not in _SAFE_GLOBALS and (module, name) not in self._trusted_names and \
+           not (module in _BUILTIN_MODULE_NAMES and _is_safe_builtin(name)):
+            raise CassetteError("The cassette refers to %s.%s, which is not trusted. Pass it in trusted_globals if "
+                                "the cassette comes from a trusted source" % (module, name))
+        return pickle.Unpickler.find_class(self, module, name)
+
+
+class _CassetteReader(object):
+    def __init__(self, forge, targets_by_key, path, trusted_globals=()):
+        super(_CassetteReader, self).__init__()
+        self._forge = forge
+        self._targets_by_key = targets_by_key
+        self._resolved_references = {}
+        self._file = open(path, "rb")
+        self._unpickler = _CassetteUnpickler(self._file, trusted_globals)
+        self._unpickler.persistent_load = self._persistent_load
+
+    def close(self):
+        """Closes the file, leaving the calls which weren't read yet out of the replay"""
+        self._file.close()
+
+    def _persistent_load(self, reference):
+        returned = self._resolved_references.get(reference)
+        if returned is None:
+            try:
+                returned = self._targets_by_key[reference[1]]
+            except KeyError:
+                raise CassetteError("Cassette target %r was not given" % (reference[1],))
+            if reference[0] == "method":
+                returned = returned.__forge__.get_method(reference[2])
+            self._resolved_references[reference] = returned
+        return returned
+
+    def _read_header(self):
+        try:
+            header = self._unpickler.load()
+        except Exception:
+            self._file.close()
+            raise
+        if not isinstance(header, dict) or header.get("format") != _FORMAT_NAME:
+            self._file.close()
+            raise CassetteError("%s is not a cassette file" % (self._file.name,))
+        if header["version"] != _FORMAT_VERSION:
+            self._file.close()
+            raise CassetteError("Unsupported cassette version %s" % (header["version"],))
+        return header
+
+    def build_group(self):
+        header = self._read_header()
+        for obj in header["match_key_nodes"]:
+            if isinstance(obj, (FunctionCall, ResponseTable)):
+                self._forge.stubs.mark_stub_recorded(obj.target)
+        self._out_of_band_entries = header["out_of_band"]
+        return CassetteGroup(self._iter_nodes(), header["expected_count"], header["length"],
+                             header["match_key_nodes"])
+
+    def build_out_of_band_nodes(self):
+        return [self._build_node(entry) for entry in self._out_of_band_entries]
+
+    def _iter_nodes(self):
+        try:
+            while not self._file.closed:
+                try:
+                    entry = self._unpickler.load()
+                except EOFError:
+                    return
+                yield self._build_node(entry)
+        finally:
+            self._file.close()
+
+    def _build_node(self, entry):
+        if not isinstance(entry, tuple):
+            return entry
+        if entry[0] == _WHENEVER:
+            return WheneverDecorator(entry[1])
+        kind, children, out_of_band_children = entry
+        returned = dict(_GROUP_CLASSES)[kind]()
+        for child in children:
+            returned.push(self._build_node(child))
+        for child in out_of_band_children:
+            returned.push_out_of_band(self._build_node(child))
+        return returned
@@ -0,0 +1,173 @@
+import weakref
+from itertools import chain
+from types import FunctionType, MethodType, BuiltinMethodType
+from sentinels import NOTHING
+from .dtypes import MethodDescriptorType
+from .python3_compat import build_unbound_instance_method
+from .signature import get_signature
+from .utils import is_class
+
+METHOD = "method"
+CLASS_METHOD = "classmethod"
+STATIC_METHOD = "staticmethod"
+MEMBER = "member"
+
+_METHOD_TYPES = (FunctionType, MethodType, BuiltinMethodType, MethodDescriptorType)
+
+
+class ClassMetadata(object):
+    """What class mocks need to know about a mocked class, computed once per name and shared by all mocks of the
+    class. Only classifications are kept, since the attribute values themselves (e.g. class methods, or methods
+    using super()) may reference the class and keep it alive.
+
+    Each classification is checked against the value it was made for (by identity, with a single getattr()), so
+    attributes which are added, removed or replaced later on (with setattr, mock.patch, etc.) are classified
+    again."""
+
+    def __init__(self, cls):
+        super(ClassMetadata, self).__init__()
+        try:
+            self._class_ref = weakref.ref(cls)
+        except TypeError:
+            self._class_ref = lambda: cls
+        self._kinds = {}
+        self._is_callable = None
+
+    def get_class(self):
+        return self._class_ref()
+
+    def get_kind(self, name):
+        """Returns one of METHOD, CLASS_METHOD, STATIC_METHOD or MEMBER, or None if the class has no such attribute"""
+        value = getattr(self.get_class(), name, NOTHING)
+        identity = _get_identity(value)
+        cached = self._kinds.get(name)
+        if cached is None or cached[1] != identity:
+            cached = self._kinds[name] = (self._classify(name, value), identity)
+        return cached[0]
+
+    def _get_definition(self, name):
+        # the raw attribute (e.g. the staticmethod object) from the class defining name, looked up like getattr()
+        cls = self.get_class()
+        for klass in chain(getattr(cls, "__mro__", (cls,)), type(cls).__mro__):
+            value = klass.__dict__.get(name, NOTHING)
+            if value is not NOTHING:
+                return value
+        return NOTHING
+
+    def get_member(self, name):
+        """Returns the value of the class attribute name, or NOTHING if there isn't any"""
+        if self.get_kind(name) is None:
+            return NOTHING
+        return getattr(self.get_class(), name, NOTHING)
+
+    def has_member(self, name):
+        return self.get_kind(name) is not None
+
+    def has_nonmethod_member(self, name):
+        return self.get_kind(name) == MEMBER
+
+    def is_static_method(self, name):
+        return self.get_kind(name) == STATIC_METHOD
+
+    def _classify(self, name, value):
+        if value is NOTHING:
+            return None
+        if type(value) not in _METHOD_TYPES:
+            return MEMBER
+        if isinstance(self._get_definition(name), staticmethod):
+            return STATIC_METHOD
+        if isinstance(value, MethodType) and value.__self__ is not None and is_class(value.__self__):
+            return CLASS_METHOD
+        return METHOD
+
+    def is_callable(self):
+        if self._is_callable is None:
+            self._is_callable = self._get_is_callable()
+        return self._is_callable
+
+    def _get_is_callable(self):
+        cls = self.get_class()
+        if not hasattr(cls, "__call__"):
+            return False
+        call_method = cls.__call__
+        if getattr(call_method, "__objclass__", None) is type(cls):
+            return False
+        if getattr(call_method, "__self__", None) is not None:
+            #__call__ is already bound, for some reason
+            return False
+        return True
+
+    def get_constructor(self):
+        cls = self.get_class()
+        returned = getattr(cls, "__init__", object.__init__)
+        if type(returned) is type(object.__init__) and returned.__objclass__ is object:
+            # in some cases where the class doesn't have a constructor,
+            # simulate an empty ctor...
+            fake_constructor = lambda self: None
+            fake_constructor.__name__ = "__init__"
+            returned = build_unbound_instance_method(fake_constructor, cls)
+        return returned
+
+    def warm_up(self):
+        """Classifies all the attributes of the class and parses the signatures of its methods in advance"""
+        for name in dir(self.get_class()):
+            if self.get_kind(name) in (METHOD, CLASS_METHOD, STATIC_METHOD):
+                try:
+                    get_signature(self.get_member(name))
+                except TypeError:
+                    # some builtin methods can't be parsed; they only fail if they are actually mocked
+                    pass
+        self.is_callable()
+
+    def clear(self):
+        self._kinds.clear()
+        self._is_callable = None
+
+
+def _get_identity(value):
+    # identifies what getattr() returned by ids, so it isn't kept alive. Class methods are bound anew on every
+    # lookup, so their function is used instead. The type of the value is part of it, so a new value reusing the id
+    # of a discarded one is only mistaken for it if it would be classified the same way
+    if value is NOTHING:
+        return None
+    if type(value) is MethodType:
+        return (id(value.__func__), id(value.__self__), MethodType)
+    return (id(value), id(type(value)))
+
+
+class ClassMetadataCache(object):
+    """Process-wide table of ClassMetadata, weakly keyed by class. Metadata describes the class as it was when it
+    was first examined, so it must be invalidated when the class is changed. Replacing class attributes through
+    forge does so automatically."""
+
+    def __init__(self):
+        super(ClassMetadataCache, self).__init__()
+        self._metadata = weakref.WeakKeyDictionary()
+
+    def get(self, cls):
+        try:
+            returned = self._metadata.get(cls)
+        except TypeError:
+            # not weakly referenceable or not hashable
+            return ClassMetadata(cls)
+        if returned is None:
+            returned = self._metadata[cls] = ClassMetadata(cls)
+        return returned
+
+    def warm_up(self, cls):
+        self.get(cls).warm_up()
+
+    def invalidate(self, cls):
+        """Clears the metadata of cls and of all its cached subclasses, including the metadata already held by
+        existing mocks"""
+        for cached_class, metadata in list(self._metadata.items()):
+            if cls in getattr(cached_class, "__mro__", (cached_class,)):
+                metadata.clear()
+
+    def clear(self):
+        self._metadata.clear()
+
+    def __len__(self):
+        return len(self._metadata)
+
+class_metadata_cache = ClassMetadataCache()
@@ -1,3 +1,4 @@
+import weakref
 from .class_mock_handle import ClassMockHandle
 from .mock_object import MockObject
 
@@ -12,3 +13,48 @@ class ClassMockObject(MockObject):
             return type(self.__forge__.mocked_class)
         else:
             return super(ClassMockObject, self).__getattribute__(name)
+
+class FastClassMockObject(MockObject):
+    """Instance mock without a __getattribute__ hook. Subclasses generated per mocked class (see
+    get_fast_mock_class) provide __class__ as a plain class attribute, and method stubs are installed in the
+    instance dict the first time they are fetched, so later lookups don't reach __getattr__ at all."""
+    def __init__(self, forge, mocked_class):
+        super(FastClassMockObject, self).__init__()
+        self.__forge__ = ClassMockHandle(forge, self, mocked_class, behave_as_instance=True, hybrid=False)
+        forge.register_fast_mock(self)
+    def __getattr__(self, attr):
+        handle = self.__forge__
+        returned = handle.get_attribute(attr)
+        if returned is handle.forge.stubs.get_initialized_method_stub_or_none(self, attr):
+            self.__dict__[attr] = returned
+        return returned
+    def __setattr__(self, attr, value):
+        if attr != '__forge__':
+            # attributes take precedence over methods, so an installed stub must not hide them
+            self.__dict__.pop(attr, None)
+        super(FastClassMockObject, self).__setattr__(attr, value)
+
+def uninstall_method_stubs(mock):
+    """Removes the method stubs installed in a fast mock, e.g. when the stubs of its forge are replaced"""
+    handle = mock.__dict__['__forge__']
+    mock.__dict__.clear()
+    mock.__dict__['__forge__'] = handle
+
+_fast_mock_classes = weakref.WeakKeyDictionary()
+
+def get_fast_mock_class(mocked_class):
+    try:
+        returned = _fast_mock_classes.get(mocked_class)
+    except TypeError:
+        # not weakly referenceable or not hashable
+        return _build_fast_mock_class(mocked_class)
+    # held weakly as well, since the generated class references the mocked class
+    returned = returned() if returned is not None else None
+    if returned is None:
+        returned = _build_fast_mock_class(mocked_class)
+        _fast_mock_classes[mocked_class] = weakref.ref(returned)
+    return returned
+
+def _build_fast_mock_class(mocked_class):
+    name = "Fast%sMock" % (getattr(mocked_class, '__name__', ''),)
+    return type(name, (FastClassMockObject,), {'__class__': mocked_class})
@@ -0,0 +1,10 @@
+import threading
+
+
+class ComparisonCounter(threading.local):
+    """Counts the expectations compared with replayed events in the current thread. Instrumented queues set count
+    to 0 around their own pops, and it is None otherwise, so matching only checks it while a queue is counting"""
+
+    count = None
+
+comparison_counter = ComparisonCounter()
@@ -0,0 +1,105 @@
+import logging
+import os
+try:
+    from configparser import ConfigParser
+except ImportError:  # python 2
+    from ConfigParser import ConfigParser
+
+_CONFIG_SECTION = "pyforge"
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _parse_bool(value):
+    return str(value).strip().lower() in _TRUE_VALUES
+
+
+def _parse_debug(value):
+    # besides a boolean, FORGE_DEBUG may hold the number of frames to keep for each event
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value) > 0, max(1, int(value))
+    return value.lower() not in ("0", "false", "no", "off"), None
+
+
+class ForgeConfig(object):
+    """Process-wide settings of forge, read from the environment when forge is imported and changeable from code
+    through update(). Forges take their settings from it when created (or recycled), and can still be changed one
+    by one afterwards; listeners registered with add_listener() are called whenever the settings change.
+
+    Settings:
+     - debug: whether new forges record where each event came from (FORGE_DEBUG)
+     - stack_depth: how many frames are kept for each event when debugging (FORGE_DEBUG=N)
+     - trace: whether new forges log recorded and replayed events to the "pyforge" logger (FORGE_TRACE)
+     - log_level: level of the "pyforge" logger, or None to leave it alone (FORGE_LOG_LEVEL)
+     - stats: whether new forges collect replay statistics (FORGE_STATS)
+
+    FORGE_CONFIG may point to an ini file holding these settings in a [pyforge] section."""
+
+    _PARSERS = {
+        "debug": _parse_bool,
+        "stack_depth": int,
+        "trace": _parse_bool,
+        "log_level": lambda value: value if value is None else str(value).upper(),
+        "stats": _parse_bool,
+        }
+
+    def __init__(self):
+        super(ForgeConfig, self).__init__()
+        self.debug = False
+        self.stack_depth = 1
+        self.trace = False
+        self.log_level = None
+        self.stats = False
+        self._listeners = []
+
+    def update(self, **settings):
+        for name, value in settings.items():
+            if name not in self._PARSERS:
+                raise ValueError("Unknown forge setting %r" % (name,))
+            setattr(self, name, self._PARSERS[name](value))
+        if self.stack_depth < 1:
+            raise ValueError("stack_depth must be at least 1")
+        self._notify()
+
+    def load_file(self, path):
+        parser = ConfigParser()
+        if not parser.read(path):
+            raise IOError("Cannot read forge configuration file %s" % (path,))
+        if parser.has_section(_CONFIG_SECTION):
+            self.update(**dict(parser.items(_CONFIG_SECTION)))
+
+    def load_environ(self, environ=None):
+        if environ is None:
+            environ = os.environ
+        if "FORGE_CONFIG" in environ:
+            self.load_file(environ["FORGE_CONFIG"])
+        settings = {}
+        if "FORGE_DEBUG" in environ:
+            settings["debug"], stack_depth = _parse_debug(environ["FORGE_DEBUG"])
+            if stack_depth is not None:
+                settings["stack_depth"] = stack_depth
+        if "FORGE_TRACE" in environ:
+            settings["trace"] = environ["FORGE_TRACE"]
+        if "FORGE_LOG_LEVEL" in environ:
+            settings["log_level"] = environ["FORGE_LOG_LEVEL"]
+        if "FORGE_STATS" in environ:
+            settings["stats"] = environ["FORGE_STATS"]
+        self.update(**settings)
+
+    def add_listener(self, listener):
+        """Calls listener(config) now and whenever the settings change"""
+        self._listeners.append(listener)
+        listener(self)
+
+    def _notify(self):
+        for listener in self._listeners:
+            listener(self)
+
+
+def _apply_log_level(config):
+    if config.log_level is not None:
+        logging.getLogger("pyforge").setLevel(config.log_level)
+
+config = ForgeConfig()
+config.add_listener(_apply_log_level)
+config.load_environ()
@@ -1,23 +1,61 @@
-import os
-from .caller_info import CallerInfo
+import functools
+import logging
+import weakref
+from .caller_info import LazyCallerInfo
+from .config import config
+
+_logger = logging.getLogger("pyforge")
+_TRACED_VERBS = {"push_call": "Recorded", "push_setattr": "Recorded", "pop": "Replayed", "mismatch": "Replayed"}
 
 def _get_none_caller_info(level):
     return None
 
+def _log_event(event):
+    verb = _TRACED_VERBS.get(event.kind)
+    if verb is not None:
+        _logger.debug("%s %s", verb, event.description)
+
 class ForgeDebug(object):
+    """Debugging state of a single forge. Stubs and mocks only ask for caller info while their own forge captures
+    it, and tracing is a subscriber of the forge's hooks, so neither affects other forges"""
     def __init__(self, forge):
         super(ForgeDebug, self).__init__()
-        if 'FORGE_DEBUG' in os.environ:
-            self.enable()
+        self._forge_ref = weakref.ref(forge)
+        self.enabled = False
+        self._tracing = False
+        self.apply_config()
+    def apply_config(self):
+        if config.debug:
+            self.enable(stack_depth=config.stack_depth)
         else:
             self.disable()
+        if config.trace:
+            self.enable_tracing()
+        else:
+            self.disable_tracing()
     def disable(self):
-        self._enabled = False
+        self.enabled = False
         self._current_caller_info_getter = _get_none_caller_info
-    def enable(self):
-        self._enabled = True
-        self._current_caller_info_getter = CallerInfo.from_caller
+    def enable(self, stack_depth=1):
+        """Records where events came from. stack_depth frames are kept for each event, and they are only looked
+        up when an error is rendered"""
+        self.enabled = True
+        if stack_depth == 1:
+            self._current_caller_info_getter = LazyCallerInfo.from_caller
+        else:
+            self._current_caller_info_getter = functools.partial(LazyCallerInfo.from_caller, stack_depth=stack_depth)
     def is_enabled(self):
-        return self._enabled
+        return self.enabled
     def get_caller_info(self, level=1):
         return self._current_caller_info_getter(level + 1)
+    def enable_tracing(self):
+        """Logs the forge's recorded and replayed events to the "pyforge" logger"""
+        if not self._tracing:
+            self._tracing = True
+            self._forge_ref().hooks.subscribe(_log_event)
+    def disable_tracing(self):
+        if self._tracing:
+            self._tracing = False
+            self._forge_ref().hooks.unsubscribe(_log_event)
+    def is_tracing(self):
+        return self._tracing
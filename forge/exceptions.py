@@ -129,3 +129,19 @@ class ExpectedEventsNotFound(ForgeException, AssertionError):
 
 class InvalidEntryPoint(ForgeException):
     pass
+
+
+class InvalidTemplate(ForgeException):
+    pass
+
+
+class InvalidResponseTableEntry(ForgeException):
+    pass
+
+
+class CassetteError(ForgeException):
+    pass
+
+
+class RemoteReplayError(ForgeException):
+    pass
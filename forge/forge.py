@@ -1,10 +1,10 @@
 import itertools
-import time
+import weakref
 from contextlib import contextmanager
 from .python3_compat import iteritems
 from .stub import FunctionStub
-from .queue import ForgeQueue
-from .class_mock import ClassMockObject
+from .queue import ForgeQueue, ThreadSafeForgeQueue
+from .class_mock import ClassMockObject, get_fast_mock_class, uninstall_method_stubs
 from .wildcard_mock_object import WildcardMockObject
 from .replacer import Replacer
 from .stub_manager import StubManager
@@ -12,16 +12,38 @@ from .attribute_manager import AttributeManager
 from .sentinel import Sentinel
 from .dtypes import WILDCARD_FUNCTION
 from .debug import ForgeDebug
+from .template import ForgeTemplate
+from .cassette import save_cassette, load_cassette
+from .spy import SpyFunctionStub, SpyMockObject
+from .response_table import ResponseTable
+from .class_metadata import class_metadata_cache
+from .hooks import ForgeHooks
+from .awaitable import AsyncVerifiedReplayContext
+from .tasks import task_queue_context
+from .multiprocess import ReplayServer
+from .stats import ForgeStats
+from .config import config
+from .utils import is_function, is_bound_method
+
+
+_session_ids = itertools.count(1)
 
 
 class Forge(object):
-    def __init__(self):
+    def __init__(self, thread_safe=False):
         super(Forge, self).__init__()
+        # thread-safe forges may be replayed from several threads at once
+        self._queue_class = ThreadSafeForgeQueue if thread_safe else ForgeQueue
+        self.hooks = ForgeHooks(self)
         self.replacer = Replacer(self)
         self.attributes = AttributeManager(self)
+        self._fast_mocks = weakref.WeakValueDictionary()
         self.reset()
         self._id_allocator = itertools.count()
         self.debug = ForgeDebug(self)
+        self.stats = ForgeStats(self)
+        if config.stats:
+            self.stats.enable()
 
     def get_new_handle_id(self):
         return next(self._id_allocator)
@@ -34,13 +56,47 @@ class Forge(object):
 
     def replay(self):
         self._is_replaying = True
+        self.queue.compile()
 
     def reset(self):
         self._is_replaying = False
-        self.session_id = time.time()
-        self.queue = ForgeQueue(self)
-        self.stubs = StubManager(self)
+        self._replay_server = None
+        self.session_id = next(_session_ids)
+        queue = getattr(self, "queue", None)
+        if queue is not None and queue.can_clear():
+            # clearing in place keeps the queue (and hooks installed on it) instead of allocating new ones
+            queue.clear()
+            self.stubs.clear()
+        else:
+            if queue is not None:
+                queue.release()
+            self.queue = self._queue_class(self)
+            self.stubs = StubManager(self)
         self.attributes.reset_replay_attributes()
+        for mock in list(self._fast_mocks.values()):
+            uninstall_method_stubs(mock)
+
+    def recycle(self):
+        """Prepares the forge for reuse by an unrelated test: restores replacements, resets it and forgets
+        everything about the mocks created so far. Hook subscribers and stats are kept (ForgePool.release() drops
+        them too)"""
+        self.restore_all_replacements()
+        self.reset()
+        self.attributes.clear()
+        self._fast_mocks.clear()
+        self.debug.apply_config()
+
+    def capture_template(self):
+        return ForgeTemplate(self)
+
+    def load_template(self, template):
+        template.load(self)
+
+    def save_cassette(self, path, targets):
+        save_cassette(self, path, targets)
+
+    def load_cassette(self, path, targets, trusted_globals=()):
+        return load_cassette(self, path, targets, trusted_globals)
 
     @contextmanager
     def record_context(self):
@@ -54,32 +110,79 @@ class Forge(object):
         self.verify()
         self.reset()
 
+    @contextmanager
+    def multiprocess_replay(self):
+        """Replays, serving the events of worker processes forked inside the context from this forge's queue"""
+        self.replay()
+        server = self._replay_server = ReplayServer(self)
+        server.start()
+        try:
+            yield
+        finally:
+            server.stop()
+
+    def async_verified_replay_context(self):
+        return AsyncVerifiedReplayContext(self)
+
+    def task_queue(self):
+        return task_queue_context(self)
+
     def verify(self):
+        if self._replay_server is not None:
+            self._replay_server.verify()
         self.queue.verify()
 
+    def _created(self, mock):
+        if self.hooks:
+            self.hooks.emit("create", mock, description=mock.__forge__.describe())
+        return mock
+
     def create_function_stub(self, func, name=None):
-        return FunctionStub(self, func, name=name)
+        return self._created(FunctionStub(self, func, name=name))
 
     def create_wildcard_function_stub(self, name=None):
         return self.create_function_stub(WILDCARD_FUNCTION, name=name)
 
     def create_method_stub(self, method, name=None):
-        return FunctionStub(self, method, name=name)
+        return self._created(FunctionStub(self, method, name=name))
 
     def create_mock(self, mocked_class):
-        return ClassMockObject(self, mocked_class, behave_as_instance=True, hybrid=False)
+        return self._created(ClassMockObject(self, mocked_class, behave_as_instance=True, hybrid=False))
+
+    def create_fast_mock(self, mocked_class):
+        """Creates an instance mock whose method lookups are plain attribute hits after the first one"""
+        return self._created(get_fast_mock_class(mocked_class)(self, mocked_class))
+
+    def register_fast_mock(self, mock):
+        self._fast_mocks[mock.__forge__.id] = mock
 
     def create_hybrid_mock(self, mocked_class):
-        return ClassMockObject(self, mocked_class, behave_as_instance=True, hybrid=True)
+        return self._created(ClassMockObject(self, mocked_class, behave_as_instance=True, hybrid=True))
 
     def create_class_mock(self, mocked_class):
-        return ClassMockObject(self, mocked_class, behave_as_instance=False, hybrid=False)
+        return self._created(ClassMockObject(self, mocked_class, behave_as_instance=False, hybrid=False))
 
     def create_hybrid_class_mock(self, mocked_class):
-        return ClassMockObject(self, mocked_class, behave_as_instance=False, hybrid=True)
+        return self._created(ClassMockObject(self, mocked_class, behave_as_instance=False, hybrid=True))
+
+    def warm_up(self, *mocked_classes):
+        """Examines mocked_classes and parses their method signatures in advance, instead of on first use"""
+        for mocked_class in mocked_classes:
+            class_metadata_cache.warm_up(mocked_class)
 
     def create_wildcard_mock(self, name=None):
-        return WildcardMockObject(self, name=name)
+        return self._created(WildcardMockObject(self, name=name))
+
+    def create_spy(self, spied):
+        if is_function(spied) or is_bound_method(spied):
+            return self._created(SpyFunctionStub(self, spied, spied))
+        return self._created(SpyMockObject(self, spied))
+
+    def create_response_table(self, stub, responses=None):
+        returned = self.queue.push_out_of_band(ResponseTable(stub))
+        if responses is not None:
+            returned.update(responses)
+        return returned
     # arguments decorated to avoid conflicts with attrs
 
     def create_sentinel(__forge__self, __forge__name=None, **attrs):
@@ -100,6 +203,9 @@ class Forge(object):
     def replace_many(self, obj, *attr_names):
         return [self.replace(obj, attr_name) for attr_name in attr_names]
 
+    def replace_with_spy(self, obj, attr_name):
+        return self.replacer.replace_with_spy(obj, attr_name)
+
     def replace_with(self, obj, attr_name, replacement):
         return self.replacer.replace_with(obj, attr_name, replacement)
 
@@ -115,4 +221,9 @@ class Forge(object):
     def interleaved_order(self):
         return self.queue.get_interleaved_group_context()
 
+    def thread_affine_order(self):
+        """Expectations recorded in nested groups in this context are matched as in interleaved_order(), except
+        that each nested group is followed by the single thread which started it"""
+        return self.queue.get_thread_affine_group_context()
+
     group = ordered
@@ -3,14 +3,22 @@ try:
 except ImportError:
     from unittest import TestCase
 from .forge import Forge
+from .pool import forge_pool
 
 class ForgeTestCase(TestCase):
+    # set to True to take the forge from a process-wide pool instead of constructing one for each test
+    reuse_forge = False
     def setUp(self):
         super(ForgeTestCase, self).setUp()
-        self.forge = Forge()
+        if self.reuse_forge:
+            self.forge = forge_pool.acquire()
+        else:
+            self.forge = Forge()
     def tearDown(self):
         try:
             self.forge.verify()
         finally:
             self.forge.restore_all_replacements()
+            if self.reuse_forge:
+                forge_pool.release(self.forge)
         super(ForgeTestCase, self).tearDown()
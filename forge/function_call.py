@@ -1,23 +1,95 @@
 from numbers import Number
 from sentinels import NOTHING
+from .comparison_counter import comparison_counter
 from .exceptions import ConflictingActions
 from .queued_object import QueuedObject
 
+_NO_ACTIONS = ()
+
 
 class FunctionCall(QueuedObject):
+    # arguments are kept as a tuple of names shared with other calls of the same signature and a tuple of values,
+    # and actions only get lists once they are set, since most calls just return a value
+    __slots__ = ("target", "_arg_names", "_arg_values", "_call_funcs", "_call_funcs_with_args", "_return_value",
+                 "_raised_exception", "_min_times", "_max_times", "_num_matched")
+
     def __init__(self, target, args, kwargs, caller_info):
         super(FunctionCall, self).__init__(caller_info)
         self.target = target
-        self.args = target.__forge__.signature.get_normalized_args(args, kwargs)
-        self._call_funcs = []
-        self._call_funcs_with_args = []
-        self._return_value = NOTHING
-        self._raised_exception = NOTHING
+        self._arg_names, self._arg_values = target.__forge__.signature.get_compact_args(args, kwargs)
+        self._call_funcs = self._call_funcs_with_args = _NO_ACTIONS
+        self._return_value = self._raised_exception = NOTHING
+        # how many times the call is expected
+        self._min_times = self._max_times = 1
+        self._num_matched = 0
+
+    @property
+    def args(self):
+        """The normalized arguments of the call, as a dict from argument names (or indices of extra positional
+        arguments) to values"""
+        return dict(zip(self._arg_names, self._arg_values))
 
     def matches(self, call):
         if not isinstance(call, FunctionCall):
             return False
-        return self.target is call.target and self.args == call.args
+        return self.target is call.target and self._arg_names == call._arg_names and \
+            self._arg_values == call._arg_values
+
+    def get_match_key(self):
+        return id(self.target)
+
+    def get_expected(self):
+        return [self] if self._num_matched < self._min_times else []
+
+    def get_expected_count(self):
+        return 1 if self._num_matched < self._min_times else 0
+
+    def pop_matching(self, call):
+        if comparison_counter.count is not None:
+            comparison_counter.count += 1
+        if not self.matches(call):
+            return None
+        parent = self.get_parent()
+        if self._max_times is not None and self._num_matched + 1 >= self._max_times:
+            if parent is not None:
+                parent.discard_child(self)
+            self._num_matched += 1
+        else:
+            previous_expected_count = self.get_expected_count()
+            self._num_matched += 1
+            if parent is not None and previous_expected_count != self.get_expected_count():
+                parent.update_counts(self.get_expected_count() - previous_expected_count, 0)
+        return self
+
+    def times(self, num_times):
+        return self.between(num_times, num_times)
+
+    def at_least(self, min_times):
+        return self.between(min_times, None)
+
+    def at_most(self, max_times):
+        return self.between(0, max_times)
+
+    def between(self, min_times, max_times):
+        """Expects the call between min_times and max_times times (inclusive). max_times may be None for no limit."""
+        if min_times < 0 or (max_times is not None and (max_times < 1 or max_times < min_times)):
+            raise ValueError("Invalid number of expected calls: %s-%s" % (min_times, max_times))
+        previous_expected_count = self.get_expected_count()
+        self._min_times = min_times
+        self._max_times = max_times
+        parent = self.get_parent()
+        if parent is not None and previous_expected_count != self.get_expected_count():
+            parent.update_counts(self.get_expected_count() - previous_expected_count, 0)
+        return self
+
+    def _describe_times(self):
+        if self._max_times is None:
+            expected = "at least %s" % (self._min_times,)
+        elif self._min_times == self._max_times:
+            expected = "%s" % (self._min_times,)
+        else:
+            expected = "%s-%s" % (self._min_times, self._max_times)
+        return "expected %s times, called %s" % (expected, self._num_matched)
 
     def describe(self):
         return "%s(%s)" % (
@@ -25,11 +97,17 @@ class FunctionCall(QueuedObject):
             self._get_argument_string(),
             )
 
+    def __repr__(self):
+        if self._min_times == self._max_times == 1:
+            return super(FunctionCall, self).__repr__()
+        return "<%s (%s)>" % (self.describe(), self._describe_times())
+
     def _get_argument_string(self):
-        positional_args = sorted(k for k in self.args if isinstance(k, Number))
-        keyword_args = sorted(k for k in self.args if not isinstance(k, Number))
-        args = [repr(self.args[arg_index]) for arg_index in positional_args]
-        args.extend("%s=%r" % (arg_name, self.args[arg_name])
+        normalized_args = self.args
+        positional_args = sorted(k for k in normalized_args if isinstance(k, Number))
+        keyword_args = sorted(k for k in normalized_args if not isinstance(k, Number))
+        args = [repr(normalized_args[arg_index]) for arg_index in positional_args]
+        args.extend("%s=%r" % (arg_name, normalized_args[arg_name])
                     for arg_name in keyword_args)
         return ", ".join(args)
 
@@ -40,11 +118,15 @@ class FunctionCall(QueuedObject):
     def and_call(self, func, args=(), kwargs=None):
         if kwargs is None:
             kwargs = {}
+        if self._call_funcs is _NO_ACTIONS:
+            self._call_funcs = []
         self._call_funcs.append((func, list(args), kwargs))
         return self
     then_call = and_call
 
     def and_call_with_args(self, func):
+        if self._call_funcs_with_args is _NO_ACTIONS:
+            self._call_funcs_with_args = []
         self._call_funcs_with_args.append(func)
         return self
     then_call_with_args = and_call_with_args
@@ -75,3 +157,33 @@ class FunctionCall(QueuedObject):
         if self._return_value is not NOTHING:
             return self._return_value
         return None
+
+    def clone(self):
+        returned = super(FunctionCall, self).clone()
+        # actions may still be added to the copy, so it gets its own action lists
+        if self._call_funcs is not _NO_ACTIONS:
+            returned._call_funcs = list(self._call_funcs)
+        if self._call_funcs_with_args is not _NO_ACTIONS:
+            returned._call_funcs_with_args = list(self._call_funcs_with_args)
+        return returned
+
+    def __getstate__(self):
+        # pickled with the normalized arguments dict and action lists, which cassettes have always stored
+        returned = super(FunctionCall, self).__getstate__()
+        returned["args"] = self.args
+        del returned["_arg_names"], returned["_arg_values"]
+        returned["_call_funcs"] = list(self._call_funcs)
+        returned["_call_funcs_with_args"] = list(self._call_funcs_with_args)
+        return returned
+
+    def __setstate__(self, state):
+        state = dict(state)
+        normalized_args = state.pop("args")
+        self._min_times = self._max_times = 1
+        self._num_matched = 0
+        super(FunctionCall, self).__setstate__(state)
+        self._arg_names, self._arg_values = self.target.__forge__.signature.compact_normalized_args(normalized_args)
+        if not self._call_funcs:
+            self._call_funcs = _NO_ACTIONS
+        if not self._call_funcs_with_args:
+            self._call_funcs_with_args = _NO_ACTIONS
@@ -1,4 +1,6 @@
 class ForgeHandle(object):
+    # there is a handle per mock and stub, so they don't carry per-instance dicts
+    __slots__ = ("id", "forge", "_forced_description")
     def __init__(self, forge):
         super(ForgeHandle, self).__init__()
         self.id = forge.get_new_handle_id()
@@ -0,0 +1,174 @@
+import time
+from .exceptions import UnexpectedEvent, ExpectedEventsNotFound
+from .comparison_counter import comparison_counter
+
+_timer = getattr(time, "perf_counter", time.time)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class ForgeEvent(object):
+    """Describes something a forge did, as passed to hook subscribers.
+
+    kind is one of "create", "push_call", "push_setattr", "whenever", "pop", "mismatch", "verify", "replace" and
+    "restore". subject is the mock or stub created by one of the forge's create_*() methods for create events, the
+    queued call or setattr for queue events, or the replaced attribute's owner for replacer events.
+    latency is the time in seconds spent recording, matching or verifying, or None. queue_depth is the number of
+    queued expectations left after the event. comparisons is the number of expectations compared with a replayed
+    event, for "pop" and "mismatch" events."""
+
+    def __init__(self, kind, phase, subject, queue_depth, latency=None, description=None, comparisons=None):
+        super(ForgeEvent, self).__init__()
+        self.kind = kind
+        self.phase = phase
+        self.subject = subject
+        self.queue_depth = queue_depth
+        self.latency = latency
+        self.comparisons = comparisons
+        self._description = description
+
+    @property
+    def description(self):
+        # only computed if a subscriber asks for it
+        if self._description is None:
+            describe = getattr(self.subject, "describe", None)
+            self._description = describe() if describe is not None else repr(self.subject)
+        return self._description
+
+    def __repr__(self):
+        return "<%s %s event: %s>" % (self.phase, self.kind, self.description)
+
+
+class ForgeHooks(object):
+    """Subscribers of a forge's events. While there are none, the queue and replacer run their plain methods; the
+    first subscription installs instrumented ones on them, and the last unsubscription removes those again."""
+
+    def __init__(self, forge):
+        super(ForgeHooks, self).__init__()
+        self._forge = forge
+        self._subscribers = []
+
+    def subscribe(self, subscriber):
+        """subscriber is called with a ForgeEvent for every event. Returns subscriber, so this can be used as a
+        decorator"""
+        self._subscribers.append(subscriber)
+        if len(self._subscribers) == 1:
+            self._install()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.remove(subscriber)
+        if not self._subscribers:
+            self._uninstall()
+
+    def clear(self):
+        """Unsubscribes all subscribers"""
+        if self._subscribers:
+            del self._subscribers[:]
+            self._uninstall()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def emit(self, kind, subject, latency=None, description=None, comparisons=None):
+        queue = self._forge.queue
+        event = ForgeEvent(kind, REPLAY if self._forge.is_replaying() else RECORD, subject, len(queue),
+                           latency=latency, description=description, comparisons=comparisons)
+        for subscriber in list(self._subscribers):
+            subscriber(event)
+
+    def attach_queue(self, queue):
+        """Called for every new queue of the forge"""
+        if self._subscribers:
+            _instrument_queue(self, queue)
+
+    def _install(self):
+        if getattr(self._forge, "queue", None) is not None:
+            _instrument_queue(self, self._forge.queue)
+        _instrument_replacer(self, self._forge.replacer)
+
+    def _uninstall(self):
+        for obj, names in ((self._forge.queue, _QUEUE_METHOD_NAMES), (self._forge.replacer, _REPLACER_METHOD_NAMES)):
+            for name in names:
+                obj.__dict__.pop(name, None)
+
+
+_QUEUE_METHOD_NAMES = ("push_call", "push_setattr", "allow_whenever", "_pop_matching", "verify")
+_REPLACER_METHOD_NAMES = ("_replace_with", "_restore")
+
+
+def _instrument_queue(hooks, queue):
+    # instrumented methods are set on the instance, shadowing the plain methods of the class, which they call
+    queue_class = type(queue)
+
+    def instrumented_push_call(target, args, kwargs, caller_info):
+        start = _timer()
+        returned = queue_class.push_call(queue, target, args, kwargs, caller_info)
+        hooks.emit("push_call", returned, latency=_timer() - start)
+        return returned
+
+    def instrumented_push_setattr(target, name, value, caller_info):
+        start = _timer()
+        returned = queue_class.push_setattr(queue, target, name, value, caller_info)
+        hooks.emit("push_setattr", returned, latency=_timer() - start)
+        return returned
+
+    def instrumented_allow_whenever(queued_object):
+        queue_class.allow_whenever(queue, queued_object)
+        hooks.emit("whenever", queued_object)
+
+    def instrumented_pop_matching(queued_object, unexpected_class):
+        previous_count = comparison_counter.count
+        comparison_counter.count = 0
+        start = _timer()
+        try:
+            returned = queue_class._pop_matching(queue, queued_object, unexpected_class)
+        except UnexpectedEvent:
+            latency = _timer() - start
+            comparisons, comparison_counter.count = comparison_counter.count, previous_count
+            hooks.emit("mismatch", queued_object, latency=latency, comparisons=comparisons)
+            raise
+        except:
+            comparison_counter.count = previous_count
+            raise
+        latency = _timer() - start
+        comparisons, comparison_counter.count = comparison_counter.count, previous_count
+        hooks.emit("pop", returned, latency=latency, comparisons=comparisons)
+        return returned
+
+    def instrumented_verify():
+        start = _timer()
+        try:
+            queue_class.verify(queue)
+        except ExpectedEventsNotFound as e:
+            hooks.emit("verify", queue, latency=_timer() - start, description=str(e))
+            raise
+        hooks.emit("verify", queue, latency=_timer() - start, description="verified")
+
+    queue.push_call = instrumented_push_call
+    queue.push_setattr = instrumented_push_setattr
+    queue.allow_whenever = instrumented_allow_whenever
+    queue._pop_matching = instrumented_pop_matching
+    queue.verify = instrumented_verify
+
+
+def _instrument_replacer(hooks, replacer):
+    replacer_class = type(replacer)
+
+    def instrumented_replace_with(obj, attr_name, stub):
+        returned = replacer_class._replace_with(replacer, obj, attr_name, stub)
+        hooks.emit("replace", obj, description="%s.%s" % (_describe_owner(obj), attr_name))
+        return returned
+
+    def instrumented_restore(installed):
+        replacer_class._restore(replacer, installed)
+        hooks.emit("restore", installed.obj,
+                   description="%s.%s" % (_describe_owner(installed.obj), installed.method_name))
+
+    replacer._replace_with = instrumented_replace_with
+    replacer._restore = instrumented_restore
+
+
+def _describe_owner(obj):
+    return getattr(obj, "__name__", None) or "<%s instance>" % (type(obj).__name__,)
@@ -1,6 +1,8 @@
 from .handle import ForgeHandle
+from .stub import FunctionStub
 
 class MockHandle(ForgeHandle):
+    __slots__ = ("mock", "behaves_as_instance", "_attributes", "_is_hashable", "_is_setattr_enabled_in_replay")
     def __init__(self, forge, mock, behave_as_instance=True):
         super(MockHandle, self).__init__(forge)
         self.mock = mock
@@ -68,7 +70,7 @@ class MockHandle(ForgeHandle):
             self.describe(), name
             ))
     def _construct_stub(self, name, real_method):
-        return self.forge.create_method_stub(real_method)
+        return FunctionStub(self.forge, real_method)
     def _check_unrecorded_method_getting(self, name):
         raise NotImplementedError()
     def _check_getting_method_stub_without_recorded_calls(self, name, stub):
@@ -1,5 +1,6 @@
 from .exceptions import MockObjectUnhashable
 from .exceptions import UnexpectedEvent
+from .awaitable import resolved
 
 class MockObject(object):
     def __repr__(self):
@@ -10,7 +11,7 @@ class MockObject(object):
         if attr == '__forge__':
             self.__dict__[attr] = value
         else:
-            self.__forge__.set_attribute(attr, value, caller_info=self.__forge__.forge.debug.get_caller_info())
+            self.__forge__.set_attribute(attr, value, caller_info=_get_caller_info(self))
     def __hash__(self):
         if not self.__forge__.is_hashable():
             raise MockObjectUnhashable("%s is not hashable!" % (self,))
@@ -18,7 +19,7 @@ class MockObject(object):
     def __nonzero__(self):
         try:
             return self.__forge__.handle_special_method_call('__nonzero__', (), {},
-                                                             caller_info=self.__forge__.forge.debug.get_caller_info())
+                                                             caller_info=_get_caller_info(self))
         except TypeError:
             return True
     def __bool__(self):
@@ -27,11 +28,20 @@ class MockObject(object):
         if self.__forge__.forge.is_replaying() and isinstance(args[1], UnexpectedEvent):
             return
         return self.__forge__.handle_special_method_call('__exit__', args, {},
-                                                         caller_info=self.__forge__.forge.debug.get_caller_info())
+                                                         caller_info=_get_caller_info(self))
+    def __aexit__(self, *args):
+        if self.__forge__.forge.is_replaying() and isinstance(args[1], UnexpectedEvent):
+            return resolved(None)
+        return self.__forge__.handle_special_method_call('__aexit__', args, {},
+                                                         caller_info=_get_caller_info(self))
+def _get_caller_info(mock):
+    # caller info is only asked for while the mock's forge captures it
+    debug = mock.__forge__.forge.debug
+    return debug.get_caller_info(2) if debug.enabled else None
+
 def _get_special_method_placeholder(name):
     def placeholder(self, *args, **kwargs):
-        caller_info = self.__forge__.forge.debug.get_caller_info()
-        return self.__forge__.handle_special_method_call(name, args, kwargs, caller_info=caller_info)
+        return self.__forge__.handle_special_method_call(name, args, kwargs, caller_info=_get_caller_info(self))
     placeholder.__name__ = name
     return placeholder
 
@@ -45,6 +55,9 @@ for special_method_name in [
     '__call__',
     '__contains__',
     '__enter__',
+    '__aenter__',
+    '__aiter__',
+    '__anext__',
     ]:
     setattr(MockObject, special_method_name,
             _get_special_method_placeholder(special_method_name))
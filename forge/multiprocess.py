@@ -0,0 +1,189 @@
+import os
+import threading
+from itertools import chain
+from multiprocessing.connection import Listener, Client
+from .exceptions import UnexpectedCall, UnexpectedSetattr, UnexpectedEvent, RemoteReplayError
+from .function_call import FunctionCall
+from .setattr import Setattr
+from .queued_group import QueuedGroup
+from .queued_object import QueuedObject
+
+_MATCHED = "matched"
+_UNEXPECTED = "unexpected"
+_FAILED = "failed"
+_UNEXPECTED_CLASSES = {"call": UnexpectedCall, "setattr": UnexpectedSetattr}
+
+
+def _iter_leaves(node):
+    if isinstance(node, QueuedGroup):
+        for child in chain(node.get_children(), node.get_out_of_band_children()):
+            for leaf in _iter_leaves(child):
+                yield leaf
+    elif isinstance(node, QueuedObject):
+        yield node
+    else:
+        # whenever() decorators and response tables
+        for leaf in node.get_available():
+            yield leaf
+
+
+class _RemoteEvent(object):
+    """Stands for an event replayed by a worker in the errors kept by the parent, which only get its description"""
+    caller_info = None
+
+    def __init__(self, description):
+        super(_RemoteEvent, self).__init__()
+        self._description = description
+
+    def __str__(self):
+        return self._description
+
+
+class ReplayServer(object):
+    """Serves replayed events of forked worker processes from the parent's queue, so their calls consume the same
+    expectations as the parent's own calls, and a single verify() in the parent covers all of them.
+
+    The expectations must be recorded, and the server started, before the workers are forked. Workers match their
+    events against their own copy of the expectations, so arguments are compared in the worker as usual and never
+    leave it, and only send the ids of the matching expectations, which are the same in the parent. The parent
+    then consumes one of them, if the state of its queue allows it. Unexpected events of workers are also kept, and
+    raised by verify(), since workers may swallow them.
+
+    Requests of workers are handled one at a time, but if the parent also replays events at the same time, its
+    forge should be thread-safe."""
+
+    def __init__(self, forge):
+        super(ReplayServer, self).__init__()
+        self._queue = forge.queue
+        self._lock = threading.Lock()
+        self._parent_pid = os.getpid()
+        self._authkey = os.urandom(20)
+        self._listener = Listener(authkey=self._authkey)
+        self._connections = []
+        self._leaves = {}
+        self._stopped = False
+        self.errors = []
+
+    def start(self):
+        self._leaves = dict((id(leaf), leaf) for leaf in _iter_leaves(self._queue.get_root_group()))
+        self._install()
+        self._start_thread(self._accept_connections)
+
+    def _start_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+
+    def _install(self):
+        queue, queue_class, server = self._queue, type(self._queue), self
+        clients = {}
+
+        def get_client():
+            pid = os.getpid()
+            client = clients.get(pid)
+            if client is None:
+                client = clients[pid] = _ReplayClient(server._listener.address, server._authkey, queue)
+            return client
+
+        def pop_matching_call(target, args, kwargs, caller_info):
+            if os.getpid() == server._parent_pid:
+                return queue_class.pop_matching_call(queue, target, args, kwargs, caller_info)
+            return get_client().pop_matching("call", FunctionCall(target, args, kwargs, caller_info))
+
+        def pop_matching_setattr(target, name, value, caller_info):
+            if os.getpid() == server._parent_pid:
+                return queue_class.pop_matching_setattr(queue, target, name, value, caller_info)
+            return get_client().pop_matching("setattr", Setattr(target, name, value, caller_info))
+
+        queue.pop_matching_call = pop_matching_call
+        queue.pop_matching_setattr = pop_matching_setattr
+
+    def _accept_connections(self):
+        while True:
+            try:
+                connection = self._listener.accept()
+            except (OSError, IOError, EOFError):
+                return
+            if self._stopped:
+                connection.close()
+                return
+            self._connections.append(connection)
+            self._start_thread(self._serve, connection)
+
+    def _serve(self, connection):
+        while True:
+            try:
+                request = connection.recv()
+            except (OSError, IOError, EOFError):
+                return
+            connection.send(self._handle_request(*request))
+
+    def _handle_request(self, kind, candidate_ids, description):
+        with self._lock:
+            try:
+                for candidate_id in candidate_ids:
+                    popped = self._pop_candidate(candidate_id, kind)
+                    if popped is not None:
+                        return (_MATCHED, id(popped))
+                error = _UNEXPECTED_CLASSES[kind](self._queue.get_available(), _RemoteEvent(description))
+            except Exception as e:
+                self.errors.append(e)
+                return (_FAILED, "%s: %s" % (type(e).__name__, e))
+            self.errors.append(error)
+            return (_UNEXPECTED, [id(node) for node in error.expected])
+
+    def _pop_candidate(self, candidate_id, kind):
+        candidate = self._leaves.get(candidate_id)
+        if candidate is None:
+            raise RemoteReplayError("Expectation #%s is unknown to the replaying process" % (candidate_id,))
+        # a copy of the candidate carries the very objects it was recorded with, so it matches the candidate (or an
+        # identical expectation) whatever the arguments are
+        try:
+            return self._queue._pop_matching(candidate.clone(), _UNEXPECTED_CLASSES[kind])
+        except UnexpectedEvent:
+            return None
+
+    def verify(self):
+        """Raises the first error of the events replayed by workers, if any"""
+        if self.errors:
+            raise self.errors[0]
+
+    def stop(self):
+        self._stopped = True
+        self._queue.__dict__.pop("pop_matching_call", None)
+        self._queue.__dict__.pop("pop_matching_setattr", None)
+        try:
+            # wakes the accepting thread up
+            Client(self._listener.address, authkey=self._authkey).close()
+        except (OSError, IOError, EOFError):
+            pass
+        self._listener.close()
+        for connection in self._connections:
+            connection.close()
+
+
+class _ReplayClient(object):
+    def __init__(self, address, authkey, queue):
+        super(_ReplayClient, self).__init__()
+        self._connection = Client(address, authkey=authkey)
+        self._lock = threading.Lock()
+        # this process's copies of the expectations are at the same addresses as the parent's ones. They are only
+        # used for matching and for their actions, and never consumed here
+        self._leaves = {}
+        self._leaves_by_match_key = {}
+        for leaf in _iter_leaves(queue.get_root_group()):
+            self._leaves[id(leaf)] = leaf
+            self._leaves_by_match_key.setdefault(leaf.get_match_key(), []).append(leaf)
+
+    def pop_matching(self, kind, queued_object):
+        candidate_ids = [id(leaf) for leaf in self._leaves_by_match_key.get(queued_object.get_match_key(), ())
+                         if leaf.matches(queued_object)]
+        with self._lock:
+            self._connection.send((kind, candidate_ids, queued_object.describe()))
+            status, payload = self._connection.recv()
+        if status == _MATCHED:
+            return self._leaves[payload]
+        if status == _UNEXPECTED:
+            raise _UNEXPECTED_CLASSES[kind]([self._leaves[leaf_id] for leaf_id in payload if leaf_id in self._leaves],
+                                            queued_object)
+        raise RemoteReplayError(payload)
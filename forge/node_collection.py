@@ -0,0 +1,54 @@
+from itertools import islice
+
+_MIN_COMPACTION_SIZE = 32
+
+
+class NodeCollection(object):
+    """Sequence of queued nodes in push order. Each node holds a back-reference to its slot so it can be removed in
+    O(1): removed slots are emptied, the head cursor skips over them, and the storage is compacted lazily once most
+    of it is empty."""
+
+    def __init__(self):
+        super(NodeCollection, self).__init__()
+        self._nodes = []
+        self._head = 0
+        self._num_removed = 0
+
+    def append(self, node):
+        node._slot_collection = self
+        node._slot_index = len(self._nodes)
+        self._nodes.append(node)
+
+    def remove(self, node):
+        """Removes node from the collection. Returns False if it doesn't belong to it."""
+        if node._slot_collection is not self:
+            return False
+        nodes = self._nodes
+        nodes[node._slot_index] = None
+        node._slot_collection = node._slot_index = None
+        self._num_removed += 1
+        while self._head < len(nodes) and nodes[self._head] is None:
+            self._head += 1
+        if self._num_removed >= _MIN_COMPACTION_SIZE and self._num_removed * 2 > len(nodes):
+            self._compact()
+        return True
+
+    def _compact(self):
+        self._nodes = [node for node in islice(self._nodes, self._head, None) if node is not None]
+        for index, node in enumerate(self._nodes):
+            node._slot_index = index
+        self._head = self._num_removed = 0
+
+    def first(self):
+        if self._head < len(self._nodes):
+            return self._nodes[self._head]
+        return None
+
+    def __iter__(self):
+        return (node for node in islice(self._nodes, self._head, None) if node is not None)
+
+    def __len__(self):
+        return len(self._nodes) - self._num_removed
+
+    def __repr__(self):
+        return repr(list(self))
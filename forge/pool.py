@@ -0,0 +1,37 @@
+from .config import config
+from .forge import Forge
+from .tasks import unroute_attributes
+
+
+class ForgePool(object):
+    """Keeps forges that were released by tests, so later tests reuse them instead of constructing new ones.
+    Released forges are recycled (see Forge.recycle()), and their hook subscribers, stats and task routing are
+    dropped as well, so nothing recorded, replaced or subscribed in one test leaks into the next"""
+
+    def __init__(self):
+        super(ForgePool, self).__init__()
+        self._idle = []
+
+    def acquire(self):
+        if self._idle:
+            return self._idle.pop()
+        return Forge()
+
+    def release(self, forge):
+        forge.stats.disable()
+        forge.stats.clear()
+        forge.debug.disable_tracing()
+        forge.hooks.clear()
+        unroute_attributes(forge)
+        forge.recycle()
+        if config.stats:
+            forge.stats.enable()
+        self._idle.append(forge)
+
+    def clear(self):
+        del self._idle[:]
+
+    def __len__(self):
+        return len(self._idle)
+
+forge_pool = ForgePool()
@@ -0,0 +1,95 @@
+"""pytest integration: a ``forge`` fixture, verified and restored after each test like ForgeTestCase, and an
+optional report of the tests spending the most time in forge (--forge-slowest=N).
+
+Forges are taken from the process-wide pool, so each test reuses a recycled forge instead of constructing one.
+Overheads are attached to the test reports, so they are also collected from xdist workers.
+"""
+import pytest
+from .pool import forge_pool
+
+_PROPERTY_NAME = "forge_overhead"
+_REPORTER_NAME = "forge-overhead-reporter"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("forge")
+    group.addoption("--forge-slowest", type=int, default=0, metavar="N",
+                    help="show the N tests spending the most time in forge (recording, matching and verifying)")
+
+
+def pytest_configure(config):
+    if config.getoption("forge_slowest"):
+        config.pluginmanager.register(OverheadReporter(config.getoption("forge_slowest")), _REPORTER_NAME)
+
+
+@pytest.fixture
+def forge(request):
+    returned = forge_pool.acquire()
+    probe = None
+    if request.config.getoption("forge_slowest"):
+        probe = OverheadProbe(returned)
+    try:
+        yield returned
+        returned.verify()
+    finally:
+        if probe is not None:
+            request.node.user_properties.append((_PROPERTY_NAME, probe.finish()))
+        forge_pool.release(returned)
+
+
+class OverheadProbe(object):
+    """Measures what a single test spends in its forge, through the forge's hooks"""
+
+    def __init__(self, forge):
+        super(OverheadProbe, self).__init__()
+        self._forge = forge
+        self.record_time = self.match_time = self.verify_time = 0.0
+        self.peak_queue_size = 0
+        self.mocks_created = 0
+        forge.hooks.subscribe(self._handle_event)
+
+    def _handle_event(self, event):
+        if event.kind == "create":
+            self.mocks_created += 1
+        elif event.kind in ("push_call", "push_setattr"):
+            self.record_time += event.latency
+            self.peak_queue_size = max(self.peak_queue_size, event.queue_depth)
+        elif event.kind in ("pop", "mismatch"):
+            self.match_time += event.latency
+        elif event.kind == "verify":
+            self.verify_time += event.latency
+
+    def finish(self):
+        self._forge.hooks.unsubscribe(self._handle_event)
+        return dict(
+            record_time=self.record_time,
+            match_time=self.match_time,
+            verify_time=self.verify_time,
+            mocks_created=self.mocks_created,
+            peak_queue_size=self.peak_queue_size,
+            )
+
+
+class OverheadReporter(object):
+    def __init__(self, num_slowest):
+        super(OverheadReporter, self).__init__()
+        self._num_slowest = num_slowest
+        self._overheads = []
+
+    def pytest_runtest_logreport(self, report):
+        for name, value in report.user_properties:
+            if name == _PROPERTY_NAME:
+                self._overheads.append((report.nodeid, value))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        overheads = sorted(self._overheads, key=lambda item: _get_total(item[1]), reverse=True)
+        terminalreporter.write_sep("=", "slowest %s forge overheads" % (self._num_slowest,))
+        for nodeid, overhead in overheads[:self._num_slowest]:
+            terminalreporter.write_line(
+                "%.4fs total (record %.4fs, matching %.4fs, verify %.4fs) %4d mocks, peak queue %4d  %s" % (
+                    _get_total(overhead), overhead["record_time"], overhead["match_time"], overhead["verify_time"],
+                    overhead["mocks_created"], overhead["peak_queue_size"], nodeid))
+
+
+def _get_total(overhead):
+    return overhead["record_time"] + overhead["match_time"] + overhead["verify_time"]
@@ -11,10 +11,16 @@ if IS_PY3:
     basestring = str
     def getargspec(x):
         return inspect.getfullargspec(x)[:4]
+    def getfullargspec(x):
+        return inspect.getfullargspec(x)[:6]
+    from threading import get_ident as get_thread_ident
 else:
     iteritems = dict.iteritems
     from __builtin__ import xrange, basestring
+    from thread import get_ident as get_thread_ident
     getargspec = inspect.getargspec
+    def getfullargspec(x):
+        return tuple(inspect.getargspec(x)) + ([], None)
 
 def izip(*args, **kwargs):
     if IS_PY3:
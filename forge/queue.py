@@ -1,18 +1,23 @@
 import sys
+import threading
 import traceback
 import logging
 from contextlib import contextmanager
 
+from .comparison_counter import comparison_counter
 from .function_call import FunctionCall
 from .setattr import Setattr
-from .exceptions import UnexpectedCall, UnexpectedSetattr, ExpectedEventsNotFound
+from .exceptions import UnexpectedCall, UnexpectedSetattr, ExpectedEventsNotFound, InvalidTemplate
 from .queued_node import QueuedNode
-from .queued_group import OrderedGroup, AnyOrderGroup, InterleavedGroup
+from .queued_group import OrderedGroup, AnyOrderGroup, InterleavedGroup, ThreadAffineGroup
+from .replay_plan import ReplayPlan
 
 _logger = logging.getLogger("pyforge")
 
 
 class WheneverDecorator(QueuedNode):
+    __slots__ = ("obj",)
+
     def __init__(self, obj):
         super(WheneverDecorator, self).__init__()
         self.obj = obj
@@ -20,10 +25,21 @@ class WheneverDecorator(QueuedNode):
     def get_expected(self):
         return []
 
+    def get_expected_count(self):
+        return 0
+
+    def get_match_key(self):
+        return self.obj.get_match_key()
+
+    def clone(self):
+        return WheneverDecorator(self.obj)
+
     def get_available(self):
         return [self.obj]
 
     def pop_matching(self, queue_object):
+        if comparison_counter.count is not None:
+            comparison_counter.count += 1
         return self.obj if self.obj.matches(queue_object) else None
 
     def __len__(self):
@@ -38,7 +54,13 @@ class ForgeQueue(object):
         super(ForgeQueue, self).__init__()
         self._root_group = OrderedGroup()
         self._recording_group = self._root_group
+        self._plan = None
+        self._cleanups = []
         self._forge = forge
+        forge.hooks.attach_queue(self)
+
+    def get_root_group(self):
+        return self._root_group
 
     def get_expected(self):
         return self._root_group.get_expected()
@@ -47,18 +69,55 @@ class ForgeQueue(object):
         return self._root_group.get_available()
 
     def is_empty(self):
-        return not self._root_group.get_expected()
+        return not self._root_group.get_expected_count()
 
     def __len__(self):
         return len(self._root_group)
 
+    def can_clear(self):
+        """Whether clear() is safe, i.e. no ordering group context is open, which would restore its parent as
+        the recording group when closed"""
+        return self._recording_group is self._root_group
+
     def clear(self):
+        self.release()
         self._root_group = OrderedGroup()
         self._recording_group = self._root_group
+        self._plan = None
+
+    def add_cleanup(self, func):
+        """Registers func to be called when the queue is cleared or released, e.g. to close files the recorded
+        expectations are read from"""
+        self._cleanups.append(func)
+
+    def release(self):
+        cleanups, self._cleanups = self._cleanups, []
+        for func in reversed(cleanups):
+            func()
+
+    def clone(self):
+        """Returns a new queue holding a copy of the recorded expectations"""
+        if self._recording_group is not self._root_group:
+            raise InvalidTemplate("Cannot copy the queue while an ordering group is being recorded")
+        returned = type(self)(self._forge)
+        returned._root_group = returned._recording_group = self._root_group.clone()
+        return returned
+
+    def compile(self):
+        if self._plan is None:
+            self._plan = ReplayPlan(self._root_group)
+        return self._plan
 
     def allow_whenever(self, queued_object):
-        queued_object.get_parent().discard_child(queued_object)
-        self._recording_group.push_out_of_band(WheneverDecorator(queued_object))
+        parent = queued_object.get_parent()
+        if parent is not None:
+            parent.discard_child(queued_object)
+        self.push_out_of_band(WheneverDecorator(queued_object))
+
+    def push_out_of_band(self, obj):
+        if self._plan is not None:
+            self._plan.add_match_key(obj.get_match_key())
+        return self._recording_group.push_out_of_band(obj)
 
     def push_call(self, target, args, kwargs, caller_info):
         return self._push(FunctionCall(target, args, kwargs, caller_info))
@@ -66,6 +125,12 @@ class ForgeQueue(object):
     def push_setattr(self, target, name, value, caller_info):
         return self._push(Setattr(target, name, value, caller_info))
 
+    def push_group(self, group):
+        if self._plan is not None:
+            for match_key in group.iter_match_keys():
+                self._plan.add_match_key(match_key)
+        return self._recording_group.push(group)
+
     def pop_matching_call(self, target, args, kwargs, caller_info):
         return self._pop_matching(FunctionCall(target, args, kwargs, caller_info), UnexpectedCall)
 
@@ -73,10 +138,15 @@ class ForgeQueue(object):
         return self._pop_matching(Setattr(target, name, value, caller_info), UnexpectedSetattr)
 
     def _push(self, queued_object):
+        if self._plan is not None:
+            self._plan.add_match_key(queued_object.get_match_key())
         return self._recording_group.push(queued_object)
 
     def _pop_matching(self, queued_object, unexpected_class):
-        popped = self._root_group.pop_matching(queued_object)
+        if self._plan is not None:
+            popped = self._plan.pop_matching(queued_object)
+        else:
+            popped = self._root_group.pop_matching(queued_object)
         if popped is None:
             self._log_exception_context()
             raise unexpected_class(self.get_available(), queued_object)
@@ -110,11 +180,68 @@ class ForgeQueue(object):
     def get_interleaved_group_context(self):
         return self._get_group_context(InterleavedGroup)
 
+    def get_thread_affine_group_context(self):
+        return self._get_group_context(ThreadAffineGroup)
+
     def verify(self):
-        expected_events = self._root_group.get_expected()
-        if expected_events:
-            raise ExpectedEventsNotFound(expected_events)
+        if self._root_group.get_expected_count():
+            # all the remaining expectations are reported, not just the ones expected next
+            raise ExpectedEventsNotFound(self._root_group.get_all_expected())
 
     def __repr__(self):
         return "ForgeQueue(_root_group <id %s>=%s, _recording_group=<id %s>)" % (id(self._root_group),
             repr(self._root_group), id(self._recording_group))
+
+
+class ThreadSafeForgeQueue(ForgeQueue):
+    """Queue serializing all access to the expectations, for code under test which calls mocks from several
+    threads during replay. Recording (and opening ordering groups) is still expected to happen in a single thread"""
+
+    def __init__(self, forge):
+        self._lock = threading.RLock()
+        super(ThreadSafeForgeQueue, self).__init__(forge)
+
+    def get_expected(self):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self).get_expected()
+
+    def get_available(self):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self).get_available()
+
+    def clear(self):
+        with self._lock:
+            super(ThreadSafeForgeQueue, self).clear()
+
+    def clone(self):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self).clone()
+
+    def compile(self):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self).compile()
+
+    def allow_whenever(self, queued_object):
+        with self._lock:
+            super(ThreadSafeForgeQueue, self).allow_whenever(queued_object)
+
+    def push_out_of_band(self, obj):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self).push_out_of_band(obj)
+
+    def push_group(self, group):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self).push_group(group)
+
+    def _push(self, queued_object):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self)._push(queued_object)
+
+    def _pop_matching(self, queued_object, unexpected_class):
+        with self._lock:
+            return super(ThreadSafeForgeQueue, self)._pop_matching(queued_object, unexpected_class)
+
+    def verify(self):
+        with self._lock:
+            super(ThreadSafeForgeQueue, self).verify()
+
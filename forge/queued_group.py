@@ -1,45 +1,117 @@
-from itertools import chain
+import threading
+from itertools import chain, islice
 
 from .queued_node import QueuedNodeParent
+from .candidate_index import CandidateIndex
+from .node_collection import NodeCollection
 
 
 class QueuedGroup(QueuedNodeParent):
+    __slots__ = ("_parent_group", "_collection", "_out_of_band_collection", "_expected_count", "_length")
+
     def __init__(self, parent_group=None):
         super(QueuedGroup, self).__init__()
         self._parent_group = parent_group
-        self._collection = []
-        self._out_of_band_collection = []
+        self._collection = NodeCollection()
+        self._out_of_band_collection = NodeCollection()
+        self._expected_count = 0
+        self._length = 0
+
+    # whether children of the same group type can be merged into this group without changing its semantics
+    _absorbs_same_type_children = True
 
     def is_empty(self):
-        return not self.get_expected() and not self.get_available()
+        # empty child groups are always discarded, so having any leaves means having expected or available ones
+        return not self._length
+
+    def get_expected_count(self):
+        return self._expected_count
+
+    def update_counts(self, expected_delta, length_delta):
+        group = self
+        while group is not None:
+            group._expected_count += expected_delta
+            group._length += length_delta
+            group = group.get_parent()
 
     def get_expected(self):
         return list(chain.from_iterable(obj.get_expected() for obj in self.iter_expected_or_available_children()))
 
+    def get_all_expected(self):
+        return list(chain.from_iterable(obj.get_all_expected()
+                                        for obj in chain(self.get_children(), self.get_out_of_band_children())))
+
     def get_available(self):
         return list(chain.from_iterable(obj.get_available() for obj in self.iter_expected_or_available_children()))
 
     def iter_expected_or_available_children(self):
         raise NotImplementedError()  # pragma: no cover
 
+    def get_children(self):
+        return list(self._collection)
+
+    def get_out_of_band_children(self):
+        return list(self._out_of_band_collection)
+
+    def iter_match_keys(self):
+        return chain.from_iterable(obj.iter_match_keys()
+                                   for obj in chain(self._collection, self._out_of_band_collection))
+
+    def clone(self):
+        returned = type(self)()
+        for obj in self._collection:
+            returned.push(obj.clone())
+        for obj in self._out_of_band_collection:
+            returned.push_out_of_band(obj.clone())
+        return returned
+
+    def compile(self):
+        children = []
+        for obj in self._collection:
+            obj = obj.compile()
+            if self._can_absorb(obj):
+                children.extend(obj._collection)
+            else:
+                children.append(obj)
+        self._set_children(children)
+        if self.get_parent() is not None and len(children) == 1 and not self._out_of_band_collection:
+            return children[0]
+        return self
+
+    def _can_absorb(self, obj):
+        return self._absorbs_same_type_children and type(obj) is type(self) and not obj._out_of_band_collection
+
+    def _set_children(self, children):
+        self._collection = NodeCollection()
+        for obj in children:
+            self._collection.append(obj)
+            obj.set_parent(self)
+
     def push(self, obj):
         self._collection.append(obj)
         obj.set_parent(self)
+        self.update_counts(obj.get_expected_count(), len(obj))
         return obj
 
     def push_out_of_band(self, obj):
         self._out_of_band_collection.append(obj)
         obj.set_parent(self)
+        self.update_counts(obj.get_expected_count(), len(obj))
         return obj
 
     def pop_matching(self, queued_object):
         result = self._pop_matching_by_strategy(queued_object)
         if result is None:
             result = self.pop_matching_out_of_band(queued_object)
-        if result and self.get_parent() and not self.get_expected():
+        if result and self.get_parent() and not self._expected_count and not self._has_children():
             self.get_parent().discard_child(self)
         return result
 
+    def _has_children(self):
+        # children which are still here may be matched again (e.g. at_most() calls), so a satisfied group stays
+        # until it runs out of them. Exhausted calls and nested groups remove themselves
+        return bool(self._collection)
+
     def pop_matching_out_of_band(self, queued_object):
         for obj in self._out_of_band_collection:
             result = obj.pop_matching(queued_object)
@@ -49,13 +121,13 @@ class QueuedGroup(QueuedNodeParent):
 
     def discard_child(self, queued_object):
         for collection in (self._collection, self._out_of_band_collection):
-            for index, obj in enumerate(collection):
-                if obj is queued_object:
-                    collection.pop(index)
-                    return
+            if collection.remove(queued_object):
+                self.update_counts(-queued_object.get_expected_count(), -len(queued_object))
+                queued_object.set_parent(None)
+                return
 
     def __len__(self):
-        return sum(len(obj) for obj in chain(self._collection, self._out_of_band_collection))
+        return self._length
 
     def __repr__(self):
         return "%s <id %s>(%s, out_of_band=%s)" % (type(self).__name__, id(self), repr(self._collection),
@@ -63,21 +135,78 @@ class QueuedGroup(QueuedNodeParent):
 
 
 class OrderedGroup(QueuedGroup):
+    __slots__ = ()
+
     def iter_expected_or_available_children(self):
-        return chain(self._collection[:1], self._out_of_band_collection)
+        return chain(self._iter_leading_children(), self._out_of_band_collection)
+
+    def _iter_leading_children(self):
+        # children which are already satisfied (e.g. at_most() calls) can be skipped, so the following ones count too
+        for obj in self._collection:
+            yield obj
+            if obj.get_expected_count():
+                return
 
     def _pop_matching_by_strategy(self, queued_object):
-        return self._collection[0].pop_matching(queued_object) if self._collection else None
+        first = self._collection.first()
+        if first is None:
+            return None
+        result = first.pop_matching(queued_object)
+        if result is None and not first.get_expected_count():
+            return self._pop_matching_after_satisfied_children(queued_object)
+        return result
+
+    def _pop_matching_after_satisfied_children(self, queued_object):
+        children = self._iter_leading_children()
+        skipped = [next(children)]  # the first child was already tried
+        for obj in children:
+            result = obj.pop_matching(queued_object)
+            if result is not None:
+                for skipped_obj in skipped:
+                    self.discard_child(skipped_obj)
+                return result
+            skipped.append(obj)
+        return None
+
 
+class IndexedQueuedGroup(QueuedGroup):
+    """Base for groups that may match any of their children, keeping them indexed by match key."""
+
+    __slots__ = ("_index",)
 
-class AnyOrderGroup(QueuedGroup):
     def __init__(self, parent_group=None):
-        super(AnyOrderGroup, self).__init__(parent_group)
-        self._current_child = None
+        super(IndexedQueuedGroup, self).__init__(parent_group)
+        self._index = CandidateIndex()
 
     def iter_expected_or_available_children(self):
         return chain(self._collection, self._out_of_band_collection)
 
+    def push(self, obj):
+        returned = super(IndexedQueuedGroup, self).push(obj)
+        self._index.add(obj)
+        return returned
+
+    def discard_child(self, queued_object):
+        self._index.remove(queued_object)
+        return super(IndexedQueuedGroup, self).discard_child(queued_object)
+
+    def _set_children(self, children):
+        super(IndexedQueuedGroup, self)._set_children(children)
+        self._index = CandidateIndex()
+        for obj in children:
+            self._index.add(obj)
+
+
+class AnyOrderGroup(IndexedQueuedGroup):
+    __slots__ = ("_current_child",)
+
+    # nested any-order groups are matched atomically, so they can't be merged
+    _absorbs_same_type_children = False
+
+    def __init__(self, parent_group=None):
+        super(AnyOrderGroup, self).__init__(parent_group)
+        self._current_child = None
+
     def discard_child(self, queued_object):
         returned = super(AnyOrderGroup, self).discard_child(queued_object)
         if queued_object is self._current_child:
@@ -85,20 +214,27 @@ class AnyOrderGroup(QueuedGroup):
         return returned
 
     def _pop_matching_by_strategy(self, queued_object):
-        if self._current_child:
-            return self._current_child.pop_matching(queued_object)
-        else:
-            for obj in self._collection:
-                # Save the current child so if it removes itself we won't set it as as the current child anymore.
-                self._current_child = obj
-                try:
-                    result = obj.pop_matching(queued_object)
-                except:
-                    self._current_child = None
-                    raise
-                if result is not None:
-                    return result
+        current_child = self._current_child
+        if current_child is not None:
+            result = current_child.pop_matching(queued_object)
+            if result is not None or current_child.get_expected_count():
+                return result
+            # the current child is satisfied, so the other children may be matched from now on
             self._current_child = None
+        for obj in self._index.iter_candidates(queued_object):
+            # Save the current child so if it removes itself we won't set it as as the current child anymore.
+            self._current_child = obj
+            try:
+                result = obj.pop_matching(queued_object)
+            except:
+                self._current_child = None
+                raise
+            if result is not None:
+                if obj.get_match_key() is not None:
+                    # leaves that stay in the group (e.g. counted calls) don't hold it like nested groups do
+                    self._current_child = None
+                return result
+        self._current_child = None
         return None
 
     def __repr__(self):
@@ -106,12 +242,11 @@ class AnyOrderGroup(QueuedGroup):
                     id(self._current_child), repr(self._collection), repr(self._out_of_band_collection))
 
 
-class InterleavedGroup(QueuedGroup):
-    def iter_expected_or_available_children(self):
-        return chain(self._collection, self._out_of_band_collection)
+class InterleavedGroup(IndexedQueuedGroup):
+    __slots__ = ()
 
     def _pop_matching_by_strategy(self, queued_object):
-        for obj in self._collection:
+        for obj in self._index.iter_candidates(queued_object):
             result = obj.pop_matching(queued_object)
             if result is not None:
                 return result
@@ -120,3 +255,61 @@ class InterleavedGroup(QueuedGroup):
     def __repr__(self):
         return "%s <id %s>(%s, out_of_band=%s)" % (type(self).__name__, id(self), repr(self._collection),
                                                    repr(self._out_of_band_collection))
+
+
+class ThreadAffineGroup(IndexedQueuedGroup):
+    """Like an interleaved group, but each child (typically a nested ordered group) is followed by a single thread:
+    the thread which matched its first expectation owns it until it is done, and other threads can only start
+    children nobody owns. Concurrent workers can thus each follow their own expected sequence.
+
+    Owners are the thread objects themselves rather than their idents, which are reused once a thread exits. The
+    child of a thread which exited before finishing it is given up, so another thread may continue it."""
+
+    __slots__ = ("_children_by_owner", "_owners")
+
+    # nested thread-affine groups are owned as a whole, so they can't be merged
+    _absorbs_same_type_children = False
+
+    def __init__(self, parent_group=None):
+        super(ThreadAffineGroup, self).__init__(parent_group)
+        self._children_by_owner = {}
+        self._owners = {}
+
+    def compile(self):
+        super(ThreadAffineGroup, self).compile()
+        # a single child is still owned by one thread, so the group is never collapsed into it
+        return self
+
+    def discard_child(self, queued_object):
+        owner = self._owners.pop(id(queued_object), None)
+        if owner is not None:
+            del self._children_by_owner[owner]
+        return super(ThreadAffineGroup, self).discard_child(queued_object)
+
+    def _pop_matching_by_strategy(self, queued_object):
+        thread = threading.current_thread()
+        owned = self._children_by_owner.get(thread)
+        if owned is not None:
+            if owned.get_expected_count():
+                return owned.pop_matching(queued_object)
+            result = owned.pop_matching(queued_object)
+            if result is not None:
+                return result
+            # the owned child is satisfied, so the thread may move on to another one
+            self._release(owned)
+        for obj in self._index.iter_candidates(queued_object):
+            owner = self._owners.get(id(obj))
+            if owner is not None:
+                if owner.is_alive():
+                    continue
+                self._release(obj)
+            result = obj.pop_matching(queued_object)
+            if result is not None:
+                if obj.get_parent() is self and obj.get_match_key() is None:
+                    self._owners[id(obj)] = thread
+                    self._children_by_owner[thread] = obj
+                return result
+        return None
+
+    def _release(self, obj):
+        del self._children_by_owner[self._owners.pop(id(obj))]
@@ -1,10 +1,39 @@
+from .python3_compat import iteritems
+
+_slot_names = {}
+
+
+def get_slot_names(cls):
+    """Returns the names of the slots of cls and its bases"""
+    returned = _slot_names.get(cls)
+    if returned is None:
+        returned = _slot_names[cls] = tuple(
+            name for klass in reversed(cls.__mro__) for name in klass.__dict__.get("__slots__", ())
+            if name not in ("__weakref__", "__dict__"))
+    return returned
+
+
+def get_attributes(obj):
+    """Returns the attributes of obj, held in its slots (and in its dict, for subclasses that don't use slots)"""
+    returned = dict((name, getattr(obj, name)) for name in get_slot_names(type(obj)) if hasattr(obj, name))
+    returned.update(getattr(obj, "__dict__", ()))
+    return returned
+
+
 class QueuedNode(object):
     """Base class for all nodes in the call tree. A node may be an actual call or attribute set/get, in this case this
-    is a leaf node, or a call group (ordered, unordered, etc.), in that case it's a branch node."""
+    is a leaf node, or a call group (ordered, unordered, etc.), in that case it's a branch node.
+
+    Large suites record millions of nodes, so nodes keep their state in slots rather than in per-instance dicts."""
+
+    __slots__ = ("_parent", "_slot_collection", "_slot_index", "__weakref__")
 
     def __init__(self):
         super(QueuedNode, self).__init__()
         self._parent = None
+        # maintained by the NodeCollection holding this node
+        self._slot_collection = None
+        self._slot_index = None
 
     def get_parent(self):
         return self._parent
@@ -13,11 +42,46 @@ class QueuedNode(object):
         self._parent = parent
 
     def get_expected(self):
+        """Returns the leaves which are expected next (e.g. only the first child of an ordered group)"""
         return [self]
 
+    def get_all_expected(self):
+        """Returns all the expected leaves in the subtree, in order, whether they are expected next or not"""
+        return self.get_expected()
+
     def get_available(self):
         return [self]
 
+    def get_expected_count(self):
+        """Equivalent to len(self.get_all_expected()), without building any lists."""
+        return 1
+
+    def get_match_key(self):
+        """Returns a hashable key shared by all nodes that can possibly match each other, or None if the node
+        may match any event (e.g. groups)."""
+        return None
+
+    def iter_match_keys(self):
+        yield self.get_match_key()
+
+    def clone(self):
+        """Returns a copy of this node's subtree, not attached to any parent"""
+        raise NotImplementedError()  # pragma: no cover
+
+    def compile(self):
+        """Called once when replay starts. Returns the node that should take this node's place in its parent."""
+        return self
+
+    def __getstate__(self):
+        # nodes are pickled on their own (e.g. into cassettes), without their position in the tree
+        returned = get_attributes(self)
+        returned['_parent'] = returned['_slot_collection'] = returned['_slot_index'] = None
+        return returned
+
+    def __setstate__(self, state):
+        for name, value in iteritems(state):
+            setattr(self, name, value)
+
     def pop_matching(self, queue_object):
         """Provide the node with the opportunity to remove queue_object from its subtree. Usually called after
         a call to matches(queue_object) as been made.
@@ -27,5 +91,8 @@ class QueuedNode(object):
 
 class QueuedNodeParent(QueuedNode):
     """Base class for all non-leaf nodes."""
+
+    __slots__ = ()
+
     def discard_child(self, child):
         raise NotImplementedError()  # pragma: no cover
@@ -1,8 +1,13 @@
-from .queued_node import QueuedNode
+from .comparison_counter import comparison_counter
+from .python3_compat import iteritems
+from .queued_node import QueuedNode, get_attributes
 
 
 class QueuedObject(QueuedNode):
     """Base object for all leafs in the call tree."""
+
+    __slots__ = ("caller_info",)
+
     def __init__(self, caller_info):
         super(QueuedObject, self).__init__()
         self.caller_info = caller_info
@@ -20,7 +25,18 @@ class QueuedObject(QueuedNode):
     def __len__(self):
         return 1
 
+    def clone(self):
+        """Returns a detached copy of this node, sharing its recorded arguments and actions"""
+        returned = object.__new__(type(self))
+        for name, value in iteritems(get_attributes(self)):
+            setattr(returned, name, value)
+        returned.set_parent(None)
+        returned._slot_collection = returned._slot_index = None
+        return returned
+
     def pop_matching(self, queue_object):
+        if comparison_counter.count is not None:
+            comparison_counter.count += 1
         if not self.matches(queue_object):
             return None
 
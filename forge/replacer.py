@@ -1,5 +1,6 @@
 from contextlib import contextmanager
 from types import ModuleType
+from .class_metadata import class_metadata_cache
 from .utils import is_class
 from .utils import is_function
 from .utils import is_bound_method
@@ -16,13 +17,17 @@ class Replacer(object):
         replacement = self._get_replacement(replaced)
         self._set_replacement_description(replacement, obj, attr_name)
         return self._replace_with(obj, attr_name, replacement)
+    def replace_with_spy(self, obj, attr_name):
+        replacement = self.forge.create_spy(getattr(obj, attr_name))
+        self._set_replacement_description(replacement, obj, attr_name)
+        return self._replace_with(obj, attr_name, replacement).stub
     @contextmanager
     def replacing_context(self, obj, attr_name):
         installed = self._replace(obj, attr_name)
         try:
             yield None
         finally:
-            installed.restore()
+            self._restore(installed)
     def _get_replacement(self, replaced):
         if is_class(replaced):
             return self.forge.create_class_mock(replaced)
@@ -52,11 +57,13 @@ class Replacer(object):
         installed = InstalledStub(obj, attr_name, stub)
         self._stubs.append(installed)
         setattr(obj, attr_name, stub)
+        _invalidate_class_metadata(obj)
         return installed
     def restore_all(self):
         while self._stubs:
-            installed = self._stubs.pop(-1)
-            installed.restore()
+            self._restore(self._stubs.pop(-1))
+    def _restore(self, installed):
+        installed.restore()
 
 class InstalledStub(object):
     def __init__(self, obj, method_name, stub):
@@ -84,3 +91,8 @@ class Restorer(object):
 class SimpleRestorer(Restorer):
     def restore(self):
         setattr(self.obj, self.method_name, self.orig)
+        _invalidate_class_metadata(self.obj)
+
+def _invalidate_class_metadata(obj):
+    if is_class(obj):
+        class_metadata_cache.invalidate(obj)
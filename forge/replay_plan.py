@@ -0,0 +1,20 @@
+class ReplayPlan(object):
+    """Compiled form of the recorded expectations, built by ForgeQueue.compile() when replay starts.
+
+    Compiling merges nested ordered (or interleaved) groups into their parents and collapses groups holding a
+    single child, so replayed events go through as few groups as possible. The plan also knows the match keys of
+    everything that was recorded, so events no expectation can match are rejected without walking the tree."""
+
+    def __init__(self, root_group):
+        super(ReplayPlan, self).__init__()
+        self._root_group = root_group
+        self._root_group.compile()
+        self._match_keys = set(root_group.iter_match_keys())
+
+    def add_match_key(self, match_key):
+        self._match_keys.add(match_key)
+
+    def pop_matching(self, queued_object):
+        if queued_object.get_match_key() not in self._match_keys:
+            return None
+        return self._root_group.pop_matching(queued_object)
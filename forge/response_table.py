@@ -0,0 +1,137 @@
+from itertools import chain
+from operator import itemgetter
+from .comparison_counter import comparison_counter
+from .exceptions import InvalidResponseTableEntry
+from .function_call import FunctionCall
+from .python3_compat import IS_PY3, iteritems
+from .queued_node import QueuedNode
+
+# exact types whose equality is consistent with their hash, so looking them up in a dict gives the same result as
+# comparing them one by one. Anything else (comparators, custom __eq__) falls back to comparison
+_PLAIN_TYPES = set([int, float, complex, bool, type(None), str, bytes, type(u"")])
+if not IS_PY3:
+    _PLAIN_TYPES.add(long)
+
+
+def _is_plain(value):
+    value_type = type(value)
+    if value_type is tuple:
+        return all(_is_plain(item) for item in value)
+    return value_type in _PLAIN_TYPES
+
+
+def _get_lookup_key(call):
+    """Returns a hashable key for the arguments of call, or None if they can't be looked up by hash"""
+    for value in call._arg_values:
+        if not _is_plain(value):
+            return None
+    return (call._arg_names, call._arg_values)
+
+
+class ResponseTableEntry(FunctionCall):
+    """Expected call of a response table. Like whenever() calls, entries match any number of times"""
+
+    __slots__ = ()
+
+    def between(self, min_times, max_times):
+        raise InvalidResponseTableEntry("Response table entries cannot be counted, since they match any number "
+                                        "of times")
+
+
+class ResponseTable(QueuedNode):
+    """Out-of-band expectation holding many whenever()-like calls of a single stub. Calls with plain arguments
+    (numbers, strings, None and tuples of those) are found with a dict lookup, and only the others (e.g. ones
+    recorded with comparators) are compared one by one. As with whenever(), when several entries match a call,
+    the earliest one wins, so adding an entry with the same plain arguments as an existing one has no effect."""
+
+    # entries are kept as (index, call) pairs, the index being their position in the recording order
+    __slots__ = ("target", "_entries_by_key", "_fallback_entries", "_num_entries")
+
+    def __init__(self, target):
+        super(ResponseTable, self).__init__()
+        self.target = target
+        self._entries_by_key = {}
+        self._fallback_entries = []
+        self._num_entries = 0
+
+    def add(self, *args, **kwargs):
+        """Adds an entry for the given arguments and returns its expected call, on which actions such as
+        and_return() can be set"""
+        handle = self.target.__forge__
+        debug = handle.forge.debug
+        call = ResponseTableEntry(self.target, args, kwargs, debug.get_caller_info() if debug.enabled else None)
+        self._add_call(call)
+        handle.forge.stubs.mark_stub_recorded(self.target)
+        return call
+
+    def update(self, responses):
+        """Adds an entry per item of responses, a mapping from tuples of positional arguments to return values.
+        Keys which are not tuples are taken as a single positional argument"""
+        for args, return_value in iteritems(dict(responses)):
+            if type(args) is not tuple:
+                args = (args,)
+            self.add(*args).and_return(return_value)
+        return self
+
+    def _add_call(self, call):
+        entry = (self._num_entries, call)
+        self._num_entries += 1
+        key = _get_lookup_key(call)
+        if key is None:
+            self._fallback_entries.append(entry)
+        else:
+            self._entries_by_key.setdefault(key, entry)
+
+    def get_expected(self):
+        return []
+
+    def get_expected_count(self):
+        return 0
+
+    def get_available(self):
+        return [call for _, call in sorted(self._iter_entries(), key=itemgetter(0))]
+
+    def _iter_entries(self):
+        return chain(self._entries_by_key.values(), self._fallback_entries)
+
+    def get_match_key(self):
+        return id(self.target)
+
+    def clone(self):
+        returned = ResponseTable(self.target)
+        returned._entries_by_key = dict(self._entries_by_key)
+        returned._fallback_entries = list(self._fallback_entries)
+        returned._num_entries = self._num_entries
+        return returned
+
+    def pop_matching(self, queue_object):
+        if not isinstance(queue_object, FunctionCall) or queue_object.target is not self.target:
+            return None
+        counting = comparison_counter.count is not None
+        key = _get_lookup_key(queue_object)
+        if key is None:
+            # the replayed arguments may have their own notion of equality, so compare them with every entry
+            returned, candidates = None, self._iter_entries()
+        else:
+            # an earlier entry recorded with comparators may still take precedence over the looked up one
+            returned, candidates = self._entries_by_key.get(key), self._fallback_entries
+            if counting:
+                # the lookup counts as a single comparison
+                comparison_counter.count += 1
+        for entry in candidates:
+            if returned is not None and returned[0] < entry[0]:
+                if candidates is self._fallback_entries:
+                    break
+                continue
+            if counting:
+                comparison_counter.count += 1
+            if entry[1].matches(queue_object):
+                returned = entry
+        return None if returned is None else returned[1]
+
+    def __len__(self):
+        return 1
+
+    def __repr__(self):
+        return "<responses of %s (%s entries)>" % (self.target.__forge__.describe(),
+                                                   len(self._entries_by_key) + len(self._fallback_entries))
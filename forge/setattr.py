@@ -1,6 +1,7 @@
 from .queued_object import QueuedObject
 
 class Setattr(QueuedObject):
+    __slots__ = ("target", "name", "value")
     def __init__(self, target, name, value, caller_info):
         super(Setattr, self).__init__(caller_info)
         self.target = target
@@ -10,6 +11,8 @@ class Setattr(QueuedObject):
         if not isinstance(other, Setattr):
             return False
         return other.target is self.target and other.name == self.name and other.value == self.value
+    def get_match_key(self):
+        return (id(self.target), self.name)
     def describe(self):
         return "setattr(%r, %r, %r)" % (self.target, self.name, self.value)
     
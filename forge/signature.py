@@ -1,10 +1,12 @@
 import copy
 import itertools
-from .python3_compat import izip, iteritems, basestring, getargspec
+import weakref
+from types import MethodType
+from .python3_compat import izip, iteritems, basestring, getfullargspec
 from .exceptions import SignatureException, InvalidKeywordArgument
 from .utils import is_bound_method
 from .utils import is_class_method
-from numbers import Number
+from .utils import is_coroutine_function
 from sentinels import NOTHING
 
 class Argument(object):
@@ -20,7 +22,10 @@ class FunctionSignature(object):
         super(FunctionSignature, self).__init__()
         self.func = func
         self.func_name = func.__name__
+        self._is_coroutine_function = is_coroutine_function(func)
         self._build_arguments()
+    def is_coroutine_function(self):
+        return self._is_coroutine_function
     def is_bound_method(self):
         return is_bound_method(self.func)
     def is_class_method(self):
@@ -32,72 +37,166 @@ class FunctionSignature(object):
 
     def _build_arguments(self):
         self._args = []
+        self._keyword_only_args = []
         try:
-            args, varargs_name, kwargs_name, defaults = getargspec(self.func)[:4]
+            args, varargs_name, kwargs_name, defaults, keyword_only_args, keyword_only_defaults = getfullargspec(self.func)
         except TypeError:
             args = []
             varargs_name = 'args'
             kwargs_name = 'kwargs'
             defaults = []
+            keyword_only_args = []
+            keyword_only_defaults = None
         for arg_name, default in self._iter_args_and_defaults(args, defaults):
             self._args.append(Argument(arg_name, default))
+        keyword_only_defaults = keyword_only_defaults or {}
+        for arg_name in keyword_only_args:
+            self._keyword_only_args.append(Argument(arg_name, keyword_only_defaults.get(arg_name, NOTHING)))
         self._varargs_name = varargs_name
         self._kwargs_name = kwargs_name
+        self._num_positional_only_args = _get_num_positional_only_args(self.func)
+        self._build_binder()
+    def _build_binder(self):
+        # everything get_normalized_args needs is computed once here, since it runs for every recorded and
+        # replayed call
+        args = list(self.get_args())
+        num_positional_only = self._num_positional_only_args
+        if self.is_bound_method():
+            num_positional_only = max(0, num_positional_only - 1)
+        self._arg_names = tuple(arg.name for arg in args)
+        self._positional_only_arg_names = frozenset(self._arg_names[:num_positional_only])
+        self._keyword_arg_names = frozenset(self._arg_names[num_positional_only:]).union(
+            arg.name for arg in self._keyword_only_args)
+        self._required_arg_names = frozenset(arg.name for arg in itertools.chain(args, self._keyword_only_args)
+                                             if not arg.has_default())
+        # compacted arguments are kept in the order of the signature, and calls given the same arguments share the
+        # same tuple of names
+        self._ordered_arg_names = self._arg_names + tuple(arg.name for arg in self._keyword_only_args)
+        self._arg_name_prefixes = [self._arg_names[:num_args] for num_args in range(len(self._arg_names) + 1)]
+        self._interned_arg_names = dict((names, names) for names in self._arg_name_prefixes)
+        if any(not arg.has_default() for arg in self._keyword_only_args):
+            self._min_num_positional_args = len(self._arg_names) + 1
+        else:
+            self._min_num_positional_args = max([index + 1 for index, arg in enumerate(args) if not arg.has_default()]
+                                                or [0])
     def get_args(self):
         return itertools.islice(self._args, 1 if self.is_bound_method() else 0, None)
+    def get_keyword_only_args(self):
+        return iter(self._keyword_only_args)
     def get_num_args(self):
-        returned = len(self._args)
-        if self.is_bound_method():
-            returned = max(0, returned - 1)
-        return returned
+        return len(self._arg_names)
     def get_self_arg_name(self):
         if self.is_bound_method() and len(self._args) > 0:
             return self._args[0].name
         return None
     def get_arg_names(self):
-        return (arg.name for arg in self.get_args())
+        return iter(self._arg_names)
     def has_variable_args(self):
         return self._varargs_name is not None
     def has_variable_kwargs(self):
         return self._kwargs_name is not None
     def get_normalized_args(self, args, kwargs):
-        returned = {}
-        self._update_normalized_positional_args(returned, args)
-        self._update_normalized_kwargs(returned, kwargs)
-        self._check_missing_arguments(returned)
-        self._check_unknown_arguments(returned)
-        return returned
-    def _update_normalized_positional_args(self, returned, args):
-        argument_names = list(self.get_arg_names())
-        argument_names.extend(range(len(args) - self.get_num_args()))
-        for arg_name, given_arg in zip(argument_names, args):
-            returned[arg_name] = given_arg
-
-    def _update_normalized_kwargs(self, returned, kwargs):
+        arg_names = self._arg_names
+        returned = dict(izip(arg_names, args))
+        num_extra_args = len(args) - len(arg_names)
+        if num_extra_args > 0:
+            returned.update(enumerate(args[len(arg_names):]))
+        unknown = None
         for arg_name, arg in iteritems(kwargs):
-            if not isinstance(arg_name, basestring):
-                raise InvalidKeywordArgument("Invalid keyword argument %r" % (arg_name,))
+            if arg_name not in self._keyword_arg_names:
+                unknown = self._check_unexpected_keyword_argument(arg_name, unknown)
             if arg_name in returned:
                 raise SignatureException("%s is given more than once to %s" % (arg_name, self.func_name))
             returned[arg_name] = arg
-
-    def _check_missing_arguments(self, args_dict):
-        required_arguments = set(arg.name for arg in self.get_args() if not arg.has_default())
-        missing_arguments = required_arguments - set(args_dict)
-        if missing_arguments:
-            raise SignatureException("The following arguments were not specified: %s" % ",".join(map(repr, missing_arguments)))
-    def _check_unknown_arguments(self, args_dict):
-        positional_arg_count = len([arg_name for arg_name in args_dict if isinstance(arg_name, Number)])
-        num_args = self.get_num_args()
-        if positional_arg_count and not self.has_variable_args():
-            raise SignatureException("%s receives %s positional arguments (%s specified)" % (self.func_name, num_args, num_args + positional_arg_count))
-        unknown = set(arg for arg in args_dict if not isinstance(arg, Number)) - set(self.get_arg_names())
-        if unknown and not self.has_variable_kwargs():
+        for arg_name in self._required_arg_names:
+            if arg_name not in returned:
+                missing_arguments = self._required_arg_names.difference(returned)
+                raise SignatureException("The following arguments were not specified: %s" % ",".join(map(repr, missing_arguments)))
+        if num_extra_args > 0 and not self.has_variable_args():
+            raise SignatureException("%s receives %s positional arguments (%s specified)" % (self.func_name, len(arg_names), len(args)))
+        if unknown:
             raise SignatureException("%s received unknown argument(s): %s" % (self.func_name, ",".join(unknown)))
+        return returned
+    def get_compact_args(self, args, kwargs):
+        """Like get_normalized_args, but returns the arguments compacted by compact_normalized_args()"""
+        if not kwargs and self._min_num_positional_args <= len(args) <= len(self._arg_names):
+            # arguments given by position alone only need to be counted
+            return self._arg_name_prefixes[len(args)], tuple(args)
+        return self.compact_normalized_args(self.get_normalized_args(args, kwargs))
+    def compact_normalized_args(self, normalized_args):
+        """Returns a tuple of the names of normalized_args, in the order of the signature (followed by extra
+        positional and then keyword arguments, sorted), and a tuple of their values in the same order"""
+        names = [name for name in self._ordered_arg_names if name in normalized_args]
+        if len(names) != len(normalized_args):
+            extra_names = set(normalized_args).difference(names)
+            names.extend(sorted(name for name in extra_names if not isinstance(name, basestring)))
+            names.extend(sorted(name for name in extra_names if isinstance(name, basestring)))
+        names = self.intern_arg_names(tuple(names))
+        return names, tuple(normalized_args[name] for name in names)
+    def intern_arg_names(self, names):
+        return self._interned_arg_names.setdefault(names, names)
+    def _check_unexpected_keyword_argument(self, arg_name, unknown):
+        if not isinstance(arg_name, basestring):
+            raise InvalidKeywordArgument("Invalid keyword argument %r" % (arg_name,))
+        if self.has_variable_kwargs():
+            return unknown
+        if arg_name in self._positional_only_arg_names:
+            raise SignatureException("%s is a positional-only argument of %s" % (arg_name, self.func_name))
+        if unknown is None:
+            unknown = set()
+        unknown.add(arg_name)
+        return unknown
+    def _derive(self, func):
+        """Returns a copy of this signature for func, which is the function this signature was parsed from or a
+        method of it"""
+        returned = copy.copy(self)
+        returned.func = func
+        if returned.is_bound_method():
+            returned._build_binder()
+        return returned
     def copy(self):
         returned = copy.copy(self)
         returned._args = copy.deepcopy(returned._args)
+        returned._keyword_only_args = copy.deepcopy(returned._keyword_only_args)
         return returned
 
 
+def _get_num_positional_only_args(func):
+    code = getattr(getattr(func, "__func__", func), "__code__", None)
+    return getattr(code, "co_posonlyargcount", 0)
+
+class SignatureCache(object):
+    """Process-wide cache of parsed signatures, weakly keyed by the underlying function so that signatures of
+    methods bound to different objects (e.g. of many mocks of the same class) are parsed once. The cached entries
+    don't reference their function, so they don't keep it alive."""
+    def __init__(self):
+        super(SignatureCache, self).__init__()
+        self._signatures = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+    def get(self, func):
+        underlying = func.__func__ if isinstance(func, MethodType) else func
+        try:
+            returned = self._signatures.get(underlying)
+        except TypeError:
+            # not weakly referenceable or not hashable
+            self.misses += 1
+            return FunctionSignature(func)
+        if returned is None:
+            self.misses += 1
+            returned = self._signatures[underlying] = FunctionSignature(underlying)._derive(None)
+        else:
+            self.hits += 1
+        return returned._derive(func)
+    def get_stats(self):
+        return dict(hits=self.hits, misses=self.misses, size=len(self._signatures))
+    def clear(self):
+        self._signatures.clear()
+        self.hits = self.misses = 0
+    def __len__(self):
+        return len(self._signatures)
+
+signature_cache = SignatureCache()
 
+def get_signature(func):
+    return signature_cache.get(func)
@@ -0,0 +1,74 @@
+from .class_mock import ClassMockObject
+from .class_mock_handle import ClassMockHandle
+from .stub import FunctionStub
+from .stub_handle import StubHandle
+from .utils import is_class
+
+
+class SpyStubHandle(StubHandle):
+    """Stub handle that forwards recorded calls to the spied callable, and records its actual outcome as the
+    expected call's return value or raised exception."""
+    __slots__ = ("spied",)
+
+    def __init__(self, forge, stub, original, spied, name=None):
+        super(SpyStubHandle, self).__init__(forge, stub, original, name=name)
+        self.spied = spied
+
+    def _handle_recorded_call(self, args, kwargs, caller_info):
+        expected_call = super(SpyStubHandle, self)._handle_recorded_call(args, kwargs, caller_info)
+        try:
+            returned = self.spied(*args, **kwargs)
+        except Exception as e:
+            expected_call.and_raise(e)
+            self.forge.stubs.mark_stub_recorded(self.stub)
+            raise
+        expected_call.and_return(returned)
+        return returned
+
+
+class SpyFunctionStub(FunctionStub):
+    def __init__(self, forge, original, spied, name=None):
+        self._spied = spied
+        super(SpyFunctionStub, self).__init__(forge, original, name=name)
+
+    def _create_handle(self, forge, original, name):
+        return SpyStubHandle(forge, self, original, self._spied, name=name)
+
+
+class SpyMockHandle(ClassMockHandle):
+    __slots__ = ("spied",)
+
+    def __init__(self, forge, mock, spied):
+        behave_as_instance = not is_class(spied)
+        mocked_class = type(spied) if behave_as_instance else spied
+        super(SpyMockHandle, self).__init__(forge, mock, mocked_class, behave_as_instance, hybrid=False)
+        self.spied = spied
+
+    def _describe(self):
+        return "<Spy of %r>" % (self._get_class_description(),)
+
+    def _construct_stub(self, name, real_method):
+        return SpyFunctionStub(self.forge, real_method, self._get_spied_method(name))
+
+    def _get_spied_method(self, name):
+        if name == '__call__' and not self.behaves_as_instance:
+            return self.spied
+        return getattr(self.spied, name)
+
+    def get_attribute(self, attr):
+        try:
+            return super(SpyMockHandle, self).get_attribute(attr)
+        except AttributeError:
+            if self.forge.is_replaying():
+                raise
+        # data attributes of the spied object are captured, so they are available during replay as well
+        returned = getattr(self.spied, attr)
+        self._set_attribute(attr, returned)
+        return returned
+
+
+class SpyMockObject(ClassMockObject):
+    def __init__(self, forge, spied):
+        # ClassMockObject's constructor is skipped, since it would create a regular handle
+        super(ClassMockObject, self).__init__()
+        self.__forge__ = SpyMockHandle(forge, self, spied)
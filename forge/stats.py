@@ -0,0 +1,167 @@
+import json
+import weakref
+from .response_table import ResponseTableEntry
+from .setattr import Setattr
+
+_SORT_KEYS = ("match_time", "replayed", "recorded", "candidates_compared", "mismatched")
+
+
+class StubStats(object):
+    """Counters of a single stub (or of the attribute setting of a mock), accumulated over all sessions"""
+
+    def __init__(self, name):
+        super(StubStats, self).__init__()
+        self.name = name
+        self.recorded = 0
+        self.replayed = 0
+        self.mismatched = 0
+        self.whenever_hits = 0
+        self.match_time = 0.0
+        self.candidates_compared = 0
+
+    def get_whenever_hit_ratio(self):
+        if not self.replayed:
+            return 0.0
+        return self.whenever_hits / float(self.replayed)
+
+    def get_candidates_per_pop(self):
+        pops = self.replayed + self.mismatched
+        if not pops:
+            return 0.0
+        return self.candidates_compared / float(pops)
+
+    def merge(self, other):
+        self.recorded += other.recorded
+        self.replayed += other.replayed
+        self.mismatched += other.mismatched
+        self.whenever_hits += other.whenever_hits
+        self.match_time += other.match_time
+        self.candidates_compared += other.candidates_compared
+
+    def as_dict(self):
+        return dict(
+            recorded=self.recorded,
+            replayed=self.replayed,
+            mismatched=self.mismatched,
+            whenever_hits=self.whenever_hits,
+            whenever_hit_ratio=self.get_whenever_hit_ratio(),
+            match_time=self.match_time,
+            candidates_compared=self.candidates_compared,
+            candidates_per_pop=self.get_candidates_per_pop(),
+            )
+
+    def __repr__(self):
+        return "<StubStats %s: %s recorded, %s replayed, %.6fs matching>" % (
+            self.name, self.recorded, self.replayed, self.match_time)
+
+
+class ForgeStats(object):
+    """Replay statistics of a forge, collected from its hooks between enable() and disable(). Stubs are
+    keyed by their description, so stats of several forges (e.g. one per test) can be merged into a single
+    profile of the whole suite."""
+
+    def __init__(self, forge, label=None):
+        super(ForgeStats, self).__init__()
+        self._forge_ref = weakref.ref(forge)
+        self.label = label
+        self._stubs = {}
+        self._whenever_calls = weakref.WeakSet()
+        self.verifications = 0
+        self.verify_time = 0.0
+        self._enabled = False
+
+    def enable(self):
+        if not self._enabled:
+            self._enabled = True
+            self._forge_ref().hooks.subscribe(self._handle_event)
+
+    def disable(self):
+        if self._enabled:
+            self._enabled = False
+            self._forge_ref().hooks.unsubscribe(self._handle_event)
+
+    def is_enabled(self):
+        return self._enabled
+
+    def __getitem__(self, name):
+        return self._stubs[name]
+
+    def __iter__(self):
+        return iter(self._stubs.values())
+
+    def __len__(self):
+        return len(self._stubs)
+
+    def _get_stub_stats(self, queued_object):
+        target = queued_object.target
+        name = target.__forge__.describe()
+        if isinstance(queued_object, Setattr):
+            name = "%s.%s" % (name, queued_object.name)
+        returned = self._stubs.get(name)
+        if returned is None:
+            returned = self._stubs[name] = StubStats(name)
+        return returned
+
+    def _handle_event(self, event):
+        kind = event.kind
+        if kind == "pop":
+            stats = self._get_stub_stats(event.subject)
+            stats.replayed += 1
+            stats.match_time += event.latency
+            stats.candidates_compared += event.comparisons or 0
+            # response table entries match any number of times, like whenever() calls
+            if event.subject in self._whenever_calls or isinstance(event.subject, ResponseTableEntry):
+                stats.whenever_hits += 1
+        elif kind == "mismatch":
+            stats = self._get_stub_stats(event.subject)
+            stats.mismatched += 1
+            stats.match_time += event.latency
+            stats.candidates_compared += event.comparisons or 0
+        elif kind in ("push_call", "push_setattr"):
+            self._get_stub_stats(event.subject).recorded += 1
+        elif kind == "whenever":
+            self._whenever_calls.add(event.subject)
+        elif kind == "verify":
+            self.verifications += 1
+            self.verify_time += event.latency
+
+    def merge(self, other):
+        for stats in other:
+            own = self._stubs.get(stats.name)
+            if own is None:
+                own = self._stubs[stats.name] = StubStats(stats.name)
+            own.merge(stats)
+        self.verifications += other.verifications
+        self.verify_time += other.verify_time
+
+    def get_hottest(self, count=10, key="match_time"):
+        """Returns the count stubs with the highest value of key: match_time, replayed, recorded,
+        candidates_compared or mismatched"""
+        if key not in _SORT_KEYS:
+            raise ValueError("Cannot sort stub stats by %r" % (key,))
+        return sorted(self._stubs.values(), key=lambda stats: getattr(stats, key), reverse=True)[:count]
+
+    def get_totals(self):
+        returned = StubStats(None)
+        for stats in self._stubs.values():
+            returned.merge(stats)
+        return returned
+
+    def as_dict(self, hottest=10):
+        totals = self.get_totals().as_dict()
+        totals.update(verifications=self.verifications, verify_time=self.verify_time)
+        return dict(
+            label=self.label,
+            totals=totals,
+            stubs=dict((name, stats.as_dict()) for name, stats in self._stubs.items()),
+            hottest=[stats.name for stats in self.get_hottest(hottest)],
+            )
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def clear(self):
+        self._stubs.clear()
+        self.verifications = 0
+        self.verify_time = 0.0
+
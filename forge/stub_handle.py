@@ -1,16 +1,20 @@
 from .handle import ForgeHandle
-from .signature import FunctionSignature
+from .signature import get_signature
 from .bound_signature_adapter import BoundSignatureAdapter
+from .awaitable import Awaitable
 
 class StubHandle(ForgeHandle):
+    __slots__ = ("stub", "name", "original", "signature", "_call_count", "_call_count_session_id", "get_caller_info")
+
     def __init__(self, forge, stub, original, name=None):
         super(StubHandle, self).__init__(forge)
         self.stub = stub
         self.name = name
         self.original = original
-        self.signature = FunctionSignature(self.original)
+        self.signature = get_signature(self.original)
         self._call_count = 0
         self._call_count_session_id = 0
+        self.get_caller_info = forge.debug.get_caller_info
 
     @property
     def call_count(self):
@@ -30,7 +34,7 @@ class StubHandle(ForgeHandle):
         return self.signature.is_bound_method()
 
     def handle_call(self, args, kwargs, caller_info):
-        if self.forge.is_recording():
+        if not self.forge.is_replaying():
             returned = self._handle_recorded_call(args, kwargs, caller_info)
             self.forge.stubs.mark_stub_recorded(self.stub)
             return returned
@@ -42,8 +46,10 @@ class StubHandle(ForgeHandle):
 
     def _handle_replay_call(self, args, kwargs, caller_info):
         expected_call = self.forge.queue.pop_matching_call(self.stub, args, kwargs, caller_info)
-        return_value = expected_call.get_return_value()
         self._increment_call_count()
+        if self.signature.is_coroutine_function():
+            return Awaitable(lambda: _get_call_result(expected_call, args, kwargs), description=self.describe())
+        return_value = expected_call.get_return_value()
         #might raise...
         expected_call.do_side_effects(args, kwargs)
         return return_value
@@ -56,3 +62,8 @@ class StubHandle(ForgeHandle):
 
     def has_recorded_calls(self):
         return self.forge.stubs.was_stub_recorded(self.stub)
+
+def _get_call_result(expected_call, args, kwargs):
+    return_value = expected_call.get_return_value()
+    expected_call.do_side_effects(args, kwargs)
+    return return_value
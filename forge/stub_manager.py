@@ -1,4 +1,5 @@
 from collections import defaultdict
+from .python3_compat import iteritems
 
 class StubManager(object):
     def __init__(self, forge):
@@ -11,6 +12,17 @@ class StubManager(object):
         self._initialized_method_stubs[mock.__forge__.id][method_name] = method
     def has_initialized_method_stub(self, mock, method_name):
         return self.get_initialized_method_stub_or_none(mock, method_name) is not None
+    def iter_initialized_method_stubs(self, mock):
+        return iteritems(self._initialized_method_stubs[mock.__forge__.id])
+    def clear(self):
+        self._initialized_method_stubs.clear()
+        self._recorded_method_stubs.clear()
+    def clone(self, forge):
+        returned = StubManager(forge)
+        for mock_id, method_stubs in iteritems(self._initialized_method_stubs):
+            returned._initialized_method_stubs[mock_id] = dict(method_stubs)
+        returned._recorded_method_stubs = set(self._recorded_method_stubs)
+        return returned
     def mark_stub_recorded(self, stub):
         self._recorded_method_stubs.add(stub.__forge__.id)
     def was_stub_recorded(self, stub):
@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+try:
+    import contextvars
+except ImportError:  # python < 3.7
+    contextvars = None
+
+# forge attributes which are held per task inside task_queue_context()
+_ROUTED_ATTRIBUTES = ("queue", "stubs", "_is_replaying")
+
+if contextvars is not None:
+    # maps ids of forges to the attributes of the current task. The mapping is copied rather than changed when a
+    # context is entered, so it doesn't leak into other tasks holding the same mapping
+    _task_states = contextvars.ContextVar("forge_task_states", default={})
+
+_routed_classes = {}
+
+
+@contextmanager
+def task_queue_context(forge):
+    """Gives the current asyncio task (or thread) its own queue and replay state in forge, so concurrent tasks can
+    each record and replay their own expectations with the same mocks. Tasks started inside the context share
+    it"""
+    if contextvars is None:
+        raise RuntimeError("Task queues require the contextvars module (python 3.7 and later)")
+    _route_attributes(forge)
+    state = {"queue": forge._queue_class(forge), "stubs": forge.stubs.clone(forge), "_is_replaying": False}
+    states = dict(_task_states.get())
+    states[id(forge)] = state
+    token = _task_states.set(states)
+    try:
+        yield
+    finally:
+        _task_states.reset(token)
+
+
+def _route_attributes(forge):
+    # forges are only switched to a class looking up the routed attributes per task once they are actually used
+    # with task queues, so other forges don't pay for the lookup
+    forge_class = type(forge)
+    if forge_class in _routed_classes.values():
+        return
+    routed_class = _routed_classes.get(forge_class)
+    if routed_class is None:
+        routed_class = _routed_classes[forge_class] = type(forge_class.__name__, (forge_class,), dict(
+            (name, _get_routed_property(name)) for name in _ROUTED_ATTRIBUTES))
+    forge.__class__ = routed_class
+
+
+def unroute_attributes(forge):
+    """Switches forge back to its own class, once it is no longer used with task queues"""
+    for forge_class, routed_class in _routed_classes.items():
+        if type(forge) is routed_class:
+            forge.__class__ = forge_class
+            return
+
+
+def _get_routed_property(name):
+    def getter(forge):
+        state = _task_states.get().get(id(forge))
+        if state is None:
+            try:
+                return forge.__dict__[name]
+            except KeyError:
+                raise AttributeError(name)
+        return state[name]
+
+    def setter(forge, value):
+        state = _task_states.get().get(id(forge))
+        if state is None:
+            forge.__dict__[name] = value
+        else:
+            state[name] = value
+    return property(getter, setter)
@@ -0,0 +1,26 @@
+from .exceptions import InvalidTemplate
+
+
+class ForgeTemplate(object):
+    """Snapshot of everything recorded in a forge so far: the expectation queue, the initialized method stubs and
+    the attributes set on mocks. Loading a template is much cheaper than running the recording code again, since
+    recorded calls are copied without normalizing their arguments, and their arguments are shared. Templates refer to
+    the mocks of the forge that recorded them, so they can only be loaded into that forge."""
+
+    def __init__(self, forge):
+        super(ForgeTemplate, self).__init__()
+        if forge.is_replaying():
+            raise InvalidTemplate("Templates can only be captured while recording")
+        self.forge = forge
+        self._queue = forge.queue.clone()
+        self._stubs = forge.stubs.clone(forge)
+        self._record_attributes = forge.attributes.get_record_attributes()
+
+    def load(self, forge):
+        if forge is not self.forge:
+            raise InvalidTemplate("Templates can only be loaded into the forge that recorded them, since the mocks "
+                                  "they refer to belong to it. Tests sharing a template should share its forge too")
+        forge.reset()
+        forge.queue = self._queue.clone()
+        forge.stubs = self._stubs.clone(forge)
+        forge.attributes.set_record_attributes(self._record_attributes)
@@ -1,6 +1,9 @@
+import inspect
 from types import *
 from .python3_compat import xrange, IS_PY3
 
+_iscoroutinefunction = getattr(inspect, "iscoroutinefunction", None)
+
 def renumerate(collection):
     for index in xrange(len(collection) - 1, -1, -1):
         yield (index, collection[index])
@@ -16,6 +19,8 @@ def is_class_method(obj):
     if not is_bound_method(obj):
         return False
     return is_class(obj.__self__)
+def is_coroutine_function(obj):
+    return _iscoroutinefunction is not None and _iscoroutinefunction(obj)
 
 ### some useful shortcuts
 class EXPECTING(object):
@@ -1,8 +1,10 @@
 from .mock_handle import MockHandle
 from .constants import WILDCARD_DESCRIPTION
 from .dtypes import WILDCARD_FUNCTION
+from .stub import FunctionStub
 
 class WildcardMockHandle(MockHandle):
+    __slots__ = ("__name__",)
     def __init__(self, forge, mock, name=None):
         super(WildcardMockHandle, self).__init__(forge, mock)
         self.__name__ = name
@@ -16,7 +18,7 @@ class WildcardMockHandle(MockHandle):
     def _get_real_method(self, name):
         return WILDCARD_FUNCTION
     def _construct_stub(self, name, real_method):
-        return self.forge.create_method_stub(real_method, name=name)
+        return FunctionStub(self.forge, real_method, name=name)
     def _check_unrecorded_method_getting(self, name):
         self._raise_attribute_error(name)
     def _check_getting_method_stub_without_recorded_calls(self, name, stub):
@@ -29,5 +29,6 @@ setup(name="pyforge",
       url="http://github.com/vmalloc/pyforge",
       version=__version__,
       install_requires=_INSTALL_REQUIREMENTS,
+      entry_points={"pytest11": ["pyforge = forge.pytest_plugin"]},
       packages=find_packages(exclude=["tests"])
       )
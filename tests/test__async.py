@@ -0,0 +1,170 @@
+import sys
+import unittest
+from .ut_utils import ForgeTestCase
+from forge import UnexpectedCall, ExpectedEventsNotFound
+from forge.awaitable import Awaitable
+
+# async syntax is kept out of the module itself, so it can still be imported by interpreters lacking it
+_ASYNC_SOURCE = """
+import asyncio
+
+class Connection(object):
+    async def fetch(self, key):
+        raise NotImplementedError()
+
+    def close(self):
+        raise NotImplementedError()
+
+    async def __aenter__(self):
+        raise NotImplementedError()
+
+    async def __aexit__(self, *args):
+        raise NotImplementedError()
+
+    def __aiter__(self):
+        raise NotImplementedError()
+
+    async def __anext__(self):
+        raise NotImplementedError()
+
+async def fetch_both(connection):
+    return [await connection.fetch(1), await connection.fetch(2)]
+
+async def fetch_inside_context(connection):
+    async with connection as entered:
+        return entered, await connection.fetch(1)
+
+async def iterate(connection):
+    return [value async for value in connection]
+
+async def run_workers(forge, connection, count):
+    results = {}
+    async def worker(index):
+        with forge.task_queue():
+            connection.fetch(index).and_return(index * 10)
+            forge.replay()
+            # let the other tasks record and replay in between
+            await asyncio.sleep(0)
+            results[index] = await connection.fetch(index)
+            forge.verify()
+    await asyncio.gather(*[worker(index) for index in range(count)])
+    return results
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+"""
+
+_has_async_syntax = sys.version_info >= (3, 6)
+if _has_async_syntax:
+    _namespace = {}
+    exec(compile(_ASYNC_SOURCE, "<async test helpers>", "exec"), _namespace)
+    Connection = _namespace["Connection"]
+
+
+def _get_result(awaitable):
+    try:
+        next(iter(awaitable.__await__()))
+    except StopIteration as e:
+        return e.args[0] if e.args else None
+    raise AssertionError("awaitable suspended")  # pragma: no cover
+
+
+class AwaitableTest(ForgeTestCase):
+    def test__result(self):
+        awaitable = Awaitable(lambda: 2)
+        self.assertEquals(_get_result(awaitable), 2)
+        with self.assertRaises(RuntimeError):
+            awaitable.__await__()
+
+
+@unittest.skipUnless(_has_async_syntax, "async syntax is not supported")
+class AsyncStubTest(ForgeTestCase):
+    def setUp(self):
+        super(AsyncStubTest, self).setUp()
+        self.connection = self.forge.create_mock(Connection)
+
+    def _run(self, name, *args):
+        return _namespace["run"](_namespace[name](*args))
+
+    def test__coroutine_methods_return_awaitables(self):
+        self.connection.fetch(1).and_return("a")
+        self.connection.close()
+        self.forge.replay()
+        awaitable = self.connection.fetch(1)
+        self.assertIsInstance(awaitable, Awaitable)
+        self.assertEquals(_get_result(awaitable), "a")
+        self.assertIsNone(self.connection.close())
+
+    def test__awaiting(self):
+        self.connection.fetch(1).and_return("a")
+        self.connection.fetch(2).and_return("b")
+        self.forge.replay()
+        self.assertEquals(self._run("fetch_both", self.connection), ["a", "b"])
+
+    def test__exceptions_are_raised_when_awaited(self):
+        self.connection.fetch(1).and_raise(KeyError(1))
+        self.forge.replay()
+        awaitable = self.connection.fetch(1)
+        with self.assertRaises(KeyError):
+            _get_result(awaitable)
+
+    def test__unexpected_calls_are_raised_when_called(self):
+        self.forge.replay()
+        with self.assertRaises(UnexpectedCall):
+            self.connection.fetch(1)
+
+    def test__async_context_manager(self):
+        self.connection.__aenter__().and_return(self.connection)
+        self.connection.fetch(1).and_return("a")
+        self.connection.__aexit__(None, None, None)
+        self.forge.replay()
+        self.assertEquals(self._run("fetch_inside_context", self.connection), (self.connection, "a"))
+
+    def test__async_iteration(self):
+        self.connection.__aiter__().and_return(self.connection)
+        self.connection.__anext__().and_return(1)
+        self.connection.__anext__().and_return(2)
+        self.connection.__anext__().and_raise(StopAsyncIteration())
+        self.forge.replay()
+        self.assertEquals(self._run("iterate", self.connection), [1, 2])
+
+    def test__async_verified_replay_context(self):
+        self.connection.fetch(1).and_return("a")
+        context = self.forge.async_verified_replay_context()
+        _get_result(context.__aenter__())
+        self.assertTrue(self.forge.is_replaying())
+        with self.assertRaises(ExpectedEventsNotFound):
+            _get_result(context.__aexit__(None, None, None))
+        self.assertEquals(_get_result(self.connection.fetch(1)), "a")
+        self.assertFalse(_get_result(context.__aexit__(None, None, None)))
+        self.assertTrue(self.forge.is_recording())
+
+
+@unittest.skipUnless(sys.version_info >= (3, 7), "contextvars is not available")
+class TaskQueueTest(ForgeTestCase):
+    def setUp(self):
+        super(TaskQueueTest, self).setUp()
+        self.connection = self.forge.create_mock(Connection)
+
+    def test__tasks_drive_their_own_queues(self):
+        results = _namespace["run"](_namespace["run_workers"](self.forge, self.connection, 3))
+        self.assertEquals(results, {0: 0, 1: 10, 2: 20})
+        # the shared queue is untouched
+        self.assertTrue(self.forge.is_recording())
+        self.assertTrue(self.forge.queue.is_empty())
+
+    def test__task_queue_outside_tasks(self):
+        self.connection.close()
+        with self.forge.task_queue():
+            self.assertTrue(self.forge.queue.is_empty())
+            self.forge.replay()
+            with self.assertRaises(UnexpectedCall):
+                self.connection.close()
+        self.assertFalse(self.forge.is_replaying())
+        self.assertEquals(len(self.forge.queue), 1)
+        self.forge.reset()
+
@@ -0,0 +1,176 @@
+import os
+import shutil
+import tempfile
+from .ut_utils import ForgeTestCase
+from forge import Forge, UnexpectedCall, UnexpectedSetattr, ExpectedEventsNotFound, CassetteError
+from forge.cassette import CassetteGroup
+
+
+class Connection(object):
+    def send(self, data):
+        raise NotImplementedError()  # pragma: no cover
+
+    def receive(self):
+        raise NotImplementedError()  # pragma: no cover
+
+
+def get_status(name):
+    raise NotImplementedError()  # pragma: no cover
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class CassetteTest(ForgeTestCase):
+    def setUp(self):
+        super(CassetteTest, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "cassette")
+
+    def tearDown(self):
+        super(CassetteTest, self).tearDown()
+        shutil.rmtree(self.tempdir)
+
+    def _create_targets(self, forge):
+        return {"connection": forge.create_mock(Connection), "get_status": forge.create_function_stub(get_status)}
+
+    def _record_and_save(self, record):
+        forge = Forge()
+        targets = self._create_targets(forge)
+        record(forge, **targets)
+        forge.save_cassette(self.path, targets)
+
+    def _load(self, trusted_globals=()):
+        targets = self._create_targets(self.forge)
+        self.forge.load_cassette(self.path, targets, trusted_globals)
+        return targets["connection"], targets["get_status"]
+
+    def test__round_trip(self):
+        def record(forge, connection, get_status):
+            connection.send(b"hello")
+            connection.receive().and_return(b"welcome")
+            get_status.when("server").then_return("up")
+            with forge.any_order():
+                connection.send(b"a")
+                connection.send(data=b"b")
+            connection.__forge__.expect_setattr("timeout", 10)
+            connection.receive().and_raise(ProtocolError("bye"))
+        self._record_and_save(record)
+        connection, get_status = self._load(trusted_globals=[ProtocolError])
+        self.forge.replay()
+        connection.send(b"hello")
+        self.assertEquals(get_status("server"), "up")
+        with self.assertRaises(UnexpectedCall):
+            connection.send(b"a")
+        self.assertEquals(connection.receive(), b"welcome")
+        connection.send(b"b")
+        connection.send(b"a")
+        with self.assertRaises(UnexpectedSetattr):
+            connection.timeout = 20
+        connection.timeout = 10
+        with self.assertRaises(ProtocolError):
+            connection.receive()
+        self.assertEquals(get_status("server"), "up")
+        self.forge.verify()
+
+    def test__targets_as_arguments_and_return_values(self):
+        def record(forge, connection, get_status):
+            get_status(connection).and_return(connection.send)
+        self._record_and_save(record)
+        connection, get_status = self._load()
+        self.forge.replay()
+        self.assertIs(get_status(connection), connection.send)
+
+    def test__expectations_are_loaded_lazily(self):
+        num_calls = 1000
+        def record(forge, connection, get_status):
+            for i in range(num_calls):
+                connection.send(i)
+        self._record_and_save(record)
+        connection, _ = self._load()
+        [group] = self.forge.queue.get_root_group().get_children()
+        self.assertIsInstance(group, CassetteGroup)
+        self.assertEquals(len(self.forge.queue), num_calls)
+        self.forge.replay()
+        self.assertLess(len(list(group._collection)), num_calls)
+        for i in range(num_calls // 2):
+            connection.send(i)
+        with self.assertRaises(ExpectedEventsNotFound):
+            self.forge.verify()
+        for i in range(num_calls // 2, num_calls):
+            connection.send(i)
+
+    def test__recording_around_cassette(self):
+        self._record_and_save(lambda forge, connection, get_status: connection.send(2))
+        connection, _ = self._load()
+        connection.send(3)
+        self.forge.replay()
+        with self.assertRaises(UnexpectedCall):
+            connection.send(3)
+        connection.send(2)
+        connection.send(3)
+
+    def test__unknown_target(self):
+        forge = Forge()
+        targets = self._create_targets(forge)
+        forge.create_mock(Connection).send(1)
+        with self.assertRaises(CassetteError):
+            forge.save_cassette(self.path, targets)
+
+    def test__missing_target(self):
+        self._record_and_save(lambda forge, connection, get_status: get_status(1))
+        with self.assertRaises(CassetteError):
+            self.forge.load_cassette(self.path, {"connection": self.forge.create_mock(Connection)})
+
+    def test__targets_as_sequence(self):
+        forge = Forge()
+        stub = forge.create_function_stub(get_status)
+        stub(1).and_return(2)
+        forge.save_cassette(self.path, [stub])
+        stub = self.forge.create_function_stub(get_status)
+        self.forge.load_cassette(self.path, [stub])
+        self.forge.replay()
+        self.assertEquals(stub(1), 2)
+
+    def test__not_a_cassette(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\x80\x02}q\x00.")
+        with self.assertRaises(CassetteError):
+            self._load()
+
+    def test__untrusted_globals_are_rejected(self):
+        self._record_and_save(lambda forge, connection, get_status: connection.receive().and_raise(ProtocolError()))
+        with self.assertRaises(CassetteError):
+            self._load()
+        with open(self.path, "wb") as f:
+            f.write(b"\x80\x02cos\nsystem\nq\x00X\x04\x00\x00\x00trueq\x01\x85q\x02Rq\x03.")
+        with self.assertRaises(CassetteError):
+            self._load()
+
+    def test__trusted_globals(self):
+        self._record_and_save(lambda forge, connection, get_status: connection.receive().and_raise(ProtocolError()))
+        connection, _ = self._load(trusted_globals=[ProtocolError])
+        self.forge.replay()
+        with self.assertRaises(ProtocolError):
+            connection.receive()
+
+    def test__reset_closes_the_cassette(self):
+        def record(forge, connection, get_status):
+            for i in range(1000):
+                connection.send(i)
+        self._record_and_save(record)
+        connection, _ = self._load()
+        [close] = self.forge.queue._cleanups
+        cassette_file = close.__self__._file
+        self.forge.replay()
+        connection.send(0)
+        self.assertFalse(cassette_file.closed)
+        self.forge.reset()
+        self.assertTrue(cassette_file.closed)
+
+    def test__cannot_load_during_replay(self):
+        self._record_and_save(lambda forge, connection, get_status: None)
+        self.forge.replay()
+        with self.assertRaises(CassetteError):
+            self._load()
@@ -0,0 +1,136 @@
+import gc
+from .ut_utils import ForgeTestCase
+from forge.class_metadata import ClassMetadataCache, class_metadata_cache, METHOD, CLASS_METHOD, STATIC_METHOD, MEMBER
+from forge.signature import signature_cache
+
+
+class Base(object):
+    value = 2
+
+    def method(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+    @classmethod
+    def class_method(cls, a):
+        raise NotImplementedError()  # pragma: no cover
+
+    @staticmethod
+    def static_method(a):
+        raise NotImplementedError()  # pragma: no cover
+
+
+class Derived(Base):
+    pass
+
+
+class ClassMetadataTest(ForgeTestCase):
+    def setUp(self):
+        super(ClassMetadataTest, self).setUp()
+        self.cache = ClassMetadataCache()
+
+    def test__kinds(self):
+        metadata = self.cache.get(Derived)
+        self.assertEquals(metadata.get_kind("method"), METHOD)
+        self.assertEquals(metadata.get_kind("class_method"), CLASS_METHOD)
+        self.assertEquals(metadata.get_kind("static_method"), STATIC_METHOD)
+        self.assertEquals(self.cache.get(Base).get_kind("static_method"), STATIC_METHOD)
+        self.assertEquals(metadata.get_kind("value"), MEMBER)
+        self.assertIsNone(metadata.get_kind("missing"))
+        self.assertFalse(metadata.is_callable())
+
+    def test__shared_by_mocks(self):
+        self.assertIs(class_metadata_cache.get(Base), class_metadata_cache.get(Base))
+        first = self.forge.create_mock(Base)
+        second = self.forge.create_mock(Base)
+        self.assertIs(first.__forge__._metadata, second.__forge__._metadata)
+
+    def test__invalidate(self):
+        metadata = self.cache.get(Derived)
+        self.assertEquals(metadata.get_kind("value"), MEMBER)
+        metadata.get_kind("method")
+        self.cache.invalidate(Base)
+        self.assertEquals(metadata._kinds, {})
+        self.assertEquals(metadata.get_kind("value"), MEMBER)
+
+    def test__changed_classes_are_classified_again(self):
+        class Changed(Base):
+            pass
+        metadata = self.cache.get(Changed)
+        self.assertIsNone(metadata.get_kind("g"))
+        self.assertEquals(metadata.get_kind("value"), MEMBER)
+        self.assertEquals(metadata.get_kind("method"), METHOD)
+        Changed.g = lambda self, x: None
+        Changed.value = lambda self: 3
+        Changed.method = 4
+        self.assertEquals(metadata.get_kind("g"), METHOD)
+        self.assertEquals(metadata.get_kind("value"), METHOD)
+        self.assertEquals(metadata.get_kind("method"), MEMBER)
+        del Changed.method
+        self.assertEquals(metadata.get_kind("method"), METHOD)
+
+    def test__mocks_of_changed_classes(self):
+        class Changed(Base):
+            pass
+        mock = self.forge.create_mock(Changed)
+        with self.assertRaises(AttributeError):
+            mock.g
+        self.assertEquals(mock.value, 2)
+        Changed.g = lambda self, x: None
+        Changed.value = lambda self: 3
+        mock = self.forge.create_mock(Changed)
+        mock.g(1)
+        mock.value().and_return(3)
+        self.forge.replay()
+        mock.g(1)
+        self.assertEquals(mock.value(), 3)
+        self.forge.verify()
+
+    def test__inherited_static_methods(self):
+        mock = self.forge.create_mock(Derived)
+        mock.static_method(1).and_return(2)
+        class_mock = self.forge.create_class_mock(Derived)
+        class_mock.static_method(3).and_return(4)
+        self.forge.replay()
+        self.assertEquals(mock.static_method(1), 2)
+        self.assertEquals(class_mock.static_method(3), 4)
+        self.forge.verify()
+
+    def test__classified_once_while_unchanged(self):
+        metadata = self.cache.get(Derived)
+        classified = []
+        original_classify = metadata._classify
+        metadata._classify = lambda name, value: classified.append(name) or original_classify(name, value)
+        for _ in range(3):
+            for name in ("method", "class_method", "static_method", "value"):
+                metadata.get_kind(name)
+        self.assertEquals(sorted(classified), ["class_method", "method", "static_method", "value"])
+
+    def test__replacing_invalidates(self):
+        mock = self.forge.create_mock(Base)
+        self.assertTrue(mock.__forge__.has_nonmethod_class_member("value"))
+        self.forge.replace_with(Base, "value", lambda self: None)
+        self.assertFalse(mock.__forge__.has_nonmethod_class_member("value"))
+        self.forge.restore_all_replacements()
+        self.assertTrue(mock.__forge__.has_nonmethod_class_member("value"))
+
+    def test__warm_up(self):
+        class Wide(object):
+            pass
+        for index in range(20):
+            setattr(Wide, "method_%s" % (index,), lambda self, a: None)
+        self.forge.warm_up(Wide)
+        previous_misses = signature_cache.misses
+        mock = self.forge.create_mock(Wide)
+        mock.method_3(1)
+        self.forge.replay()
+        mock.method_3(1)
+        self.assertEquals(signature_cache.misses, previous_misses)
+
+    def test__classes_are_weakly_referenced(self):
+        class Temporary(Base):
+            pass
+        self.cache.get(Temporary).get_kind("class_method")
+        self.assertEquals(len(self.cache), 1)
+        del Temporary
+        gc.collect()
+        self.assertEquals(len(self.cache), 0)
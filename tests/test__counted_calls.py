@@ -0,0 +1,154 @@
+from .ut_utils import ForgeTestCase
+from forge import UnexpectedCall, ExpectedEventsNotFound
+
+
+class Obj(object):
+    def poll(self):
+        raise NotImplementedError()  # pragma: no cover
+
+    def f(self, value):
+        raise NotImplementedError()  # pragma: no cover
+
+
+class CountedCallsTest(ForgeTestCase):
+    def setUp(self):
+        super(CountedCallsTest, self).setUp()
+        self.obj = self.forge.create_mock(Obj)
+
+    def test__times(self):
+        self.obj.poll().times(1000).and_return(None)
+        self.obj.f(1)
+        self.assertEquals(len(self.forge.queue), 2)
+        self.forge.replay()
+        for _ in range(999):
+            self.obj.poll()
+        with self.assertRaises(UnexpectedCall):
+            self.obj.f(1)
+        self.obj.poll()
+        with self.assertRaises(UnexpectedCall):
+            self.obj.poll()
+        self.obj.f(1)
+
+    def test__times_not_reached(self):
+        self.obj.poll().times(3)
+        self.forge.replay()
+        self.obj.poll()
+        self.obj.poll()
+        with self.assertRaises(ExpectedEventsNotFound) as caught:
+            self.forge.verify()
+        self.assertIn("expected 3 times, called 2", str(caught.exception))
+        self.obj.poll()
+
+    def test__at_least(self):
+        self.obj.poll().at_least(2).and_return(1)
+        self.obj.f(1)
+        self.forge.replay()
+        self.assertEquals(self.obj.poll(), 1)
+        with self.assertRaises(UnexpectedCall):
+            self.obj.f(1)
+        for _ in range(10):
+            self.assertEquals(self.obj.poll(), 1)
+        self.obj.f(1)
+        with self.assertRaises(UnexpectedCall):
+            self.obj.poll()
+
+    def test__at_most(self):
+        self.obj.poll().at_most(2)
+        self.obj.f(1)
+        self.forge.replay()
+        self.obj.poll()
+        self.obj.f(1)
+        with self.assertRaises(UnexpectedCall):
+            self.obj.poll()
+
+    def test__at_most_skipped_entirely(self):
+        self.obj.f(1)
+        self.obj.poll().at_most(2)
+        self.obj.poll().at_most(2)
+        self.obj.f(2)
+        self.forge.replay()
+        self.obj.f(1)
+        with self.assertRaises(UnexpectedCall) as caught:
+            self.obj.f(3)
+        self.assertEquals(len(caught.exception.expected), 3)
+        self.obj.f(2)
+        self.forge.verify()
+
+    def test__at_most_at_end(self):
+        self.obj.poll().at_most(2)
+        self.forge.replay()
+        self.forge.verify()
+
+    def test__between_in_any_order_group(self):
+        with self.forge.any_order():
+            self.obj.poll().between(1, 3)
+            self.obj.f(1)
+        self.obj.f(2)
+        self.forge.replay()
+        self.obj.poll()
+        self.obj.poll()
+        self.obj.f(1)
+        # the group is satisfied, but keeps the remaining allowance until the enclosing group moves past it
+        self.obj.poll()
+        with self.assertRaises(UnexpectedCall):
+            self.obj.poll()
+        self.obj.f(2)
+        with self.assertRaises(UnexpectedCall):
+            self.obj.f(1)
+
+    def test__at_most_in_nested_groups(self):
+        for group_context in (self.forge.any_order, self.forge.interleaved_order):
+            with group_context():
+                self.obj.f(1).at_most(3)
+                self.obj.f(5).at_most(2)
+            self.obj.poll()
+            self.forge.replay()
+            self.obj.f(1)
+            self.obj.f(5)
+            self.obj.f(1)
+            self.obj.f(1)
+            with self.assertRaises(UnexpectedCall):
+                self.obj.f(1)
+            self.obj.poll()
+            with self.assertRaises(UnexpectedCall):
+                self.obj.f(5)
+            self.forge.verify()
+            self.forge.reset()
+
+    def test__at_least_in_nested_groups(self):
+        for group_context in (self.forge.any_order, self.forge.interleaved_order):
+            with group_context():
+                self.obj.f(1).at_least(1)
+                self.obj.f(2)
+            self.forge.replay()
+            self.obj.f(2)
+            self.obj.f(1)
+            self.obj.f(1)
+            self.forge.verify()
+            self.forge.reset()
+
+    def test__satisfied_group_in_any_order_group(self):
+        with self.forge.any_order():
+            with self.forge.ordered():
+                self.obj.f(1)
+                self.obj.poll().at_most(2)
+            self.obj.f(2)
+        self.forge.replay()
+        self.obj.f(1)
+        self.obj.f(2)
+        self.obj.poll()
+        self.obj.poll()
+        with self.assertRaises(UnexpectedCall):
+            self.obj.poll()
+        self.forge.verify()
+
+    def test__invalid_counts(self):
+        call = self.obj.poll()
+        for args in [(0, 0), (-1, 2), (3, 2)]:
+            with self.assertRaises(ValueError):
+                call.between(*args)
+        with self.assertRaises(ValueError):
+            call.times(0)
+        with self.assertRaises(ValueError):
+            call.at_most(0)
+        self.forge.reset()
@@ -0,0 +1,82 @@
+from .ut_utils import ForgeTestCase
+from forge import UnexpectedCall, SignatureException
+from forge.class_mock import get_fast_mock_class
+from forge.mock_object import MockObject
+
+
+class Obj(object):
+    value = 2
+
+    def f(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+    def g(self):
+        raise NotImplementedError()  # pragma: no cover
+
+    def __len__(self):
+        raise NotImplementedError()  # pragma: no cover
+
+
+class FastMockTest(ForgeTestCase):
+    def setUp(self):
+        super(FastMockTest, self).setUp()
+        self.obj = self.forge.create_fast_mock(Obj)
+
+    def test__isinstance(self):
+        self.assertIsInstance(self.obj, Obj)
+        self.assertIsInstance(self.obj, MockObject)
+        self.assertIs(self.obj.__class__, Obj)
+        self.assertIs(type(self.obj), get_fast_mock_class(Obj))
+        self.assertIs(type(self.forge.create_fast_mock(Obj)), type(self.obj))
+
+    def test__record_replay(self):
+        self.obj.f(1).and_return(2)
+        self.obj.g()
+        self.forge.replay()
+        self.assertEquals(self.obj.f(1), 2)
+        with self.assertRaises(UnexpectedCall):
+            self.obj.f(2)
+        self.obj.g()
+        self.forge.verify()
+
+    def test__stubs_are_installed(self):
+        self.assertNotIn('f', self.obj.__dict__)
+        stub = self.obj.f
+        self.assertIs(self.obj.__dict__['f'], stub)
+        self.assertIs(self.obj.f, stub)
+        with self.assertRaises(SignatureException):
+            self.obj.f(1, 2)
+
+    def test__class_members(self):
+        self.assertEquals(self.obj.value, 2)
+        self.assertNotIn('value', self.obj.__dict__)
+        with self.assertRaises(AttributeError):
+            self.obj.missing
+
+    def test__attributes_hide_installed_stubs(self):
+        self.obj.f
+        self.obj.f = 3
+        self.assertEquals(self.obj.f, 3)
+
+    def test__special_methods(self):
+        self.obj.__len__().and_return(3)
+        self.forge.replay()
+        self.assertEquals(len(self.obj), 3)
+
+    def test__reset_uninstalls_stubs(self):
+        stub = self.obj.f
+        self.forge.reset()
+        self.assertNotIn('f', self.obj.__dict__)
+        self.assertIsNot(self.obj.f, stub)
+        self.obj.f(1).and_return(2)
+        self.forge.replay()
+        self.assertEquals(self.obj.f(1), 2)
+
+    def test__templates(self):
+        self.obj.f(1).and_return(2)
+        template = self.forge.capture_template()
+        for _ in range(2):
+            self.forge.load_template(template)
+            self.forge.replay()
+            self.assertEquals(self.obj.f(1), 2)
+            self.forge.verify()
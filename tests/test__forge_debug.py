@@ -1,7 +1,21 @@
+import logging
 import os
+import pickle
+import tempfile
+import sys
 from .ut_utils import TestCase
 from forge import Forge
-from forge.caller_info import CallerInfo
+from forge.caller_info import CallerInfo, LazyCallerInfo
+from forge.config import config, ForgeConfig
+
+class Obj(object):
+    pass
+
+class ContextObj(object):
+    def __enter__(self):
+        raise NotImplementedError()  # pragma: no cover
+    def __exit__(self, *args):
+        raise NotImplementedError()  # pragma: no cover
 
 class ForgeDebugTest(TestCase):
     def assertDebugOff(self, forge):
@@ -21,6 +35,7 @@ class ForgeDebugTest(TestCase):
         prev_value = os.environ.get('FORGE_DEBUG', None)
         os.environ['FORGE_DEBUG'] = "1"
         try:
+            config.load_environ()
             f = Forge()
             self.assertDebugOn(f)
         finally:
@@ -28,3 +43,138 @@ class ForgeDebugTest(TestCase):
                 os.environ.pop('FORGE_DEBUG')
             else:
                 os.environ['FORGE_DEBUG'] = prev_value
+            config.update(debug=False)
+        self.assertDebugOff(Forge())
+
+class LazyCallerInfoTest(TestCase):
+    def _get_caller_info(self, **kwargs):
+        # describes the frame calling this method
+        return LazyCallerInfo.from_caller(**kwargs)
+    def test__resolved_when_used(self):
+        caller_info, line_number = self._get_caller_info(), sys._getframe().f_lineno
+        self.assertIsNone(caller_info._resolved)
+        self.assertEquals(caller_info.line_number, line_number)
+        self.assertEquals(caller_info.function_name, "test__resolved_when_used")
+        self.assertEquals(caller_info.file_name, sys._getframe().f_code.co_filename)
+        self.assertEquals(caller_info.callers, ())
+    def test__stack_depth(self):
+        caller_info = self._get_caller_info(stack_depth=2)
+        [caller] = caller_info.callers
+        self.assertEquals(caller_info.function_name, "test__stack_depth")
+        self.assertNotEqual(caller.function_name, "test__stack_depth")
+        self.assertIn("\n    called from %r" % (caller,), repr(caller_info))
+    def test__pickled_resolved(self):
+        caller_info = self._get_caller_info(stack_depth=2)
+        unpickled = pickle.loads(pickle.dumps(caller_info))
+        self.assertIs(type(unpickled), CallerInfo)
+        self.assertEquals(repr(unpickled), repr(caller_info))
+    def test__forge_stack_depth(self):
+        f = Forge()
+        f.debug.enable(stack_depth=3)
+        self.assertEquals(len(f.debug.get_caller_info().callers), 2)
+
+class ForgeConfigTest(TestCase):
+    def setUp(self):
+        super(ForgeConfigTest, self).setUp()
+        self.config = ForgeConfig()
+    def test__environ(self):
+        self.config.load_environ({'FORGE_DEBUG': '3', 'FORGE_TRACE': 'yes', 'FORGE_LOG_LEVEL': 'debug'})
+        self.assertTrue(self.config.debug)
+        self.assertEquals(self.config.stack_depth, 3)
+        self.assertTrue(self.config.trace)
+        self.assertEquals(self.config.log_level, 'DEBUG')
+        self.config.load_environ({'FORGE_DEBUG': 'off'})
+        self.assertFalse(self.config.debug)
+    def test__config_file(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, "w") as config_file:
+                config_file.write("[pyforge]\ndebug = true\nstack_depth = 2\n")
+            self.config.load_environ({'FORGE_CONFIG': path})
+        finally:
+            os.unlink(path)
+        self.assertTrue(self.config.debug)
+        self.assertEquals(self.config.stack_depth, 2)
+    def test__invalid_settings(self):
+        with self.assertRaises(ValueError):
+            self.config.update(unknown=True)
+        with self.assertRaises(ValueError):
+            self.config.update(stack_depth=0)
+    def test__listeners(self):
+        calls = []
+        self.config.add_listener(lambda config: calls.append(config.trace))
+        self.config.update(trace=True)
+        self.assertEquals(calls, [False, True])
+    def test__new_forges_follow_config(self):
+        config.update(debug=True, stack_depth=2)
+        try:
+            f = Forge()
+        finally:
+            config.update(debug=False, stack_depth=1)
+        self.assertEquals(len(f.debug.get_caller_info().callers), 1)
+
+class TracingTest(TestCase):
+    def setUp(self):
+        super(TracingTest, self).setUp()
+        self.records = []
+        self.handler = logging.Handler()
+        self.handler.emit = self.records.append
+        self.logger = logging.getLogger("pyforge")
+        self.logger.addHandler(self.handler)
+        self.previous_level = self.logger.level
+        config.update(trace=True, log_level="DEBUG")
+    def tearDown(self):
+        config.update(trace=False, log_level=None)
+        self.logger.setLevel(self.previous_level)
+        self.logger.removeHandler(self.handler)
+        super(TracingTest, self).tearDown()
+    def test__events_are_logged(self):
+        f = Forge()
+        stub = f.create_function_stub(lambda a: None)
+        stub(1)
+        f.replay()
+        stub(1)
+        self.assertEquals([record.getMessage() for record in self.records],
+                          ["Recorded <lambda>(a=1)", "Replayed <lambda>(a=1)"])
+
+    def test__tracing_is_per_forge(self):
+        traced = Forge()
+        config.update(trace=False)
+        untraced = Forge()
+        for f in (traced, untraced):
+            f.create_function_stub(lambda a: None)(1)
+        self.assertEquals([record.getMessage() for record in self.records], ["Recorded <lambda>(a=1)"])
+        self.assertTrue(traced.debug.is_tracing())
+        self.assertFalse(untraced.debug.is_tracing())
+        traced.debug.disable_tracing()
+        self.assertEquals(len(traced.hooks), 0)
+
+class CallPathTest(TestCase):
+    def test__caller_info_is_per_forge(self):
+        debugged, other = Forge(), Forge()
+        debugged.debug.enable()
+        for f in (debugged, other):
+            f.create_function_stub(lambda a: None)(1)
+            f.create_mock(Obj).attr = 2
+        for call in debugged.queue.get_expected():
+            self.assertIsInstance(call.caller_info, CallerInfo)
+            self.assertEquals(call.caller_info.function_name, "test__caller_info_is_per_forge")
+        for call in other.queue.get_expected():
+            self.assertIsNone(call.caller_info)
+    def test__special_methods_and_response_tables(self):
+        debugged, other = Forge(), Forge()
+        debugged.debug.enable()
+        tables = []
+        for f in (debugged, other):
+            f.create_mock(ContextObj).__exit__(None, None, None)
+            table = f.create_response_table(f.create_function_stub(lambda a: None))
+            table.add(1)
+            tables.append(table)
+        [exit_call] = debugged.queue.get_expected()
+        [entry] = tables[0].get_available()
+        for call in (exit_call, entry):
+            self.assertEquals(call.caller_info.function_name, "test__special_methods_and_response_tables")
+        [exit_call] = other.queue.get_expected()
+        [entry] = tables[1].get_available()
+        self.assertIsNone(exit_call.caller_info)
+        self.assertIsNone(entry.caller_info)
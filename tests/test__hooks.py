@@ -0,0 +1,102 @@
+from .ut_utils import ForgeTestCase
+from forge import UnexpectedCall, ExpectedEventsNotFound
+from forge.hooks import RECORD, REPLAY
+from forge.queue import ForgeQueue
+
+
+class HooksTest(ForgeTestCase):
+    def setUp(self):
+        super(HooksTest, self).setUp()
+        self.stub = self.forge.create_function_stub(lambda a: None)
+        self.events = []
+        self.forge.hooks.subscribe(self.events.append)
+
+    def _get_kinds(self):
+        return [(event.phase, event.kind) for event in self.events]
+
+    def test__record_and_replay_events(self):
+        self.stub(1)
+        self.stub(2)
+        self.forge.replay()
+        self.stub(1)
+        with self.assertRaises(UnexpectedCall):
+            self.stub(3)
+        self.forge.reset()
+        self.assertEquals(self._get_kinds(), [
+            (RECORD, "push_call"), (RECORD, "push_call"),
+            (REPLAY, "pop"), (REPLAY, "mismatch"),
+            ])
+        self.assertEquals([event.queue_depth for event in self.events], [1, 2, 1, 1])
+        self.assertGreaterEqual(self.events[0].latency, 0)
+        self.assertGreaterEqual(self.events[2].latency, 0)
+        self.assertEquals(self.events[2].description, self.stub.__forge__.describe() + "(a=1)")
+
+    def test__verify_events(self):
+        self.stub(1)
+        self.forge.replay()
+        with self.assertRaises(ExpectedEventsNotFound):
+            self.forge.verify()
+        self.stub(1)
+        self.forge.verify()
+        verify_events = [event for event in self.events if event.kind == "verify"]
+        self.assertEquals(len(verify_events), 2)
+        self.assertIn("a=1", verify_events[0].description)
+        self.assertEquals(verify_events[1].description, "verified")
+        self.assertEquals(verify_events[1].queue_depth, 0)
+
+    def test__whenever_and_setattr_events(self):
+        mock = self.forge.create_mock(object)
+        self.stub.when(1).then_return(2)
+        mock.__forge__.expect_setattr("a", 2)
+        self.forge.reset()
+        # when() records a plain call first, and turns it into a whenever() expectation
+        self.assertEquals(self._get_kinds(), [
+            (RECORD, "create"), (RECORD, "push_call"), (RECORD, "whenever"), (RECORD, "push_setattr"),
+            ])
+        self.assertIs(self.events[0].subject, mock)
+
+    def test__replacer_events(self):
+        class Obj(object):
+            def f(self):
+                raise NotImplementedError()  # pragma: no cover
+        obj = Obj()
+        self.forge.replace(obj, "f")
+        self.forge.restore_all_replacements()
+        self.assertEquals(self._get_kinds(), [(RECORD, "create"), (RECORD, "replace"), (RECORD, "restore")])
+        self.assertEquals([event.description for event in self.events[1:]], ["<Obj instance>.f"] * 2)
+
+    def test__survive_reset_and_templates(self):
+        self.stub(1)
+        template = self.forge.capture_template()
+        self.forge.reset()
+        self.stub(2)
+        self.forge.load_template(template)
+        self.forge.replay()
+        self.stub(1)
+        self.assertEquals([event.kind for event in self.events], ["push_call", "push_call", "pop"])
+
+    def test__no_overhead_without_subscribers(self):
+        self.forge.hooks.unsubscribe(self.events.append)
+        self.assertEquals(len(self.forge.hooks), 0)
+        for name in ("push_call", "_pop_matching", "verify"):
+            self.assertNotIn(name, vars(self.forge.queue))
+        self.assertNotIn("_restore", vars(self.forge.replacer))
+        self.forge.reset()
+        self.assertEquals(vars(ForgeQueue(self.forge)).get("push_call"), None)
+        self.stub(1)
+        self.forge.replay()
+        self.stub(1)
+        self.assertEquals(self.events, [])
+
+    def test__decorator_subscription(self):
+        received = []
+        @self.forge.hooks.subscribe
+        def subscriber(event):
+            received.append(event.kind)
+        self.assertEquals(len(self.forge.hooks), 2)
+        self.stub(1)
+        self.forge.hooks.unsubscribe(subscriber)
+        self.stub(2)
+        self.forge.reset()
+        self.assertEquals(received, ["push_call"])
+        self.assertEquals(len(self.events), 2)
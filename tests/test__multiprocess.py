@@ -0,0 +1,111 @@
+import multiprocessing
+import sys
+import threading
+import unittest
+from .ut_utils import ForgeTestCase
+from forge import UnexpectedCall, ExpectedEventsNotFound
+from forge.comparators import IsA
+
+_can_fork = sys.version_info >= (3, 4) and "fork" in multiprocessing.get_all_start_methods()
+
+
+class Obj(object):
+    def f(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+    def g(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+
+def _run_in_process(func, *args):
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    def run():
+        try:
+            result = func(*args)
+        except Exception as e:
+            result = "%s: %s" % (type(e).__name__, e)
+        sender.send(result)
+    process = context.Process(target=run)
+    process.start()
+    result = receiver.recv()
+    process.join()
+    return result
+
+
+@unittest.skipUnless(_can_fork, "forking processes is not supported")
+class MultiprocessReplayTest(ForgeTestCase):
+    def setUp(self):
+        super(MultiprocessReplayTest, self).setUp()
+        self.obj = self.forge.create_mock(Obj)
+
+    def test__workers_consume_the_parent_queue(self):
+        with self.forge.any_order():
+            for index in range(4):
+                self.obj.f(index).and_return(index * 10)
+        with self.forge.multiprocess_replay():
+            self.assertEquals(_run_in_process(lambda: [self.obj.f(index) for index in (0, 2)]), [0, 20])
+            self.assertEquals(self.obj.f(1), 10)
+            with self.assertRaises(ExpectedEventsNotFound):
+                self.forge.verify()
+            self.assertEquals(_run_in_process(self.obj.f, 3), 30)
+        self.forge.verify()
+
+    def test__mocks_as_arguments(self):
+        other = self.forge.create_mock(Obj)
+        self.obj.f(other).and_return(other)
+        other.g(1)
+        with self.forge.multiprocess_replay():
+            self.assertIsNone(_run_in_process(lambda: self.obj.f(other).g(1)))
+        self.forge.verify()
+
+    def test__arguments_compared_by_identity(self):
+        payload = object()
+        self.obj.f(payload).and_return(1)
+        with self.forge.multiprocess_replay():
+            self.assertEquals(_run_in_process(self.obj.f, payload), 1)
+        self.forge.verify()
+
+    def test__unpicklable_arguments(self):
+        lock = threading.Lock()
+        callback = lambda: None
+        self.obj.f(lock).and_return(1)
+        self.obj.g(callback).and_return(2)
+        with self.forge.multiprocess_replay():
+            self.assertEquals(_run_in_process(lambda: (self.obj.f(lock), self.obj.g(callback))), (1, 2))
+        self.forge.verify()
+
+    def test__mocks_matched_by_comparators(self):
+        other = self.forge.create_mock(Obj)
+        self.obj.f(IsA(Obj)).and_return(1)
+        with self.forge.multiprocess_replay():
+            self.assertEquals(_run_in_process(self.obj.f, other), 1)
+        self.forge.verify()
+
+    def test__order_is_kept_by_the_parent(self):
+        self.obj.f(1)
+        self.obj.f(2)
+        with self.forge.multiprocess_replay():
+            self.assertTrue(_run_in_process(self.obj.f, 2).startswith("UnexpectedCall"))
+            self.obj.f(1)
+            self.assertIsNone(_run_in_process(self.obj.f, 2))
+            self.assertTrue(_run_in_process(self.obj.f, 2).startswith("UnexpectedCall"))
+        with self.assertRaises(UnexpectedCall):
+            self.forge.verify()
+        self.forge.reset()
+
+    def test__unexpected_calls_in_workers_fail_verify(self):
+        self.obj.f(1)
+        with self.forge.multiprocess_replay():
+            self.assertTrue(_run_in_process(self.obj.f, 2).startswith("UnexpectedCall"))
+            self.obj.f(1)
+        with self.assertRaises(UnexpectedCall):
+            self.forge.verify()
+        self.forge.reset()
+
+    def test__queue_is_restored(self):
+        self.obj.f(1)
+        with self.forge.multiprocess_replay():
+            self.assertIn("pop_matching_call", self.forge.queue.__dict__)
+        self.assertNotIn("pop_matching_call", self.forge.queue.__dict__)
+        self.forge.reset()
@@ -0,0 +1,118 @@
+import sys
+import unittest
+from .ut_utils import ForgeTestCase
+from forge import Forge
+from forge.forge_test_case import ForgeTestCase as PublicForgeTestCase
+from forge.pool import ForgePool, forge_pool
+
+
+class Obj(object):
+    def f(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+
+def module_function():
+    pass
+
+
+class InPlaceResetTest(ForgeTestCase):
+    def test__reset_keeps_structures(self):
+        queue = self.forge.queue
+        stubs = self.forge.stubs
+        mock = self.forge.create_mock(Obj)
+        mock.f(1)
+        self.forge.reset()
+        self.assertIs(self.forge.queue, queue)
+        self.assertIs(self.forge.stubs, stubs)
+        self.assertTrue(self.forge.queue.is_empty())
+        mock.f(2)
+        self.forge.replay()
+        mock.f(2)
+
+    def test__reset_inside_group_context(self):
+        queue = self.forge.queue
+        mock = self.forge.create_mock(Obj)
+        with self.forge.any_order():
+            mock.f(1)
+            self.forge.reset()
+        self.assertIsNot(self.forge.queue, queue)
+        mock.f(2)
+        self.forge.replay()
+        mock.f(2)
+
+    def test__call_counts_per_session(self):
+        stub = self.forge.create_function_stub(lambda: None)
+        stub()
+        self.forge.replay()
+        stub()
+        self.assertEquals(stub.__forge__.call_count, 1)
+        self.forge.reset()
+        self.assertEquals(stub.__forge__.call_count, 0)
+
+    def test__recycle(self):
+        mock = self.forge.create_mock(Obj)
+        mock.a = 2
+        self.forge.replace(Obj, "f")
+        self.forge.debug.enable()
+        self.forge.recycle()
+        self.assertFalse(self.forge.attributes.has_attribute(mock, "a"))
+        self.assertIsInstance(Obj.__dict__["f"], type(module_function))
+        self.assertFalse(self.forge.debug.is_enabled())
+        self.assertTrue(self.forge.is_recording())
+
+
+class ForgePoolTest(ForgeTestCase):
+    def test__acquire_release(self):
+        pool = ForgePool()
+        forge = pool.acquire()
+        self.assertIsInstance(forge, Forge)
+        forge.create_function_stub(module_function)()
+        pool.release(forge)
+        self.assertEquals(len(pool), 1)
+        self.assertIs(pool.acquire(), forge)
+        self.assertTrue(forge.queue.is_empty())
+        self.assertIsNot(pool.acquire(), forge)
+
+    @unittest.skipUnless(sys.version_info >= (3, 7), "contextvars is not available")
+    def test__released_forges_drop_subscribers_stats_and_routing(self):
+        pool = ForgePool()
+        forge = pool.acquire()
+        events = []
+        forge.hooks.subscribe(events.append)
+        forge.stats.enable()
+        stub = forge.create_function_stub(module_function)
+        with forge.task_queue():
+            stub()
+        stub()
+        forge_class = type(forge)
+        self.assertIsNot(forge_class, Forge)
+        pool.release(forge)
+        self.assertIs(pool.acquire(), forge)
+        self.assertIs(type(forge), Forge)
+        self.assertEquals(len(forge.hooks), 0)
+        self.assertFalse(forge.stats.is_enabled())
+        self.assertEquals(len(forge.stats), 0)
+        del events[:]
+        forge.create_function_stub(module_function)()
+        self.assertEquals(events, [])
+        forge.reset()
+
+    def test__forge_test_case(self):
+        forges = []
+        class PooledTest(PublicForgeTestCase):
+            reuse_forge = True
+            def test__1(self):
+                forges.append(self.forge)
+                self.forge.create_function_stub(module_function)()
+                self.forge.replay()
+                self.forge.reset()
+            def test__2(self):
+                forges.append(self.forge)
+                self.assertTrue(self.forge.queue.is_empty())
+        forge_pool.clear()
+        result = unittest.TestResult()
+        unittest.defaultTestLoader.loadTestsFromTestCase(PooledTest).run(result)
+        self.assertTrue(result.wasSuccessful(), result.errors + result.failures)
+        self.assertEquals(len(forges), 2)
+        self.assertIs(forges[0], forges[1])
+        self.assertEquals(len(forge_pool), 1)
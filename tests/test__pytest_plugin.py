@@ -0,0 +1,82 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from .ut_utils import ForgeTestCase
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_TESTS = """
+import os
+
+def f(a):
+    pass
+
+class Obj(object):
+    def g(self, a):
+        pass
+
+def test__replayed(forge):
+    # looking a method up creates a method stub, which isn't counted as a mock
+    forge.create_mock(Obj).g
+    stub = forge.create_function_stub(f)
+    for index in range(20):
+        stub(index)
+    forge.replay()
+    for index in range(20):
+        stub(index)
+
+def test__replaced(forge):
+    forge.replace(os.path, "join")
+
+def test__restored(forge):
+    assert not hasattr(os.path.join, "__forge__")
+
+def test__not_verified(forge):
+    stub = forge.create_function_stub(f)
+    stub(1)
+    forge.replay()
+"""
+
+
+@unittest.skipIf(pytest is None, "pytest is not installed")
+class PytestPluginTest(ForgeTestCase):
+    def setUp(self):
+        super(PytestPluginTest, self).setUp()
+        self.path = tempfile.mkdtemp()
+        with open(os.path.join(self.path, "test_forge_fixture.py"), "w") as test_file:
+            test_file.write(_TESTS)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        super(PytestPluginTest, self).tearDown()
+
+    def _run_pytest(self, *args):
+        environ = dict(os.environ, PYTHONPATH=_ROOT_DIR)
+        process = subprocess.Popen(
+            [sys.executable, "-m", "pytest", "-p", "forge.pytest_plugin", "-p", "no:cacheprovider", "-q"] +
+            list(args) + [self.path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=environ)
+        output = process.communicate()[0].decode("utf-8")
+        return output
+
+    def test__fixture(self):
+        output = self._run_pytest()
+        self.assertIn("4 passed, 1 error", output)
+        self.assertIn("ExpectedEventsNotFound", output)
+        self.assertNotIn("forge overheads", output)
+
+    def test__slowest(self):
+        output = self._run_pytest("--forge-slowest=2")
+        lines = output.splitlines()
+        title_index = [index for index, line in enumerate(lines) if "slowest 2 forge overheads" in line][0]
+        self.assertIn("test__replayed", lines[title_index + 1])
+        self.assertIn("peak queue   20", lines[title_index + 1])
+        self.assertIn("2 mocks", lines[title_index + 1])
+        self.assertNotIn("::", lines[title_index + 3])
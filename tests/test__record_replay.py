@@ -41,6 +41,13 @@ class RecordReplayTest(ForgeTestCase):
         self.assertEquals(exc.expected[0].args, dict(a=1, b=2, c=3))
         self.assertEquals(exc.got.args, dict(a=1, b=2, c=6))
         self.assertExpectedNotMet([self.stub])
+    def test__recorded_calls_are_compact(self):
+        first = self.stub(1, 2, 3)
+        second = self.stub(c=6, b=5, a=4)
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first._arg_names, second._arg_names)
+        self.assertEquals(second.args, dict(a=4, b=5, c=6))
+        self.forge.reset()
     def test__record_replay_different_more_args(self):
         self.stub(1, 2, 3)
         self.forge.replay()
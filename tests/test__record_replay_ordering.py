@@ -1,5 +1,5 @@
 from .ut_utils import ForgeTestCase
-from forge import UnexpectedCall, ExpectedEventsNotFound
+from forge import UnexpectedCall, ExpectedEventsNotFound, Func
 from forge.python3_compat import basestring
 import random
 
@@ -80,6 +80,21 @@ class OrderGroupsTest(OrderingTest):
         self.stub(4)
         self.forge.verify()
 
+class LongOrderedSequenceTest(OrderingTest):
+    def test__long_ordered_sequence(self):
+        num_calls = 1000
+        for i in range(num_calls):
+            self.stub(i)
+        self.forge.replay()
+        for i in range(num_calls):
+            if i % 97 == 0:
+                with self.assertRaises(UnexpectedCall) as caught:
+                    self.stub(i + 1)
+                self.assertEquals(caught.exception.expected[0].args, dict(arg=i))
+            self.stub(i)
+        self.assertTrue(self.forge.queue.is_empty())
+        self.forge.verify()
+
 # class EmptyGroupTest(OrderingTest):
 #     def test__empty_ordered_group(self):
 #         self._test__empty_group(self.forge.ordered)
@@ -246,3 +261,145 @@ class OrderedAnyOrderOrderedGroupTest(OrderingTest):
             self.stub(n)
         self.forge.verify()
 
+
+
+class UnorderedCandidateSelectionTest(OrderingTest):
+    def setUp(self):
+        super(UnorderedCandidateSelectionTest, self).setUp()
+        self.other_stub = self.forge.create_function_stub(lambda arg: None)
+        self.compared = []
+    def _record_comparator_calls(self, value):
+        self.compared.append(value)
+        return True
+    def test__only_same_target_expectations_are_compared(self):
+        for group_context in (self.forge.any_order, self.forge.interleaved_order):
+            with group_context():
+                self.other_stub(Func(self._record_comparator_calls))
+                self.stub(1)
+            self.forge.replay()
+            self.stub(1)
+            self.assertEquals(self.compared, [])
+            self.other_stub(2)
+            self.assertEquals(self.compared, [2])
+            self.forge.verify()
+            self.forge.reset()
+            del self.compared[:]
+    def test__nested_groups_keep_recording_order(self):
+        with self.forge.any_order():
+            with self.forge.ordered():
+                self.stub(1)
+                self.stub(2)
+            self.stub(1)
+        self.forge.replay()
+        self.stub(1)
+        with self.assertRaises(UnexpectedCall):
+            # the nested group was matched first, and must be completed before the rest
+            self.stub(1)
+        self.stub(2)
+        self.stub(1)
+        self.forge.verify()
+    def test__many_unordered_expectations(self):
+        values = list(range(200))
+        with self.forge.any_order():
+            for value in values:
+                self.stub(value)
+                self.other_stub(value)
+        self.forge.replay()
+        random.shuffle(values)
+        for value in values:
+            self.other_stub(value)
+            self.stub(value)
+        self.forge.verify()
+
+class QueueCountersTest(OrderingTest):
+    def assertCounters(self, num_expected, length):
+        self.assertEquals(self.forge.queue._root_group.get_expected_count(), num_expected)
+        self.assertEquals(len(self.forge.queue), length)
+        self.assertEquals(self.forge.queue.is_empty(), num_expected == 0)
+    def test__counters_follow_push_pop_and_whenever(self):
+        with self.forge.any_order():
+            self.stub(1)
+            with self.forge.ordered():
+                self.stub(2)
+                self.stub(3)
+            self.stub(4).whenever()
+        self.assertCounters(3, 4)
+        self.forge.replay()
+        self.stub(2)
+        self.assertCounters(2, 3)
+        self.stub(4)
+        self.assertCounters(2, 3)
+        self.stub(3)
+        self.assertCounters(1, 2)
+        self.stub(1)
+        # the any_order group is cleared along with its whenever()
+        self.assertCounters(0, 0)
+    def test__whenever_only_group_does_not_hide_following_expectations(self):
+        with self.forge.ordered():
+            self.stub(1).whenever()
+        self.stub(2)
+        self.forge.replay()
+        with self.assertRaises(ExpectedEventsNotFound) as caught:
+            self.forge.verify()
+        self.assertEquals([event.args for event in caught.exception.events], [dict(arg=2)])
+        self.forge.reset()
+    def test__verify_reports_all_remaining_expectations(self):
+        with self.forge.any_order():
+            self.stub(0).at_most(2)
+        self.stub(1)
+        with self.forge.any_order():
+            self.stub(2)
+            self.stub(3).whenever()
+        self.stub(4).at_least(2)
+        self.forge.replay()
+        self.stub(0)
+        root_group = self.forge.queue._root_group
+        self.assertEquals(len(root_group.get_all_expected()), root_group.get_expected_count())
+        with self.assertRaises(ExpectedEventsNotFound) as caught:
+            self.forge.verify()
+        self.assertEquals([event.args for event in caught.exception.events], [dict(arg=1), dict(arg=2), dict(arg=4)])
+        self.forge.reset()
+
+class ReplayCompilationTest(OrderingTest):
+    def test__nested_ordered_groups_are_merged(self):
+        self.stub(0)
+        with self.forge.ordered():
+            self.stub(1)
+            with self.forge.ordered():
+                self.stub(2)
+        with self.forge.any_order():
+            self.stub(3)
+        self.forge.replay()
+        self.assertEquals(len(list(self.forge.queue._root_group._collection)), 4)
+        with self.assertRaises(UnexpectedCall):
+            self.stub(1)
+        for i in range(4):
+            self.stub(i)
+        self.forge.verify()
+    def test__groups_with_whenever_are_kept(self):
+        with self.forge.ordered():
+            self.stub(1)
+            self.stub.when(5).then_return(6)
+        self.stub(2)
+        self.forge.replay()
+        self.assertEquals(len(list(self.forge.queue._root_group._collection)), 2)
+        self.assertEquals(self.stub(5), 6)
+        self.stub(1)
+        with self.assertRaises(UnexpectedCall):
+            self.stub(5)
+        self.stub(2)
+        self.forge.verify()
+    def test__unknown_targets_are_rejected(self):
+        other_stub = self.forge.create_function_stub(lambda arg: None)
+        self.stub(1)
+        self.forge.replay()
+        with self.assertRaises(UnexpectedCall) as caught:
+            other_stub(1)
+        self.assertIs(caught.exception.expected[0].target, self.stub)
+        self.stub(1)
+    def test__expectations_recorded_during_replay(self):
+        mock = self.forge.create_mock(object)
+        self.forge.replay()
+        mock.__forge__.expect_setattr("a", 2)
+        mock.a = 2
+        self.forge.verify()
@@ -0,0 +1,185 @@
+import os
+import shutil
+import tempfile
+from .ut_utils import ForgeTestCase
+from forge import Forge, UnexpectedCall, InvalidResponseTableEntry
+from forge.comparators import IsA, Anything
+
+
+class Service(object):
+    def lookup(self, key, region="us"):
+        raise NotImplementedError()  # pragma: no cover
+
+    def close(self):
+        raise NotImplementedError()  # pragma: no cover
+
+
+class LooseKey(object):
+    def __init__(self, value):
+        super(LooseKey, self).__init__()
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = object.__hash__
+
+
+class ResponseTableTest(ForgeTestCase):
+    def setUp(self):
+        super(ResponseTableTest, self).setUp()
+        self.service = self.forge.create_mock(Service)
+
+    def test__lookup(self):
+        table = self.forge.create_response_table(self.service.lookup)
+        for index in range(1000):
+            table.add(index).and_return(index * 2)
+        table.add(1, region="eu").and_return("eu")
+        self.forge.replay()
+        self.assertEquals(self.service.lookup(500), 1000)
+        self.assertEquals(self.service.lookup(key=3), 6)
+        self.assertEquals(self.service.lookup(1, "eu"), "eu")
+        self.assertEquals(self.service.lookup(500), 1000)
+        with self.assertRaises(UnexpectedCall):
+            self.service.lookup(1000)
+        self.forge.verify()
+
+    def test__update_with_mapping(self):
+        self.forge.create_response_table(self.service.lookup, {("a",): 1, ("b", "eu"): 2})
+        self.forge.replay()
+        self.assertEquals(self.service.lookup("a"), 1)
+        self.assertEquals(self.service.lookup("b", region="eu"), 2)
+        with self.assertRaises(UnexpectedCall):
+            self.service.lookup("b")
+
+    def test__update_with_single_arguments(self):
+        self.forge.create_response_table(self.service.lookup, {"ab": 1, 2: 3, (("a", "b"),): 5})
+        self.forge.replay()
+        self.assertEquals(self.service.lookup("ab"), 1)
+        self.assertEquals(self.service.lookup(2), 3)
+        self.assertEquals(self.service.lookup(("a", "b")), 5)
+        with self.assertRaises(UnexpectedCall):
+            self.service.lookup("a", "b")
+
+    def test__earlier_entries_win(self):
+        table = self.forge.create_response_table(self.service.lookup)
+        table.add(1).and_return(1)
+        table.add(1).and_return(2)
+        table.add(IsA(str)).and_return(3)
+        table.add(IsA(str)).and_return(4)
+        table.add("x").and_return(5)
+        self.assertEquals(len(table.get_available()), 4)
+        self.forge.replay()
+        self.assertEquals(self.service.lookup(1), 1)
+        self.assertEquals(self.service.lookup("x"), 3)
+        self.assertEquals(self.service.lookup(LooseKey(1)), 1)
+
+    def test__earlier_whenever_calls_win(self):
+        self.service.lookup(IsA(str)).whenever().and_return("whenever")
+        self.service.lookup("x").whenever().and_return("exact whenever")
+        table = self.forge.create_response_table(self.service.lookup)
+        table.add("y").and_return("exact")
+        table.add(IsA(str)).and_return("any string")
+        self.forge.replay()
+        self.assertEquals(self.service.lookup("x"), "whenever")
+        self.assertEquals(self.service.lookup("y"), "whenever")
+
+    def test__entries_cannot_be_counted(self):
+        table = self.forge.create_response_table(self.service.lookup)
+        entry = table.add(1)
+        for count in (entry.times, entry.at_least, entry.at_most):
+            with self.assertRaises(InvalidResponseTableEntry):
+                count(2)
+        with self.assertRaises(InvalidResponseTableEntry):
+            entry.between(1, 2)
+
+    def test__comparators_are_checked_after_lookup(self):
+        table = self.forge.create_response_table(self.service.lookup)
+        table.add("x").and_return("exact")
+        table.add(Anything()).and_return("any")
+        self.forge.replay()
+        self.assertEquals(self.service.lookup("x"), "exact")
+        self.assertEquals(self.service.lookup("y"), "any")
+        self.assertEquals(self.service.lookup([1, 2]), "any")
+
+    def test__replayed_arguments_with_custom_equality(self):
+        table = self.forge.create_response_table(self.service.lookup)
+        table.add(7).and_return("seven")
+        self.forge.replay()
+        self.assertEquals(self.service.lookup(LooseKey(7)), "seven")
+
+    def test__plain_values_compare_like_equality(self):
+        table = self.forge.create_response_table(self.service.lookup)
+        table.add(1).and_return("one")
+        table.add(("a", 2)).and_return("tuple")
+        self.forge.replay()
+        self.assertEquals(self.service.lookup(1.0), "one")
+        self.assertEquals(self.service.lookup(("a", 2.0)), "tuple")
+
+    def test__side_effects(self):
+        table = self.forge.create_response_table(self.service.lookup)
+        error = KeyError("missing")
+        table.add("missing").and_raise(error)
+        self.forge.replay()
+        with self.assertRaises(KeyError) as caught:
+            self.service.lookup("missing")
+        self.assertIs(caught.exception, error)
+
+    def test__mixed_with_ordered_expectations(self):
+        self.forge.create_response_table(self.service.lookup, {(1,): 1})
+        self.service.lookup(1).and_return("ordered")
+        self.service.close()
+        self.forge.replay()
+        self.assertEquals(self.service.lookup(1), "ordered")
+        self.assertEquals(self.service.lookup(1), 1)
+        self.service.close()
+        self.assertEquals(self.service.lookup(1), 1)
+        self.forge.verify()
+
+    def test__other_targets_are_not_matched(self):
+        other = self.forge.create_mock(Service)
+        self.forge.create_response_table(self.service.lookup, {(1,): 1})
+        self.forge.replay()
+        with self.assertRaises(UnexpectedCall):
+            other.lookup(1)
+
+    def test__function_stubs(self):
+        def get_status(name):
+            raise NotImplementedError()  # pragma: no cover
+        stub = self.forge.create_function_stub(get_status)
+        self.forge.create_response_table(stub, {("a",): "up"})
+        self.assertTrue(stub.__forge__.has_recorded_calls())
+        self.forge.replay()
+        self.assertEquals(stub("a"), "up")
+
+    def test__templates(self):
+        self.forge.create_response_table(self.service.lookup, {(1,): 1})
+        template = self.forge.capture_template()
+        for _ in range(2):
+            self.forge.reset()
+            self.forge.load_template(template)
+            self.forge.replay()
+            self.assertEquals(self.service.lookup(1), 1)
+            self.forge.verify()
+
+
+class ResponseTableCassetteTest(ForgeTestCase):
+    def test__round_trip(self):
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, "cassette")
+            forge = Forge()
+            service = forge.create_mock(Service)
+            forge.create_response_table(service.lookup, {(1,): 1}).add(IsA(str)).and_return("str")
+            forge.save_cassette(path, [service])
+            service = self.forge.create_mock(Service)
+            self.forge.load_cassette(path, [service])
+        finally:
+            shutil.rmtree(tempdir)
+        self.forge.replay()
+        self.assertEquals(service.lookup(1), 1)
+        self.assertEquals(service.lookup("x"), "str")
+        self.forge.verify()
@@ -1,6 +1,10 @@
+import gc
+import sys
 import time
-from .ut_utils import TestCase
-from forge.signature import FunctionSignature
+from .ut_utils import TestCase, Method
+from forge.python3_compat import IS_PY3
+from forge import Forge
+from forge.signature import FunctionSignature, SignatureCache, signature_cache
 from forge.exceptions import SignatureException, InvalidKeywordArgument, FunctionCannotBeBound
 
 # no named tuples for python 2.5 compliance...
@@ -125,6 +129,126 @@ class SignatureTest(TestCase):
         self.assertIsNot(f, f2)
         self.assertIsNot(f._args, f2._args)
 
+class NormalizedArgsTest(TestCase):
+    def test__positional_and_keyword(self):
+        sig = FunctionSignature(lambda a, b=2, *args, **kwargs: None)
+        self.assertEquals(sig.get_normalized_args((1, 2, 3, 4), dict(c=5)), {'a': 1, 'b': 2, 0: 3, 1: 4, 'c': 5})
+        self.assertEquals(sig.get_normalized_args((), dict(a=1)), {'a': 1})
+    def test__errors(self):
+        sig = FunctionSignature(lambda a, b=2: None)
+        for args, kwargs in [((), {}), ((1, 2, 3), {}), ((1,), dict(a=1)), ((1,), dict(c=1))]:
+            with self.assertRaises(SignatureException):
+                sig.get_normalized_args(args, kwargs)
+    def test__bound_methods(self):
+        class SomeObject(object):
+            def f(self, a):
+                raise NotImplementedError()
+        sig = FunctionSignature(SomeObject().f)
+        self.assertEquals(list(sig.get_arg_names()), ['a'])
+        self.assertEquals(sig.get_normalized_args((1,), {}), {'a': 1})
+        with self.assertRaises(SignatureException):
+            sig.get_normalized_args((1, 2), {})
+    if IS_PY3:
+        def test__keyword_only_args(self):
+            sig = FunctionSignature(Method("f(a, *, b, c=3)").get_function())
+            self.assertEquals(sig.get_num_args(), 1)
+            self.assertEquals([arg.name for arg in sig.get_keyword_only_args()], ['b', 'c'])
+            self.assertEquals(sig.get_normalized_args((1,), dict(b=2)), {'a': 1, 'b': 2})
+            with self.assertRaises(SignatureException):
+                sig.get_normalized_args((1,), {})
+            with self.assertRaises(SignatureException):
+                sig.get_normalized_args((1, 2), {})
+    if sys.version_info >= (3, 8):
+        def test__positional_only_args(self):
+            sig = FunctionSignature(Method("f(a, /, b)").get_function())
+            self.assertEquals(sig.get_normalized_args((1,), dict(b=2)), {'a': 1, 'b': 2})
+            with self.assertRaises(SignatureException):
+                sig.get_normalized_args((), dict(a=1, b=2))
+            sig = FunctionSignature(Method("f(a, /, **kwargs)").get_function())
+            self.assertEquals(sig.get_normalized_args((1,), dict(c=2)), {'a': 1, 'c': 2})
+
+class CompactArgsTest(TestCase):
+    def test__positional_args_share_names(self):
+        sig = FunctionSignature(lambda a, b=2, c=3: None)
+        names, values = sig.get_compact_args((1, 2), {})
+        self.assertEquals((names, values), (('a', 'b'), (1, 2)))
+        self.assertIs(sig.get_compact_args((3, 4), {})[0], names)
+        self.assertIs(sig.get_compact_args((), dict(b=4, a=3))[0], names)
+    def test__canonical_order(self):
+        sig = FunctionSignature(lambda a, b=2, *args, **kwargs: None)
+        compact = sig.get_compact_args((1, 2, 3, 4), dict(d=6, c=5))
+        self.assertEquals(compact, (('a', 'b', 0, 1, 'c', 'd'), (1, 2, 3, 4, 5, 6)))
+        self.assertEquals(sig.compact_normalized_args(sig.get_normalized_args((1, 2, 3, 4), dict(c=5, d=6))),
+                          compact)
+    def test__errors(self):
+        sig = FunctionSignature(lambda a, b=2: None)
+        for args, kwargs in [((), {}), ((1, 2, 3), {}), ((1,), dict(a=1)), ((1,), dict(c=1))]:
+            with self.assertRaises(SignatureException):
+                sig.get_compact_args(args, kwargs)
+    if IS_PY3:
+        def test__required_keyword_only_args(self):
+            sig = FunctionSignature(Method("f(a, *, b)").get_function())
+            self.assertEquals(sig.get_compact_args((1,), dict(b=2)), (('a', 'b'), (1, 2)))
+            with self.assertRaises(SignatureException):
+                sig.get_compact_args((1,), {})
+
+class SignatureCacheTest(TestCase):
+    def setUp(self):
+        super(SignatureCacheTest, self).setUp()
+        self.cache = SignatureCache()
+    def test__parses_each_function_once(self):
+        def f(a, b=2):
+            raise NotImplementedError()
+        first = self.cache.get(f)
+        second = self.cache.get(f)
+        self.assertEquals(self.cache.get_stats(), dict(hits=1, misses=1, size=1))
+        self.assertIs(first.func, f)
+        self.assertEquals(second.get_normalized_args((1,), {}), {'a': 1})
+    def test__bound_methods_derive_from_function(self):
+        class SomeObject(object):
+            def f(self, a):
+                raise NotImplementedError()
+        unbound = self.cache.get(SomeObject.__dict__['f'])
+        bound = self.cache.get(SomeObject().f)
+        self.assertEquals(self.cache.misses, 1)
+        self.assertFalse(unbound.is_bound_method())
+        self.assertTrue(bound.is_bound_method())
+        self.assertEquals(list(unbound.get_arg_names()), ['self', 'a'])
+        self.assertEquals(list(bound.get_arg_names()), ['a'])
+    def test__uncacheable_functions(self):
+        class Callable(object):
+            __slots__ = ()
+            __name__ = "func"
+            def __call__(self, a):
+                raise NotImplementedError()
+        func = Callable()
+        self.cache.get(func)
+        self.cache.get(func)
+        self.assertEquals(self.cache.get_stats(), dict(hits=0, misses=2, size=0))
+    def test__functions_are_weakly_referenced(self):
+        def f():
+            raise NotImplementedError()
+        self.cache.get(f)
+        self.assertEquals(len(self.cache), 1)
+        del f
+        gc.collect()
+        self.assertEquals(len(self.cache), 0)
+    def test__clear(self):
+        self.cache.get(lambda: None)
+        self.cache.clear()
+        self.assertEquals(self.cache.get_stats(), dict(hits=0, misses=0, size=0))
+    def test__mocks_of_the_same_class(self):
+        class SomeObject(object):
+            def f(self, a):
+                raise NotImplementedError()
+        forge = Forge()
+        previous_misses = signature_cache.misses
+        mocks = [forge.create_mock(SomeObject) for _ in range(100)]
+        for mock in mocks:
+            mock.f(1)
+        self.assertEquals(signature_cache.misses, previous_misses + 1)
+        forge.reset()
+
 class BinaryFunctionSignatureTest(TestCase):
     def test__binary_global_function(self):
         sig = FunctionSignature(time.time)
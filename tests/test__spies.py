@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+from .ut_utils import ForgeTestCase
+from forge import Forge, UnexpectedCall
+
+
+class Calculator(object):
+    precision = 2
+
+    def __init__(self, offset=0):
+        super(Calculator, self).__init__()
+        self.offset = offset
+        self.num_calls = 0
+
+    def add(self, a, b):
+        self.num_calls += 1
+        return a + b + self.offset
+
+    def divide(self, a, b):
+        return a / b
+
+    def __len__(self):
+        return 3
+
+
+def multiply(a, b):
+    return a * b
+
+
+class SpyTest(ForgeTestCase):
+    def setUp(self):
+        super(SpyTest, self).setUp()
+        self.calculator = Calculator(offset=1)
+        self.spy = self.forge.create_spy(self.calculator)
+
+    def test__forwards_and_records_calls(self):
+        self.assertEquals(self.spy.add(1, 2), 4)
+        self.assertEquals(self.spy.add(b=3, a=1), 5)
+        self.assertEquals(len(self.spy), 3)
+        self.assertEquals(self.calculator.num_calls, 2)
+        self.forge.replay()
+        self.assertEquals(self.spy.add(1, 2), 4)
+        self.assertEquals(self.spy.add(1, 3), 5)
+        self.assertEquals(len(self.spy), 3)
+        self.assertEquals(self.calculator.num_calls, 2)
+
+    def test__records_raised_exceptions(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.spy.divide(1, 0)
+        self.forge.replay()
+        with self.assertRaises(ZeroDivisionError):
+            self.spy.divide(1, 0)
+
+    def test__unexpected_calls_in_replay(self):
+        self.spy.add(1, 2)
+        self.forge.replay()
+        with self.assertRaises(UnexpectedCall):
+            self.spy.add(2, 2)
+        self.spy.add(1, 2)
+
+    def test__data_attributes_are_captured(self):
+        self.assertEquals(self.spy.offset, 1)
+        self.assertEquals(self.spy.precision, 2)
+        self.forge.replay()
+        self.calculator.offset = 5
+        self.assertEquals(self.spy.offset, 1)
+
+    def test__isinstance(self):
+        self.assertIsInstance(self.spy, Calculator)
+        self.assertEquals(repr(self.spy), "<Spy of 'Calculator'>")
+
+    def test__function_spy(self):
+        spy = self.forge.create_spy(multiply)
+        self.assertEquals(spy(2, 3), 6)
+        self.forge.replay()
+        self.assertEquals(spy(2, 3), 6)
+
+    def test__class_spy(self):
+        spy = self.forge.create_spy(Calculator)
+        instance = spy(offset=3)
+        self.assertIsInstance(instance, Calculator)
+        self.forge.replay()
+        self.assertIs(spy(offset=3), instance)
+
+    def test__replace_with_spy(self):
+        self.forge.replace_with_spy(os.path, "join")
+        self.assertEquals(os.path.join("a", "b"), "a%sb" % os.sep)
+        self.forge.replay()
+        self.assertEquals(os.path.join("a", "b"), "a%sb" % os.sep)
+        self.forge.verify()
+        self.forge.restore_all_replacements()
+        self.assertFalse(hasattr(os.path.join, "__forge__"))
+
+    def test__replay_offline_from_cassette(self):
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, "cassette")
+            self.spy.add(1, 2)
+            self.forge.save_cassette(path, {"calculator": self.spy})
+            self.forge.reset()
+            forge = Forge()
+            mock = forge.create_mock(Calculator)
+            forge.load_cassette(path, {"calculator": mock})
+            forge.replay()
+            self.assertEquals(mock.add(1, 2), 4)
+            forge.verify()
+        finally:
+            shutil.rmtree(tempdir)
@@ -0,0 +1,155 @@
+import json
+from .ut_utils import ForgeTestCase
+from forge import Forge, UnexpectedCall
+from forge.config import config
+from forge.function_call import FunctionCall
+from forge.stats import ForgeStats
+
+
+class StatsTest(ForgeTestCase):
+    def setUp(self):
+        super(StatsTest, self).setUp()
+        self.forge.stats.enable()
+        self.f = self.forge.create_function_stub(lambda a: None, name="f")
+        self.g = self.forge.create_function_stub(lambda: None, name="g")
+
+    def tearDown(self):
+        self.forge.stats.disable()
+        super(StatsTest, self).tearDown()
+
+    def test__counts(self):
+        self.f(1)
+        self.f(2)
+        self.g.when().then_return(3)
+        self.forge.replay()
+        self.f(1)
+        self.assertEquals(self.g(), 3)
+        self.assertEquals(self.g(), 3)
+        with self.assertRaises(UnexpectedCall):
+            self.f(3)
+        self.f(2)
+        self.forge.verify()
+        f_stats = self.forge.stats["f"]
+        self.assertEquals((f_stats.recorded, f_stats.replayed, f_stats.mismatched), (2, 2, 1))
+        self.assertEquals(f_stats.whenever_hits, 0)
+        self.assertGreater(f_stats.match_time, 0)
+        g_stats = self.forge.stats["g"]
+        self.assertEquals((g_stats.recorded, g_stats.replayed, g_stats.whenever_hits), (1, 2, 2))
+        self.assertEquals(g_stats.get_whenever_hit_ratio(), 1.0)
+        self.assertEquals(self.forge.stats.verifications, 1)
+
+    def test__candidates_compared(self):
+        for _ in range(3):
+            self.f(1)
+        self.forge.replay()
+        with self.assertRaises(UnexpectedCall):
+            self.f(2)
+        self.forge.reset()
+        # an ordered group only compares the next expectation
+        self.assertEquals(self.forge.stats["f"].candidates_compared, 1)
+        with self.forge.any_order():
+            for index in range(3):
+                self.f(index)
+        self.forge.replay()
+        self.f(2)
+        self.assertEquals(self.forge.stats["f"].candidates_compared, 4)
+        self.forge.reset()
+
+    def test__response_table_hits(self):
+        self.forge.create_response_table(self.f, {(1,): "one"})
+        self.forge.replay()
+        self.assertEquals(self.f(1), "one")
+        f_stats = self.forge.stats["f"]
+        self.assertEquals((f_stats.replayed, f_stats.whenever_hits, f_stats.candidates_compared), (1, 1, 1))
+
+    def test__setattr_stats(self):
+        mock = self.forge.create_mock(object)
+        mock.__forge__.expect_setattr("a", 2)
+        self.forge.replay()
+        mock.a = 2
+        self.assertEquals(self.forge.stats["%s.a" % (mock.__forge__.describe(),)].replayed, 1)
+
+    def test__hottest_and_report(self):
+        self.f(1)
+        for _ in range(3):
+            self.g()
+        self.forge.replay()
+        self.f(1)
+        for _ in range(3):
+            self.g()
+        self.assertEquals([stats.name for stats in self.forge.stats.get_hottest(1, key="replayed")], ["g"])
+        with self.assertRaises(ValueError):
+            self.forge.stats.get_hottest(key="name")
+        report = json.loads(self.forge.stats.to_json())
+        self.assertEquals(report["totals"]["replayed"], 4)
+        self.assertEquals(report["stubs"]["g"]["recorded"], 3)
+        self.assertEquals(sorted(report["hottest"]), ["f", "g"])
+
+    def test__merge(self):
+        self.f(1)
+        self.forge.replay()
+        self.f(1)
+        merged = ForgeStats(Forge(), label="suite")
+        merged.merge(self.forge.stats)
+        merged.merge(self.forge.stats)
+        self.assertEquals(merged["f"].replayed, 2)
+        self.assertEquals(merged.as_dict()["label"], "suite")
+
+    def test__disabled_stats(self):
+        self.forge.stats.disable()
+        self.assertEquals(len(self.forge.hooks), 0)
+        self.f(1)
+        self.forge.replay()
+        self.f(1)
+        self.assertEquals(len(self.forge.stats), 0)
+
+
+class ComparisonCountingTest(ForgeTestCase):
+    def test__counting_is_per_forge(self):
+        plain_matches = FunctionCall.__dict__["matches"]
+        self.forge.stats.enable()
+        self.assertIs(FunctionCall.__dict__["matches"], plain_matches)
+        stub = self.forge.create_function_stub(lambda a: None, name="f")
+        other = Forge()
+        other_stub = other.create_function_stub(lambda a: None, name="f")
+        with self.forge.any_order():
+            for index in range(3):
+                stub(index)
+        for index in range(3):
+            other_stub(index)
+        self.forge.replay()
+        other.replay()
+        stub(1)
+        other_stub(0)
+        self.assertEquals(self.forge.stats["f"].candidates_compared, 2)
+        self.forge.stats.disable()
+        self.forge.reset()
+
+    def test__replayed_events_are_not_copied(self):
+        self.forge.debug.enable()
+        self.forge.stats.enable()
+        events = []
+        self.forge.hooks.subscribe(lambda event: events.append((event.description, event.comparisons)))
+        stub = self.forge.create_function_stub(lambda a: None, name="f")
+        with self.forge.any_order():
+            stub(1)
+            stub(2)
+        self.forge.replay()
+        with self.assertRaises(UnexpectedCall) as caught:
+            stub(3)
+        self.assertIs(type(caught.exception.got), FunctionCall)
+        stub(2)
+        self.assertEquals(events[-2:], [("f(a=3)", 2), ("f(a=2)", 2)])
+        self.assertEquals(self.forge.stats["f"].candidates_compared, 4)
+        self.forge.stats.disable()
+        self.forge.reset()
+
+    def test__config(self):
+        config.update(stats=True)
+        try:
+            forge = Forge()
+            self.assertTrue(forge.stats.is_enabled())
+            forge.stats.disable()
+        finally:
+            config.update(stats=False)
+        self.assertFalse(Forge().stats.is_enabled())
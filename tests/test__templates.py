@@ -0,0 +1,113 @@
+from .ut_utils import ForgeTestCase, TestCase
+from forge import Forge, UnexpectedCall, ExpectedEventsNotFound, InvalidTemplate
+
+
+class Obj(object):
+    def f(self, value):
+        raise NotImplementedError()  # pragma: no cover
+
+    def g(self):
+        raise NotImplementedError()  # pragma: no cover
+
+
+class TemplateTest(ForgeTestCase):
+    def setUp(self):
+        super(TemplateTest, self).setUp()
+        self.obj = self.forge.create_mock(Obj)
+        self.obj.attr = 2
+        self.obj.f(1).and_return(10)
+        with self.forge.any_order():
+            self.obj.f(2).and_return(20)
+            self.obj.f(3).and_return(30)
+        self.obj.g.when().then_return(40)
+        self.template = self.forge.capture_template()
+
+    def _replay_baseline(self):
+        self.assertEquals(self.obj.g(), 40)
+        self.assertEquals(self.obj.f(1), 10)
+        self.assertEquals(self.obj.f(3), 30)
+        self.assertEquals(self.obj.f(2), 20)
+
+    def test__template_can_be_loaded_many_times(self):
+        for _ in range(3):
+            self.forge.load_template(self.template)
+            self.forge.replay()
+            self._replay_baseline()
+            self.forge.verify()
+
+    def test__template_is_not_affected_by_later_recording(self):
+        self.obj.f(4)
+        self.obj.attr = 3
+        self.forge.load_template(self.template)
+        self.assertEquals(self.obj.attr, 2)
+        self.forge.replay()
+        self._replay_baseline()
+        with self.assertRaises(UnexpectedCall):
+            self.obj.f(4)
+
+    def test__recording_on_top_of_template(self):
+        self.forge.load_template(self.template)
+        self.obj.f(5).and_return(50)
+        self.forge.replay()
+        self._replay_baseline()
+        with self.assertRaises(ExpectedEventsNotFound):
+            self.forge.verify()
+        self.assertEquals(self.obj.f(5), 50)
+
+    def test__actions_added_after_loading_are_not_shared(self):
+        called = []
+        self.forge.reset()
+        self.obj.f(1).and_call(called.append, args=("template",))
+        template = self.forge.capture_template()
+        self.forge.load_template(template)
+        [loaded] = self.forge.queue.get_expected()
+        loaded.and_call(called.append, args=("loaded",))
+        self.forge.load_template(template)
+        self.forge.replay()
+        self.obj.f(1)
+        self.assertEquals(called, ["template"])
+
+    def test__template_from_another_forge(self):
+        with self.assertRaises(InvalidTemplate):
+            Forge().load_template(self.template)
+        self.forge.reset()
+
+    def test__cannot_capture_during_replay(self):
+        self.forge.replay()
+        with self.assertRaises(InvalidTemplate):
+            self.forge.capture_template()
+        self.forge.reset()
+
+    def test__cannot_capture_inside_ordering_group(self):
+        self.forge.reset()
+        with self.forge.any_order():
+            with self.assertRaises(InvalidTemplate):
+                self.forge.capture_template()
+
+
+class SharedTemplateTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(SharedTemplateTest, cls).setUpClass()
+        cls.forge = Forge()
+        cls.obj = cls.forge.create_mock(Obj)
+        cls.obj.f(1).and_return(10)
+        cls.template = cls.forge.capture_template()
+
+    def setUp(self):
+        super(SharedTemplateTest, self).setUp()
+        self.forge.load_template(self.template)
+
+    def tearDown(self):
+        self.forge.verify()
+        super(SharedTemplateTest, self).tearDown()
+
+    def test__first(self):
+        self.obj.g().and_return(1)
+        self.forge.replay()
+        self.assertEquals(self.obj.f(1), 10)
+        self.assertEquals(self.obj.g(), 1)
+
+    def test__second(self):
+        self.forge.replay()
+        self.assertEquals(self.obj.f(1), 10)
@@ -0,0 +1,150 @@
+import threading
+from .ut_utils import ForgeTestCase
+from forge import Forge, UnexpectedCall
+from forge.queue import ThreadSafeForgeQueue
+
+
+class Obj(object):
+    def f(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+    def g(self, a):
+        raise NotImplementedError()  # pragma: no cover
+
+
+def _run_in_thread(func, *args):
+    results = []
+    def run():
+        try:
+            results.append(func(*args))
+        except Exception as e:
+            results.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+class ThreadSafeForgeTest(ForgeTestCase):
+    def setUp(self):
+        super(ThreadSafeForgeTest, self).setUp()
+        self.forge = Forge(thread_safe=True)
+        self.obj = self.forge.create_mock(Obj)
+
+    def test__queue_class_is_kept(self):
+        self.assertIsInstance(self.forge.queue, ThreadSafeForgeQueue)
+        with self.forge.any_order():
+            self.obj.f(1)
+            self.forge.reset()
+        self.assertIsInstance(self.forge.queue, ThreadSafeForgeQueue)
+        template = self.forge.capture_template()
+        self.forge.load_template(template)
+        self.assertIsInstance(self.forge.queue, ThreadSafeForgeQueue)
+
+    def test__concurrent_replay(self):
+        num_threads = 8
+        num_calls = 200
+        with self.forge.any_order():
+            for thread_index in range(num_threads):
+                for call_index in range(num_calls):
+                    self.obj.f((thread_index, call_index)).and_return(call_index)
+        self.obj.g(1).whenever().and_return(2)
+        self.forge.replay()
+        errors = []
+        def run(thread_index):
+            try:
+                for call_index in range(num_calls):
+                    assert self.obj.f((thread_index, call_index)) == call_index
+                    assert self.obj.g(1) == 2
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(errors, [])
+        self.forge.verify()
+
+
+class ThreadAffineGroupTest(ForgeTestCase):
+    def setUp(self):
+        super(ThreadAffineGroupTest, self).setUp()
+        self.forge = Forge(thread_safe=True)
+        self.obj = self.forge.create_mock(Obj)
+
+    def _record_lanes(self, num_lanes):
+        with self.forge.thread_affine_order():
+            for lane in range(num_lanes):
+                with self.forge.ordered():
+                    self.obj.f(lane).and_return(lane)
+                    self.obj.g(lane)
+
+    def test__lanes_are_owned_by_threads(self):
+        self._record_lanes(2)
+        self.forge.replay()
+        self.assertEquals(self.obj.f(0), 0)
+        # the first lane belongs to the main thread
+        self.assertIsInstance(_run_in_thread(self.obj.g, 0), UnexpectedCall)
+        self.assertEquals(_run_in_thread(self.obj.f, 1), 1)
+        with self.assertRaises(UnexpectedCall):
+            self.obj.g(1)
+        self.obj.g(0)
+        self.forge.reset()
+
+    def test__lanes_of_exited_threads_are_given_up(self):
+        self._record_lanes(3)
+        self.forge.replay()
+        self.assertEquals(self.obj.f(0), 0)
+        self.assertEquals(_run_in_thread(self.obj.f, 1), 1)
+        # the next thread may get the ident of the exited one, but doesn't inherit its lane
+        self.assertEquals(_run_in_thread(self.obj.f, 2), 2)
+        self.assertIsNone(_run_in_thread(self.obj.g, 1))
+        with self.assertRaises(UnexpectedCall):
+            self.obj.g(2)
+        self.obj.g(0)
+        self.obj.g(2)
+        self.forge.verify()
+
+    def test__threads_follow_their_own_order(self):
+        self._record_lanes(1)
+        self.forge.replay()
+        self.assertEquals(self.obj.f(0), 0)
+        with self.assertRaises(UnexpectedCall):
+            self.obj.f(0)
+        self.obj.g(0)
+        self.forge.verify()
+
+    def test__thread_moves_on_after_finishing(self):
+        self._record_lanes(2)
+        self.forge.replay()
+        def run_lanes():
+            for lane in (1, 0):
+                self.obj.f(lane)
+                self.obj.g(lane)
+        self.assertIsNone(_run_in_thread(run_lanes))
+        self.forge.verify()
+
+    def test__concurrent_workers(self):
+        num_lanes = 4
+        self._record_lanes(num_lanes)
+        self.forge.replay()
+        started_lock = threading.Lock()
+        started = []
+        errors = []
+        def work(lane):
+            try:
+                self.obj.f(lane)
+                with started_lock:
+                    started.append(lane)
+                self.obj.g(lane)
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+        threads = [threading.Thread(target=work, args=(lane,)) for lane in range(num_lanes)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(errors, [])
+        self.assertEquals(sorted(started), list(range(num_lanes)))
+        self.forge.verify()